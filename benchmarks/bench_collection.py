@@ -0,0 +1,221 @@
+"""
+Benchmark measuring the collection time and peak memory pytest-inject adds to
+test sessions injecting arguments into parametrized tests.
+
+The benchmark generates a synthetic test tree for every scenario, varying the
+number of test functions, the stacked parametrize markers per test, the rows per
+marker, whether the injected arguments are indirect, and the injected payload
+size. It runs "pytest --collect-only" over each tree with and without injection,
+each in a fresh interpreter, recording the collection time and peak memory.
+
+The results can be saved as a baseline JSON file, and later results compared
+against it, flagging the scenarios whose injected collection time or peak memory
+regressed by more than the tolerance. The comparison exits with a non-zero code
+when any regression is found.
+
+Usage:
+python benchmarks/bench_collection.py [--functions 50 200] [--markers 1 3] [--rows 10] [--indirect both]
+                                      [--payload-size 10] [--repeat 5]
+                                      [--save-baseline baseline.json | --compare baseline.json [--tolerance 0.1]]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from itertools import product
+from pathlib import Path
+
+INDIRECT_CHOICES = {"yes": [True], "no": [False], "both": [False, True]}
+DEFAULT_TOLERANCE = 0.1
+INJECTION_FILE_NAME = "injection.json"
+SYNTHETIC_TEST_TEMPLATE = '''
+{markers}
+def test_synthetic_{index}({arg_names}):
+    pass
+'''
+SYNTHETIC_MARKER_TEMPLATE = '@pytest.mark.parametrize("arg{marker},other{marker}", {rows}{indirect})'
+SYNTHETIC_FIXTURE_TEMPLATE = '''
+@pytest.fixture
+def arg{marker}(request):
+    return request.param
+'''
+# Runs pytest in the measured interpreter, writing its collection time and peak memory to a file.
+MEASURED_COLLECTION_SCRIPT = '''
+import json, resource, sys, time
+import pytest
+
+start = time.perf_counter()
+exit_code = pytest.main(sys.argv[2:])
+collection_time = time.perf_counter() - start
+
+# A failed collection is not measured, as it may have stopped before collecting all the tests.
+if exit_code != pytest.ExitCode.OK:
+    sys.exit(int(exit_code))
+
+peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+# ru_maxrss is in bytes on macOS, and in kilobytes elsewhere.
+peak_memory_megabytes = peak_memory / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+with open(sys.argv[1], "w") as result_file:
+    json.dump({"time": collection_time, "peak_memory": peak_memory_megabytes}, result_file)
+'''
+
+
+def get_scenario_name(functions: int, markers: int, rows: int, indirect: bool, payload_size: int) -> str:
+    return f"functions={functions},markers={markers},rows={rows},indirect={indirect},payload={payload_size}"
+
+
+def generate_test_tree(root: Path, functions: int, markers: int, rows: int, indirect: bool, payload_size: int):
+    """
+    Generates a test module of parametrized test functions, each with stacked parametrize
+    markers of 2 arguments, and the injection file injecting the first argument of every marker.
+    The second argument of every marker keeps the injected rows distinct, so none are deduplicated.
+    """
+    marker_rows = [(row, row) for row in range(rows)]
+    indirect_kwarg = f", indirect=['arg{{marker}}']" if indirect else ""
+    markers_source = "\n".join(
+        SYNTHETIC_MARKER_TEMPLATE.format(
+            marker=marker,
+            rows=marker_rows,
+            indirect=indirect_kwarg.format(marker=marker),
+        )
+        for marker in range(markers)
+    )
+    arg_names = ", ".join(f"arg{marker}, other{marker}" for marker in range(markers))
+
+    module_source = "import pytest\n" + "".join(
+        SYNTHETIC_TEST_TEMPLATE.format(markers=markers_source, index=index, arg_names=arg_names)
+        for index in range(functions)
+    )
+    (root / "test_synthetic.py").write_text(module_source)
+
+    conftest_source = "import pytest\n" + "".join(
+        SYNTHETIC_FIXTURE_TEMPLATE.format(marker=marker) for marker in range(markers)
+    ) if indirect else ""
+    (root / "conftest.py").write_text(conftest_source)
+
+    injection = {f"arg{marker}": list(range(payload_size)) for marker in range(markers)}
+    (root / INJECTION_FILE_NAME).write_text(json.dumps(injection))
+
+
+def measure_collection(root: Path, extra_args) -> dict:
+    """
+    Measures a "pytest --collect-only" run over root in a fresh interpreter.
+    """
+    result_path = root / "result.json"
+    command = [
+        sys.executable, "-c", MEASURED_COLLECTION_SCRIPT, str(result_path),
+        "--collect-only", "-q", "-p", "no:cacheprovider", str(root), *extra_args,
+    ]
+    completed_process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    if completed_process.returncode != 0:
+        raise RuntimeError(
+            f"the collection of {root} {'with' if extra_args else 'without'} injection failed with exit code "
+            f"{completed_process.returncode}:\n{completed_process.stdout}"
+        )
+
+    return json.loads(result_path.read_text())
+
+
+def run_scenario(functions: int, markers: int, rows: int, indirect: bool, payload_size: int, repeat: int) -> dict:
+    """
+    Returns the median collection time and peak memory of a scenario, with and without injection.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        generate_test_tree(root, functions, markers, rows, indirect, payload_size)
+        injection_args = ["--inject-json", str(root / INJECTION_FILE_NAME)]
+
+        with_injection_measurements = []
+        without_injection_measurements = []
+        # Interleaved, so drifts in machine load affect both measurements alike.
+        for _ in range(repeat):
+            with_injection_measurements.append(measure_collection(root, injection_args))
+            without_injection_measurements.append(measure_collection(root, []))
+
+    return {
+        "with_injection": _get_medians(with_injection_measurements),
+        "without_injection": _get_medians(without_injection_measurements),
+    }
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Returns descriptions of the injected collection measurements that regressed by more
+    than tolerance (a fraction) against the baseline. Scenarios missing from the baseline are skipped.
+    """
+    regressions = []
+    for scenario_name, scenario_results in results.items():
+        if scenario_name not in baseline:
+            continue
+
+        for metric, value in scenario_results["with_injection"].items():
+            baseline_value = baseline[scenario_name]["with_injection"][metric]
+            if value > baseline_value * (1 + tolerance):
+                regressions.append(
+                    f"{scenario_name}: {metric} {baseline_value:.4f} -> {value:.4f} "
+                    f"({value / baseline_value - 1:+.2%})"
+                )
+
+    return regressions
+
+
+def _get_medians(measurements: list) -> dict:
+    return {
+        metric: statistics.median(measurement[metric] for measurement in measurements)
+        for metric in measurements[0]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--functions", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--markers", type=int, nargs="+", default=[1, 3])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10])
+    parser.add_argument("--indirect", choices=INDIRECT_CHOICES, default="both")
+    parser.add_argument("--payload-size", type=int, nargs="+", default=[10])
+    parser.add_argument("--repeat", type=int, default=5)
+    comparison_group = parser.add_mutually_exclusive_group()
+    comparison_group.add_argument("--save-baseline", type=Path)
+    comparison_group.add_argument("--compare", type=Path)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    results = {}
+    for functions, markers, rows, indirect, payload_size in product(
+            args.functions, args.markers, args.rows, INDIRECT_CHOICES[args.indirect], args.payload_size
+    ):
+        scenario_name = get_scenario_name(functions, markers, rows, indirect, payload_size)
+        results[scenario_name] = run_scenario(functions, markers, rows, indirect, payload_size, args.repeat)
+
+        with_injection = results[scenario_name]["with_injection"]
+        without_injection = results[scenario_name]["without_injection"]
+        print(scenario_name)
+        print(
+            f"  without injection: {without_injection['time']:.4f}s, "
+            f"peak memory {without_injection['peak_memory']:.1f}MB"
+        )
+        print(
+            f"  with injection:    {with_injection['time']:.4f}s, "
+            f"peak memory {with_injection['peak_memory']:.1f}MB "
+            f"({with_injection['time'] - without_injection['time']:+.4f}s)"
+        )
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(results, indent=2))
+        print(f"baseline saved to {args.save_baseline}")
+    elif args.compare:
+        regressions = find_regressions(results, json.loads(args.compare.read_text()), args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regressions over {args.tolerance:.0%} found:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+
+        print(f"no regressions over {args.tolerance:.0%} found")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark measuring the startup and collection overhead pytest-inject adds to
+test sessions not using any injection option.
+
+The benchmark generates a synthetic test tree, and times "pytest --collect-only"
+over it with pytest-inject loaded and with it disabled ("-p no:pytest_inject"),
+each in a fresh interpreter.
+
+Usage:
+python benchmarks/bench_startup.py [--modules 50] [--tests 20] [--rows 10] [--repeat 15]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PLUGIN_DISABLING_ARGS = ["-p", "no:pytest_inject"]
+SYNTHETIC_TEST_TEMPLATE = '''
+@pytest.mark.parametrize("value", list(range({rows})))
+def test_synthetic_{index}(value):
+    pass
+'''
+
+
+def generate_test_tree(root: Path, modules: int, tests: int, rows: int):
+    """
+    Generates a tree of test modules, each holding parametrized test functions.
+    """
+    for module_index in range(modules):
+        module_source = "import pytest\n" + "".join(
+            SYNTHETIC_TEST_TEMPLATE.format(rows=rows, index=test_index)
+            for test_index in range(tests)
+        )
+        (root / f"test_synthetic_{module_index}.py").write_text(module_source)
+
+
+def time_collection(root: Path, extra_args) -> float:
+    """
+    Times a "pytest --collect-only" run over root in a fresh interpreter.
+    """
+    command = [sys.executable, "-m", "pytest", "--collect-only", "-q", "-p", "no:cacheprovider", str(root)]
+    start = time.perf_counter()
+    subprocess.run(command + extra_args, check=True, stdout=subprocess.DEVNULL)
+
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", type=int, default=50)
+    parser.add_argument("--tests", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=15)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        generate_test_tree(root, args.modules, args.tests, args.rows)
+
+        with_plugin_timings = []
+        without_plugin_timings = []
+        # Interleaved, so drifts in machine load affect both measurements alike.
+        for _ in range(args.repeat):
+            with_plugin_timings.append(time_collection(root, []))
+            without_plugin_timings.append(time_collection(root, PLUGIN_DISABLING_ARGS))
+
+    with_plugin_median = statistics.median(with_plugin_timings)
+    without_plugin_median = statistics.median(without_plugin_timings)
+    overhead = with_plugin_median - without_plugin_median
+
+    print(f"collected {args.modules * args.tests * args.rows} tests, {args.repeat} runs each")
+    print(f"without pytest-inject: median {without_plugin_median:.4f}s, stdev {statistics.stdev(without_plugin_timings):.4f}s")
+    print(f"with pytest-inject:    median {with_plugin_median:.4f}s, stdev {statistics.stdev(with_plugin_timings):.4f}s")
+    print(f"overhead:              {overhead:+.4f}s ({overhead / without_plugin_median:+.2%})")
+
+
+if __name__ == "__main__":
+    main()
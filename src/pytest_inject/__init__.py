@@ -0,0 +1,30 @@
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+# Imported eagerly, as the lazy submodule would otherwise shadow the lazy function once imported.
+from pytest_inject.lazy import LazyValue, lazy
+
+if TYPE_CHECKING:
+    from pytest_inject.dict_factories import blocking
+    from pytest_inject.file_sources import save_injection_pickle
+
+__all__ = ["LazyValue", "blocking", "lazy", "save_injection_pickle"]
+
+# The other public names are imported when first used, as the pytest entry point imports this
+# package on every pytest run, even when no injection option is given.
+_LAZY_PUBLIC_NAMES_MODULES = {
+    "blocking": "pytest_inject.dict_factories",
+    "save_injection_pickle": "pytest_inject.file_sources",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_PUBLIC_NAMES_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    return getattr(import_module(module_name), name)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
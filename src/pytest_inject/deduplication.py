@@ -0,0 +1,201 @@
+"""
+Module containing the duplicated parameter sets detection engine.
+
+Parameter sets are grouped in a single pass by a hashable fingerprint, that is
+equal for two sets exactly when the sets themselves are equal. Sets that cannot
+be fingerprinted fall back to pairwise equality comparison against all other sets.
+As in Python containers, values are compared by identity first, so a value is always
+equal to itself. Values that are not of a builtin type can be fingerprinted by an
+activated value fingerprinter, instead of comparing them by their equality.
+"""
+from collections import Counter
+from typing import Any, Callable, Hashable, List, Optional, Sequence
+
+from pytest_inject.profiling import EQUALITY_COMPARISONS_STAT, count_profile_stat
+
+# Fingerprint tags, private objects that can never appear inside a user value,
+# so a fingerprint of an unhashable container cannot collide with a hashable value.
+_LIST_FINGERPRINT_TAG = object()
+_TUPLE_FINGERPRINT_TAG = object()
+_DICT_FINGERPRINT_TAG = object()
+_VALUE_FINGERPRINTER_TAG = object()
+# Types fingerprinted by the detection engine, never passed to the value fingerprinter.
+_BUILTIN_TYPES = frozenset({str, bytes, int, float, complex, bool, type(None), list, tuple, dict, set, frozenset})
+
+_active_value_fingerprinter = None
+
+
+class _UnfingerprintableValueError(Exception):
+    """
+    Raised when a value has no fingerprint consistent with its equality.
+    """
+
+
+def activate_value_fingerprinter(value_fingerprinter: Optional[Callable[[Any], Optional[Hashable]]]):
+    """
+    Sets the fingerprinter of the values that are not of a builtin type, returning a hashable
+    fingerprint of a value, or None to compare it by its equality. None deactivates it.
+    """
+    global _active_value_fingerprinter
+    _active_value_fingerprinter = value_fingerprinter
+
+
+def find_duplicated_elements(elements: Sequence[Any]) -> List[bool]:
+    """
+    Checks which elements of a sequence have more than one occurrence in it.
+
+    :param elements: The elements to check, compared using their equality.
+    :return: A list, holding for each element whether another element equal to it exists.
+    """
+    fingerprints = [_get_element_fingerprint(element) for element in elements]
+    fingerprints_counts = Counter(
+        fingerprint for fingerprint in fingerprints
+        if fingerprint is not None
+    )
+
+    duplicated = [
+        fingerprint is not None and fingerprints_counts[fingerprint] > 1
+        for fingerprint in fingerprints
+    ]
+
+    unfingerprinted_indexes = [
+        element_index for element_index, fingerprint in enumerate(fingerprints)
+        if fingerprint is None
+    ]
+    for element_index in unfingerprinted_indexes:
+        element_checked = elements[element_index]
+
+        for other_element_index, other_element in enumerate(elements):
+            if element_index != other_element_index and _are_equal(element_checked, other_element):
+                duplicated[element_index] = True
+                duplicated[other_element_index] = True
+
+    if unfingerprinted_indexes:
+        count_profile_stat(EQUALITY_COMPARISONS_STAT, len(unfingerprinted_indexes) * (len(elements) - 1))
+
+    return duplicated
+
+
+def find_repeated_elements(elements: Sequence[Any]) -> List[bool]:
+    """
+    Checks which elements of a sequence are equal to an element preceding them,
+    so that keeping only the non-repeated elements keeps the first occurrence of each.
+
+    :param elements: The elements to check, compared using their equality.
+    :return: A list, holding for each element whether an element equal to it precedes it.
+    """
+    return [
+        first_occurrence_index != element_index
+        for element_index, first_occurrence_index in enumerate(find_first_occurrence_indexes(elements))
+    ]
+
+
+def find_first_occurrence_indexes(elements: Sequence[Any]) -> List[int]:
+    """
+    Finds the first occurrence of every element of a sequence.
+
+    :param elements: The elements to check, compared using their equality.
+    :return: A list, holding for each element the index of the first element equal to it,
+            which is its own index if no element equal to it precedes it.
+    """
+    fingerprints_first_indexes = {}
+    unfingerprinted_elements = []
+    first_occurrence_indexes = []
+    equality_comparisons = 0
+
+    for element_index, element in enumerate(elements):
+        fingerprint = _get_element_fingerprint(element)
+        if fingerprint is None:
+            first_occurrence_index = element_index
+            compared_elements = enumerate(elements[:element_index])
+            unfingerprinted_elements.append((element_index, element))
+        else:
+            first_occurrence_index = fingerprints_first_indexes.setdefault(fingerprint, element_index)
+            compared_elements = unfingerprinted_elements
+
+        # An element that cannot be fingerprinted may still be equal to an earlier element.
+        for compared_element_index, compared_element in compared_elements:
+            if compared_element_index >= first_occurrence_index:
+                break
+
+            equality_comparisons += 1
+            if _are_equal(element, compared_element):
+                first_occurrence_index = compared_element_index
+                break
+
+        first_occurrence_indexes.append(first_occurrence_index)
+
+    if equality_comparisons:
+        count_profile_stat(EQUALITY_COMPARISONS_STAT, equality_comparisons)
+
+    return first_occurrence_indexes
+
+
+def _are_equal(element: Any, other_element: Any) -> bool:
+    """
+    Compares two elements by identity first, and by their equality otherwise.
+    Elements whose equality is ambiguous, like those holding NumPy arrays, are equal only if identical.
+    """
+    if element is other_element:
+        return True
+
+    try:
+        return bool(element == other_element)
+    except (TypeError, ValueError):
+        return False
+
+
+def _get_element_fingerprint(element: Any) -> Optional[Hashable]:
+    """
+    Returns the fingerprint of an element, or None if it cannot be fingerprinted.
+    """
+    if _active_value_fingerprinter is None:
+        try:
+            hash(element)
+        except TypeError:
+            pass
+        else:
+            return element
+
+    try:
+        return _get_value_fingerprint(element)
+    except _UnfingerprintableValueError:
+        return None
+
+
+def _get_value_fingerprint(value: Any) -> Hashable:
+    """
+    Returns a hashable fingerprint of a value, recursing into unhashable
+    lists, tuples, sets and dicts.
+    """
+    value_type = type(value)
+
+    if _active_value_fingerprinter is not None:
+        if value_type not in _BUILTIN_TYPES:
+            value_fingerprint = _active_value_fingerprinter(value)
+            if value_fingerprint is not None:
+                return _VALUE_FINGERPRINTER_TAG, value_fingerprint
+        elif value_type is tuple:
+            # Even a hashable tuple may hold values fingerprinted by the value fingerprinter.
+            return (_TUPLE_FINGERPRINT_TAG,) + tuple(_get_value_fingerprint(item) for item in value)
+
+    try:
+        hash(value)
+    except TypeError:
+        pass
+    else:
+        return value
+
+    if value_type is list:
+        return (_LIST_FINGERPRINT_TAG,) + tuple(_get_value_fingerprint(item) for item in value)
+    elif value_type is tuple:
+        return (_TUPLE_FINGERPRINT_TAG,) + tuple(_get_value_fingerprint(item) for item in value)
+    elif value_type is dict:
+        return _DICT_FINGERPRINT_TAG, frozenset(
+            (key, _get_value_fingerprint(item)) for key, item in value.items()
+        )
+    elif value_type is set:
+        # A set is equal to a frozenset with the same items.
+        return frozenset(value)
+
+    raise _UnfingerprintableValueError(value_type)
@@ -0,0 +1,142 @@
+"""
+Module containing the persistent on-disk cache of the dicts resolved from
+--inject-dict targets, stored in the pytest cache directory.
+
+Every cached dict is a pickle file named by its cache key, a hash of the
+python file content, the target name, and the content of the declared
+dependency files. The least recently used entries are evicted when the
+total size of the cache exceeds its maximal size.
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Magic constants
+CACHE_DIR_NAME = "pytest-inject-dict"
+CACHE_ENTRY_SUFFIX = ".pickle"
+FILE_HASH_CHUNK_SIZE = 1024 * 1024
+BYTES_IN_MEGABYTE = 1024 * 1024
+
+
+class InjectDictCache:
+    """
+    A directory of cached --inject-dict dicts, evicting the least recently
+    used entries once its total size exceeds max_size_bytes.
+    """
+
+    def __init__(self, cache_dir: Path, max_size_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+
+    def load(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the dict cached under cache_key, or None if there is none,
+        or it can no longer be unpickled.
+        """
+        entry_path = self._get_entry_path(cache_key)
+
+        try:
+            with open(entry_path, "rb") as entry_file:
+                injections_dict = pickle.load(entry_file)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # The pickled objects classes may have changed since they were cached.
+            entry_path.unlink()
+            return None
+
+        # Marks the entry as recently used, for the eviction order.
+        os.utime(entry_path)
+
+        return injections_dict
+
+    def store(self, cache_key: str, injections_dict: Dict[str, Any]) -> bool:
+        """
+        Caches a dict under cache_key, returning False if it cannot be pickled.
+        """
+        try:
+            pickled_injections_dict = pickle.dumps(injections_dict, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return False
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        temp_file_descriptor, temp_file_path = tempfile.mkstemp(dir=self.cache_dir)
+        with os.fdopen(temp_file_descriptor, "wb") as temp_file:
+            temp_file.write(pickled_injections_dict)
+
+        # Replacing the entry atomically, so concurrent runs never read a partial entry.
+        os.replace(temp_file_path, self._get_entry_path(cache_key))
+        self._evict(cache_key)
+
+        return True
+
+    def _evict(self, kept_cache_key: str):
+        """
+        Removes the least recently used entries, until the cache size is under
+        its maximal size. The entry of kept_cache_key is never removed.
+        """
+        entries = []
+        for entry_path in self.cache_dir.glob(f"*{CACHE_ENTRY_SUFFIX}"):
+            try:
+                entry_stat = entry_path.stat()
+            except FileNotFoundError:
+                continue
+
+            entries.append((entry_stat.st_mtime, entry_stat.st_size, entry_path))
+
+        cache_size = sum(entry_size for _, entry_size, _ in entries)
+        kept_entry_path = self._get_entry_path(kept_cache_key)
+
+        for _, entry_size, entry_path in sorted(entries):
+            if cache_size <= self.max_size_bytes:
+                break
+
+            if entry_path != kept_entry_path:
+                entry_path.unlink()
+                cache_size -= entry_size
+
+    def _get_entry_path(self, cache_key: str) -> Path:
+        return self.cache_dir / f"{cache_key}{CACHE_ENTRY_SUFFIX}"
+
+
+def get_inject_dict_cache(config) -> Optional[InjectDictCache]:
+    """
+    Returns the cache of --inject-dict dicts of the test session, or None if
+    pytest's cache provider is disabled.
+    """
+    pytest_cache = getattr(config, "cache", None)
+    if pytest_cache is None:
+        return None
+
+    max_size_bytes = int(config.getoption("inject_dict_cache_size") * BYTES_IN_MEGABYTE)
+
+    return InjectDictCache(pytest_cache.mkdir(CACHE_DIR_NAME), max_size_bytes)
+
+
+def get_cache_key(file_path: str, target_name: str, dependency_paths: List[str]) -> str:
+    """
+    Returns the cache key of an --inject-dict target, changing whenever the
+    content of its python file or of any of its dependency files changes.
+    """
+    cache_key_hash = hashlib.sha256()
+    cache_key_hash.update(_get_file_hash(file_path))
+    cache_key_hash.update(target_name.encode())
+
+    for dependency_path in dependency_paths:
+        cache_key_hash.update(os.path.abspath(dependency_path).encode())
+        cache_key_hash.update(_get_file_hash(dependency_path))
+
+    return cache_key_hash.hexdigest()
+
+
+def _get_file_hash(file_path: str) -> bytes:
+    file_hash = hashlib.sha256()
+
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(FILE_HASH_CHUNK_SIZE), b""):
+            file_hash.update(chunk)
+
+    return file_hash.digest()
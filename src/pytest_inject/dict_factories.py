@@ -0,0 +1,145 @@
+"""
+Module containing the concurrent resolution of the dicts loaded by --inject-dict.
+
+The target of --inject-dict can be an async function, and the values of the dict it
+holds or returns can be awaitables (like coroutines) or blocking factories, marked
+with blocking. All of them are resolved concurrently, once, when the dict is loaded:
+awaitables in an event loop, and blocking factories in a thread pool, so a dict made
+of many independent I/O-bound pieces is not built serially.
+"""
+import inspect
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+from pytest_inject.exceptions import PytestInjectError
+
+if TYPE_CHECKING:
+    from concurrent.futures import ThreadPoolExecutor
+
+
+class BlockingFactory:
+    """
+    An injected value created by a blocking zero-argument factory, called in a thread
+    pool when the dict holding it is loaded, concurrently with the other values.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        self.factory = factory
+
+    def __repr__(self):
+        return f"BlockingFactory({getattr(self.factory, '__name__', self.factory)!r})"
+
+
+def blocking(factory: Callable[[], Any]) -> BlockingFactory:
+    """
+    Marks a blocking zero-argument factory, like one reading a file or querying
+    a service, as an injected value of an --inject-dict dict, created in a thread
+    pool concurrently with the other values of the dict, when the dict is loaded.
+    Can be called with the factory, or used as a decorator.
+
+    :param factory: The blocking zero-argument factory creating the injected value.
+    """
+    return BlockingFactory(factory)
+
+
+def needs_concurrent_resolution(injections_dict: Any) -> bool:
+    """
+    Checks if a loaded dict, or the result of its target, has to be resolved concurrently.
+    """
+    if inspect.isawaitable(injections_dict):
+        return True
+
+    return isinstance(injections_dict, dict) and any(
+        _is_concurrent_value(value) for value in injections_dict.values()
+    )
+
+
+def resolve_concurrently(
+        injections_dict: Any,
+        max_workers: Optional[int] = None,
+        timings: Optional[Dict[str, float]] = None,
+) -> Any:
+    """
+    Awaits the result of an async target, and then resolves the awaitable values and
+    blocking factories of the dict concurrently, returning the dict with their results.
+
+    :param injections_dict: The dict loaded by --inject-dict, or the awaitable its async target returned.
+    :param max_workers: The thread pool size of the blocking factories, or None for the default size.
+    :param timings: A dict to fill with the seconds each concurrently resolved value took.
+    """
+    # Imported here, as asyncio is slow to import, and only needed by dicts with concurrent values.
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_resolve_dict(injections_dict, max_workers, timings))
+
+    # An event loop cannot be run while another one is running in the same thread.
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(
+            asyncio.run, _resolve_dict(injections_dict, max_workers, timings)
+        ).result()
+
+
+async def _resolve_dict(
+        injections_dict: Any,
+        max_workers: Optional[int],
+        timings: Optional[Dict[str, float]],
+) -> Any:
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+
+    if inspect.isawaitable(injections_dict):
+        injections_dict = await injections_dict
+
+    if not isinstance(injections_dict, dict):
+        # Left to the validation of the loaded dict.
+        return injections_dict
+
+    concurrent_keys = [key for key, value in injections_dict.items() if _is_concurrent_value(value)]
+    if not concurrent_keys:
+        return injections_dict
+
+    executor = None
+    if any(isinstance(injections_dict[key], BlockingFactory) for key in concurrent_keys):
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    try:
+        resolved_values = await asyncio.gather(*(
+            _resolve_value(key, injections_dict[key], executor, timings) for key in concurrent_keys
+        ))
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    return {**injections_dict, **dict(zip(concurrent_keys, resolved_values))}
+
+
+async def _resolve_value(
+        key: str,
+        value: Any,
+        executor: Optional["ThreadPoolExecutor"],
+        timings: Optional[Dict[str, float]],
+) -> Any:
+    import asyncio
+
+    start_time = time.perf_counter()
+
+    try:
+        if isinstance(value, BlockingFactory):
+            resolved_value = await asyncio.get_running_loop().run_in_executor(executor, value.factory)
+        else:
+            resolved_value = await value
+    except Exception as exception:
+        raise PytestInjectError(f"pytest-inject: Error resolving the injected value of '{key}'.") from exception
+
+    if timings is not None:
+        timings[key] = time.perf_counter() - start_time
+
+    return resolved_value
+
+
+def _is_concurrent_value(value: Any) -> bool:
+    return isinstance(value, BlockingFactory) or inspect.isawaitable(value)
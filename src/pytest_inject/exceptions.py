@@ -1,2 +1,9 @@
+import pytest
+
+
 class PytestInjectError(Exception):
     pass
+
+
+class PytestInjectWarning(pytest.PytestWarning):
+    pass
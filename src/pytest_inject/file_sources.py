@@ -0,0 +1,244 @@
+"""
+Module containing the binary injection files given to --inject-file, injected without
+copying their content into memory.
+
+- ".npy" files hold a single NumPy array, injected as the argument named after the file,
+  memory-mapped in read-only mode.
+- ".npz" files hold NumPy arrays, injected as the arguments named after them. Uncompressed
+  arrays are memory-mapped from their offset in the file, and compressed arrays are
+  lazy values, decompressed only when a test consuming them sets up.
+- ".pkl" and ".pickle" files hold a pickled dict of injected arguments. Files written by
+  save_injection_pickle hold the pickle protocol 5 out-of-band buffers of the dict (like
+  NumPy arrays) after the pickle stream, which are passed to the unpickler as views of
+  the memory-mapped file, so the arrays unpickled are views of the file as well.
+  Other pickle files are unpickled as usual.
+"""
+import mmap
+import os
+import pickle
+import struct
+import zipfile
+from functools import partial
+from typing import Any, Dict
+
+from pytest_inject.exceptions import PytestInjectError
+from pytest_inject.lazy import lazy
+
+# Magic constants
+NPY_FILE_EXTENSION = ".npy"
+NPZ_FILE_EXTENSION = ".npz"
+PICKLE_FILE_EXTENSIONS = (".pkl", ".pickle")
+OUT_OF_BAND_PICKLE_MAGIC = b"PYINJPK5"
+# The magic, the pickle stream length and the out-of-band buffers count.
+OUT_OF_BAND_PICKLE_HEADER = struct.Struct("<8sQQ")
+OUT_OF_BAND_BUFFER_LENGTH = struct.Struct("<Q")
+# Buffers are aligned, as NumPy arrays are faster to access, and some dtypes can only be viewed, when aligned.
+OUT_OF_BAND_BUFFER_ALIGNMENT = 64
+ZIP_LOCAL_FILE_HEADER = struct.Struct("<4s5H3L2H")
+ZIP_LOCAL_FILE_HEADER_NAMES_LENGTHS_INDEX = 9
+
+
+class InjectionFileDict(dict):
+    """
+    The injected arguments of a binary injection file. Pickled, it holds the file path only,
+    so xdist workers map the file themselves, instead of receiving a copy of its content.
+    """
+
+    def __init__(self, file_path: str, injected_args: Dict[str, Any]):
+        super().__init__(injected_args)
+        self.file_path = file_path
+
+    def __reduce__(self):
+        return load_injection_file, (self.file_path,)
+
+
+def load_injection_file(file_path: str) -> InjectionFileDict:
+    """
+    Loads the injected arguments of a binary injection file, by its extension.
+    """
+    if not os.path.isfile(file_path):
+        raise PytestInjectError(f"pytest-inject: Injection file not found: '{file_path}'")
+
+    file_extension = os.path.splitext(file_path)[1].lower()
+    if file_extension == NPY_FILE_EXTENSION:
+        injected_args = _load_npy_file(file_path)
+    elif file_extension == NPZ_FILE_EXTENSION:
+        injected_args = _load_npz_file(file_path)
+    elif file_extension in PICKLE_FILE_EXTENSIONS:
+        injected_args = _load_pickle_file(file_path)
+    else:
+        raise PytestInjectError(
+            f"pytest-inject: Unsupported injection file '{file_path}', expected one of the extensions "
+            f"{[NPY_FILE_EXTENSION, NPZ_FILE_EXTENSION, *PICKLE_FILE_EXTENSIONS]}."
+        )
+
+    return InjectionFileDict(file_path, injected_args)
+
+
+def save_injection_pickle(injected_args: Dict[str, Any], file_path: str):
+    """
+    Pickles a dict of injected arguments into a file, with the pickle protocol 5 out-of-band
+    buffers of its values (like NumPy arrays) stored after the pickle stream, so --inject-file
+    maps them from the file without copying them.
+
+    :param injected_args: The dict of injected arguments to pickle.
+    :param file_path: The path of the pickle file to write, with a ".pkl" or ".pickle" extension.
+    """
+    out_of_band_buffers = []
+    pickled_args = pickle.dumps(injected_args, protocol=5, buffer_callback=out_of_band_buffers.append)
+
+    with open(file_path, "wb") as file:
+        file.write(OUT_OF_BAND_PICKLE_HEADER.pack(
+            OUT_OF_BAND_PICKLE_MAGIC,
+            len(pickled_args),
+            len(out_of_band_buffers),
+        ))
+        file.write(pickled_args)
+
+        for out_of_band_buffer in out_of_band_buffers:
+            with out_of_band_buffer.raw() as buffer_view:
+                file.write(OUT_OF_BAND_BUFFER_LENGTH.pack(buffer_view.nbytes))
+                file.write(b"\0" * (-file.tell() % OUT_OF_BAND_BUFFER_ALIGNMENT))
+                file.write(buffer_view)
+
+
+def _load_pickle_file(file_path: str) -> Dict[str, Any]:
+    """
+    Unpickles the dict of injected arguments of a pickle file, with the out-of-band
+    buffers of files written by save_injection_pickle mapped from the file.
+    """
+    with open(file_path, "rb") as file:
+        is_out_of_band_pickle = file.read(len(OUT_OF_BAND_PICKLE_MAGIC)) == OUT_OF_BAND_PICKLE_MAGIC
+
+        try:
+            if is_out_of_band_pickle:
+                # The mapped file stays open as long as the unpickled values viewing its buffers are alive.
+                mapped_file = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                injected_args = _load_out_of_band_pickle(memoryview(mapped_file))
+            else:
+                file.seek(0)
+                injected_args = pickle.load(file)
+        except Exception as exception:
+            raise PytestInjectError(f"pytest-inject: Error unpickling file '{file_path}'.") from exception
+
+    _validate_injected_args(injected_args, file_path)
+
+    return injected_args
+
+
+def _load_out_of_band_pickle(file_view: memoryview) -> Any:
+    _, pickle_length, buffers_count = OUT_OF_BAND_PICKLE_HEADER.unpack_from(file_view)
+    pickle_start = OUT_OF_BAND_PICKLE_HEADER.size
+    position = pickle_start + pickle_length
+
+    out_of_band_buffers = []
+    for _ in range(buffers_count):
+        (buffer_length,) = OUT_OF_BAND_BUFFER_LENGTH.unpack_from(file_view, position)
+        position += OUT_OF_BAND_BUFFER_LENGTH.size
+        position += -position % OUT_OF_BAND_BUFFER_ALIGNMENT
+        out_of_band_buffers.append(file_view[position:position + buffer_length])
+        position += buffer_length
+
+    return pickle.loads(file_view[pickle_start:pickle_start + pickle_length], buffers=out_of_band_buffers)
+
+
+def _load_npy_file(file_path: str) -> Dict[str, Any]:
+    numpy = _import_numpy(file_path)
+    arg_name = os.path.splitext(os.path.basename(file_path))[0]
+
+    try:
+        return {arg_name: numpy.load(file_path, mmap_mode="r")}
+    except ValueError as exception:
+        # Arrays of Python objects cannot be memory-mapped, and are pickled in the file.
+        raise PytestInjectError(
+            f"pytest-inject: The array in '{file_path}' cannot be memory-mapped. "
+            f"Arrays of Python objects can be injected with a pickle file instead."
+        ) from exception
+
+
+def _load_npz_file(file_path: str) -> Dict[str, Any]:
+    numpy = _import_numpy(file_path)
+
+    injected_args = {}
+    with open(file_path, "rb") as file, zipfile.ZipFile(file) as npz_file:
+        for member in npz_file.infolist():
+            arg_name = member.filename
+            if arg_name.endswith(NPY_FILE_EXTENSION):
+                arg_name = arg_name[:-len(NPY_FILE_EXTENSION)]
+
+            mapped_array = None
+            if member.compress_type == zipfile.ZIP_STORED:
+                mapped_array = _map_npz_member(numpy, file_path, file, member)
+
+            injected_args[arg_name] = (
+                mapped_array if mapped_array is not None
+                else lazy(partial(_load_npz_member, file_path, member.filename), scope="session")
+            )
+
+    return injected_args
+
+
+def _map_npz_member(numpy, file_path: str, file, member: zipfile.ZipInfo) -> Any:
+    """
+    Memory-maps an uncompressed array of a ".npz" file from its offset in the file,
+    or returns None if it cannot be memory-mapped.
+    """
+    file.seek(member.header_offset)
+    local_file_header = ZIP_LOCAL_FILE_HEADER.unpack(file.read(ZIP_LOCAL_FILE_HEADER.size))
+    file_name_length, extra_field_length = local_file_header[ZIP_LOCAL_FILE_HEADER_NAMES_LENGTHS_INDEX:]
+    file.seek(member.header_offset + ZIP_LOCAL_FILE_HEADER.size + file_name_length + extra_field_length)
+
+    npy_format = numpy.lib.format
+    try:
+        version = npy_format.read_magic(file)
+        if version == (1, 0):
+            shape, fortran_order, dtype = npy_format.read_array_header_1_0(file)
+        elif version == (2, 0):
+            shape, fortran_order, dtype = npy_format.read_array_header_2_0(file)
+        else:
+            return None
+    except ValueError as exception:
+        raise PytestInjectError(
+            f"pytest-inject: The member '{member.filename}' of '{file_path}' is not a valid \".npy\" file."
+        ) from exception
+
+    if dtype.hasobject:
+        return None
+
+    return numpy.memmap(
+        file_path,
+        dtype=dtype,
+        mode="r",
+        shape=shape,
+        order="F" if fortran_order else "C",
+        offset=file.tell(),
+    )
+
+
+def _load_npz_member(file_path: str, member_name: str) -> Any:
+    numpy = _import_numpy(file_path)
+    with numpy.load(file_path) as npz_file:
+        return npz_file[member_name]
+
+
+def _import_numpy(file_path: str):
+    try:
+        import numpy
+    except ImportError:
+        raise PytestInjectError(f"pytest-inject: NumPy is required to inject the arrays of '{file_path}'.")
+
+    return numpy
+
+
+def _validate_injected_args(injected_args: Any, file_path: str):
+    if not isinstance(injected_args, dict):
+        raise PytestInjectError(
+            f"pytest-inject: expected a pickled dict in '{file_path}', got {type(injected_args)} instead."
+        )
+
+    for key in injected_args:
+        if not isinstance(key, str):
+            raise PytestInjectError(
+                f"pytest-inject: expected string keys in the pickled dict in '{file_path}', "
+                f"got key of type {type(key)} instead."
+            )
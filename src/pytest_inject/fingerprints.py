@@ -0,0 +1,85 @@
+"""
+Module containing the fingerprint strategies of parameter values, used by the duplicated
+parameter sets detection engine, enabled by --inject-fingerprint and the
+pytest_inject_fingerprint hook.
+
+Values of builtin types are fingerprinted by the detection engine itself. Other values
+are fingerprinted by the pytest_inject_fingerprint hook implementations first, and by
+the selected strategy if no implementation fingerprints them:
+- "identity": values are compared by identity first, and by equality for distinct
+  objects, whose equality is treated as false if it is ambiguous (like for NumPy arrays).
+- "id": values are compared by identity only, so equality is never called.
+- "buffer": values exposing a buffer (like NumPy arrays, bytearrays and arrays) are
+  compared by a digest of their buffer, and other values as by the "identity" strategy.
+"""
+import hashlib
+from typing import Any, Callable, Hashable, Optional
+
+# Magic constants
+IDENTITY_STRATEGY = "identity"
+ID_STRATEGY = "id"
+BUFFER_STRATEGY = "buffer"
+FINGERPRINT_STRATEGIES = (IDENTITY_STRATEGY, ID_STRATEGY, BUFFER_STRATEGY)
+BUFFER_DIGEST_SIZE = 16
+
+# Fingerprint tags, private objects that can never appear inside a user value,
+# so fingerprints of different strategies cannot collide.
+_ID_FINGERPRINT_TAG = object()
+_BUFFER_FINGERPRINT_TAG = object()
+
+
+def id_fingerprint(value: Any) -> Hashable:
+    """
+    Returns a fingerprint of a value by its identity, equal only for the same object.
+    """
+    return _ID_FINGERPRINT_TAG, id(value)
+
+
+def buffer_digest_fingerprint(value: Any) -> Optional[Hashable]:
+    """
+    Returns a fingerprint of a value exposing a buffer, by its type, the format and shape
+    of its buffer and a digest of its bytes, or None if the value does not expose a buffer.
+    """
+    try:
+        buffer = memoryview(value)
+    except (TypeError, ValueError):
+        # Values that do not expose a buffer, or expose an unsupported one, like object arrays.
+        return None
+
+    with buffer:
+        buffer_bytes = buffer.cast("B") if buffer.c_contiguous else buffer.tobytes()
+        digest = hashlib.blake2b(buffer_bytes, digest_size=BUFFER_DIGEST_SIZE).digest()
+
+        return _BUFFER_FINGERPRINT_TAG, type(value), buffer.format, buffer.shape, digest
+
+
+def get_value_fingerprinter(
+        fingerprint_hook: Optional[Callable[..., Optional[Hashable]]],
+        strategy: str = IDENTITY_STRATEGY,
+) -> Optional[Callable[[Any], Optional[Hashable]]]:
+    """
+    Returns the fingerprinter of the values that are not of a builtin type, calling the
+    pytest_inject_fingerprint hook first, and the strategy if the hook returns None.
+    Returns None if neither fingerprints values, leaving them to the detection engine.
+
+    :param fingerprint_hook: The pytest_inject_fingerprint hook caller, or None if no
+            plugin implements the hook.
+    :param strategy: The strategy fingerprinting the values the hook does not fingerprint.
+    """
+    strategy_fingerprint = {
+        IDENTITY_STRATEGY: None,
+        ID_STRATEGY: id_fingerprint,
+        BUFFER_STRATEGY: buffer_digest_fingerprint,
+    }[strategy]
+
+    if fingerprint_hook is None:
+        return strategy_fingerprint
+
+    def fingerprint_value(value: Any) -> Optional[Hashable]:
+        fingerprint = fingerprint_hook(value=value)
+        if fingerprint is None and strategy_fingerprint is not None:
+            return strategy_fingerprint(value)
+
+        return fingerprint
+
+    return fingerprint_value
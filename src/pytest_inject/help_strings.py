@@ -7,6 +7,12 @@ Usage with JSON string:
 pytest --inject-json '{"my_arg": "my_value", "count": 42}'
 Usage with JSON file:
 pytest --inject-json path/to/injection.json
+Keys holding "/", "::" or a glob character are node id globs or prefixes, holding the injected arguments
+of the tests they match only:
+pytest --inject-json '{"user": "guest", "tests/api/*::test_login*": {"user": "admin"}}'
+Can be given several times, and together with --inject-dict and --inject-file. The sources are merged
+in order: --inject-file sources, then --inject-json sources, then --inject-dict sources, later ones
+overriding earlier ones.
 '''
 
 INJECT_DICT_HELP_STRING = '''
@@ -21,13 +27,146 @@ pytest --inject-dict injection_data.py::data_dict
 # Use a function
 pytest --inject-dict injection_data.py::get_data
 ```
+Can be given several times, and together with --inject-json and --inject-file, overriding them.
+'''
+
+INJECT_FILE_HELP_STRING = '''
+Allows you to inject arguments from a binary file, without copying its content into memory.
+".npy" files inject their array as the argument named after the file, and ".npz" files inject their arrays
+as the arguments named after them, memory-mapped (requires NumPy).
+".pkl" and ".pickle" files inject the pickled dict they hold. Files written by
+pytest_inject.save_injection_pickle memory-map the large buffers of their values, like NumPy arrays.
+Usage:
+pytest --inject-file path/to/arrays.npz
+Can be given several times, and together with --inject-json and --inject-dict, which override it.
 '''
 
 INJECT_ALLOW_DUPS_HELP_STRING = '''
 By default, pytest-inject automatically removes duplicate parameter sets created by the injection. This process
-also re-indexes the parameter sets and removes their IDs. Use this flag to disable this behavior if you want to
-preserve the original parameter set indexes and IDs, or if you specifically need the duplicate test cases
-resulting from the injection.
+also re-indexes the parameter sets, while the kept parameter sets keep their original IDs, merged with the IDs of
+their removed duplicates. Use this flag to disable this behavior if you want to preserve the original parameter
+set indexes, or if you specifically need the duplicate test cases resulting from the injection.
 Usage:
 pytest "tests/test.py::test_my_app::[my_id]" --inject-json '{"arg": "val"}' --inject-allow-dup
 '''
+
+INJECT_BATCH_HELP_STRING = '''
+Runs the selected tests once for every payload in a JSONL file, in a single test session.
+Each line of the file is a JSON object of injected arguments, creating its own parametrized
+variant of every test consuming it, and the results are reported per payload line.
+The payloads are read from the file line by line, and only the values of the tests
+consuming them are kept in memory, by their parametrized variants.
+Usage:
+pytest "tests/test.py::test_my_app" --inject-batch path/to/payloads.jsonl
+'''
+
+INJECT_SERVE_HELP_STRING = '''
+Keeps the test session alive after collection, serving injection payloads sent to a Unix socket
+at the given path. For every payload, the selected tests are run again with the payload injected,
+while session, module and class scoped fixtures are kept alive between payloads.
+--maxfail and -x stop the server, as they stop the session. Requires pytest 7.0 and above.
+Usage:
+pytest "tests/test.py::test_my_app" --inject-serve /tmp/pytest-inject.sock
+python -m pytest_inject.serve /tmp/pytest-inject.sock '{"my_arg": "my_value"}'
+python -m pytest_inject.serve /tmp/pytest-inject.sock --shutdown
+'''
+
+INJECT_DICT_CACHE_HELP_STRING = '''
+Caches the dict loaded by --inject-dict in pytest's cache directory, and loads it from there
+while the python file, the target name and the --inject-dict-cache-dep files are unchanged,
+instead of executing the python file again. Dicts that cannot be pickled are not cached.
+Usage:
+pytest --inject-dict injection_data.py::get_data --inject-dict-cache
+'''
+
+INJECT_DICT_CACHE_DEP_HELP_STRING = '''
+A file the --inject-dict python file depends on, invalidating the cached dict when it changes.
+Can be given multiple times.
+Usage:
+pytest --inject-dict injection_data.py::get_data --inject-dict-cache --inject-dict-cache-dep data/fixture.csv
+'''
+
+INJECT_DICT_CACHE_SIZE_HELP_STRING = '''
+The maximal total size of the cached --inject-dict dicts, in megabytes (default: 512).
+The least recently used dicts are evicted when it is exceeded.
+'''
+
+INJECT_DICT_WORKERS_HELP_STRING = '''
+The number of threads creating the values of the --inject-dict dict marked with pytest_inject.blocking,
+concurrently with its awaitable values (default: the thread pool default).
+Usage:
+pytest --inject-dict path/to/fixtures.py::load_fixtures --inject-dict-workers 16
+'''
+
+INJECT_ONLY_HELP_STRING = '''
+Deselects every test no injected argument was injected into, so only the tests consuming the
+injection input are run.
+Usage:
+pytest --inject-json '{"my_arg": "my_value"}' --inject-only
+'''
+
+INJECT_FINGERPRINT_HELP_STRING = '''
+The strategy comparing parameter values that are not of a builtin type, when removing duplicate parameter sets:
+"identity" (the default) compares them by identity first and by equality otherwise, treating ambiguous equality
+(like of NumPy arrays) as false, "id" compares them by identity only, never calling their equality, and "buffer"
+compares values exposing a buffer (like NumPy arrays) by a digest of their buffer. Values fingerprinted by a
+pytest_inject_fingerprint hook implementation are compared by their fingerprint instead.
+Usage:
+pytest --inject-dict path/to/arrays.py::injected_args --inject-fingerprint buffer
+'''
+
+INJECT_STRICT_HELP_STRING = '''
+Fails the test session right after the collection, before any test runs, if an injected argument was
+not consumed by any collected test, or an injected value does not match the annotations of the test
+and fixtures consuming it, or the types of the parameter sets it is injected into.
+Usage:
+pytest --inject-json '{"my_arg": "my_value"}' --inject-strict
+'''
+
+INJECT_SHORT_IDS_HELP_STRING = '''
+Gives injected values short and stable ids in the test node ids, "inj-" followed by a digest of the
+value, instead of ids generated from the value itself, which can be very long for long strings.
+The injected argument names of every short id are written to pytest's cache, under "pytest_inject/short_ids".
+Usage:
+pytest --inject-json path/to/large_injection.json --inject-short-ids
+'''
+
+INJECT_SCOPE_HELP_STRING = '''
+The pytest scope of the parametrization created for injected arguments that are not parameterize
+marker arguments, such as injected fixtures: function (default), class, module, package, session,
+or auto, the scope of the fixture the injected argument overrides. Higher-scoped fixtures depending
+on injected fixtures are then shared between tests, as they are without injection.
+The scope of specific arguments can be set in the injected arguments, under "__inject_scope__".
+Usage:
+pytest --inject-json '{"db_url": "sqlite://", "__inject_scope__": {"db_url": "session"}}'
+pytest --inject-json '{"db_url": "sqlite://"}' --inject-scope auto
+'''
+
+INJECT_MATRIX_HELP_STRING = '''
+Sweeps injected arguments over lists of candidate values, given as a JSON string or a path to a JSON file.
+Every test consuming matrix arguments is run once for every combination of the candidate values of the
+arguments it consumes (or of the candidate values at the same index, with --inject-matrix-mode zip).
+Can be used together with --inject-json or --inject-dict, injecting the same values into all combinations.
+Usage:
+pytest --inject-matrix '{"batch_size": [16, 32, 64], "pool_size": [1, 4]}'
+'''
+
+INJECT_MATRIX_MODE_HELP_STRING = '''
+How --inject-matrix candidate values are combined: product (default), for every combination of them,
+or zip, for the candidate values at the same index of every argument.
+'''
+
+INJECT_PROFILE_HELP_STRING = '''
+Profiles the injection, reporting in the terminal summary the time taken to resolve the injection inputs,
+and the slowest test functions by injection time, with the parameterize markers rewritten, the parameter
+sets before and after the removal of duplicates, and the equality comparisons done to find duplicates.
+Usage:
+pytest --inject-json '{"my_arg": "my_value"}' --inject-profile
+'''
+
+INJECT_PROFILE_JSON_HELP_STRING = '''
+Profiles the injection like --inject-profile, and writes the profile of every injected test function
+to the given path as JSON.
+Usage:
+pytest --inject-json '{"my_arg": "my_value"}' --inject-profile-json inject-profile.json
+'''
@@ -0,0 +1,19 @@
+"""
+Module containing the hook specifications pytest-inject adds to pytest,
+registered by the pytest-inject entry point plugin.
+"""
+import pytest
+
+
+@pytest.hookspec(firstresult=True)
+def pytest_inject_fingerprint(value):
+    """
+    Returns a hashable fingerprint of a parameter value, compared instead of the value
+    itself when removing injection caused duplicates, or None to leave the value to the
+    --inject-fingerprint strategy. Two values must have equal fingerprints exactly when
+    they should be treated as duplicates.
+    Called for values that are not of a builtin type only, like NumPy arrays and
+    DataFrames, whose equality is slow or ambiguous.
+
+    :param value: The parameter value to fingerprint.
+    """
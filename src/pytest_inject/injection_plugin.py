@@ -0,0 +1,464 @@
+"""
+Module containing the plugin injecting arguments into the collected tests.
+It is registered by the pytest-inject entry point plugin only for test
+sessions that were given an injection input.
+"""
+from collections import Counter
+from contextlib import nullcontext
+from itertools import chain
+
+import pytest
+
+from pytest_inject.deduplication import activate_value_fingerprinter
+from pytest_inject.exceptions import PytestInjectError
+from pytest_inject.fingerprints import IDENTITY_STRATEGY, get_value_fingerprinter
+from pytest_inject.injector import (
+    inject_test_argument_variants,
+    inject_test_arguments,
+    restore_inherited_markers,
+)
+from pytest_inject.layers import INJECT_SCOPE_PAYLOAD_KEY
+from pytest_inject.matrix import iter_matrix_variants
+from pytest_inject.profiling import InjectionProfile, activate_profile
+from pytest_inject.routing import NodeIdPayloadIndex, is_node_id_pattern
+from pytest_inject.scopes import INJECT_SCOPES
+from pytest_inject.short_ids import InjectedValuesShortIds, store_short_ids
+from pytest_inject.sources import resolve_batch_input, resolve_injection_input, resolve_matrix_input
+from pytest_inject.strict import StrictInjectionValidator
+from pytest_inject.worker_payload import WorkerPayloadSender, load_worker_payload
+
+# Magic constants
+BATCH_VARIANT_ID_PREFIX = "inject-batch-"
+
+
+class InjectionPlugin:
+    """
+    Holds the injection input, resolved once for the whole test session,
+    and injects it into every collected test consuming any of it.
+    Under pytest-xdist, the input is resolved once by the controller and sent
+    to the workers.
+    """
+
+    def __init__(self, config):
+        self.config = config
+
+        self.profile_json_path = config.getoption("inject_profile_json", default=None)
+        self.profile = None
+        if config.getoption("inject_profile", default=False) or self.profile_json_path:
+            self.profile = InjectionProfile()
+            activate_profile(self.profile)
+
+        # The seconds every concurrently resolved value of the --inject-dict dict took, shown in verbose mode.
+        self.dict_timings = {}
+        with self._time_profile_section("resolve injection input"):
+            worker_payload = load_worker_payload(config)
+            if worker_payload is None:
+                worker_payload = (
+                    resolve_injection_input(config, self.dict_timings),
+                    resolve_batch_input(config),
+                    resolve_matrix_input(config),
+                )
+
+        self._worker_payload = worker_payload
+        injected_args, self.batch_payloads, self.matrix = worker_payload
+
+        self.allow_arg_values_duplication = config.getoption("inject_allow_dup", default=False)
+        self.fingerprint_strategy = config.getoption("inject_fingerprint", default=None) or IDENTITY_STRATEGY
+        self._fingerprint_hookimpls_count = None
+        self.matrix_mode = config.getoption("inject_matrix_mode", default=None)
+        self.inject_only = config.getoption("inject_only", default=False)
+        self.use_short_ids = config.getoption("inject_short_ids", default=False)
+        self.injected_values_short_ids = None
+        self._short_ids_arg_names = {}
+        self._injected_tests_nodeids = set()
+        self._injection_plans_cache = {}
+        self._hidden_inherited_markers = []
+        self.default_scope = config.getoption("inject_scope", default=None)
+        self.strict = config.getoption("inject_strict", default=False)
+        self.strict_validator = None
+        self.set_injected_args(injected_args)
+        self._update_value_fingerprinter()
+
+        self._batch_variants_line_numbers = {
+            f"{BATCH_VARIANT_ID_PREFIX}{line_number}": line_number
+            for line_number in self.batch_payloads.line_numbers
+        }
+        self._tests_batch_parameter_sets = {}
+        self._items_batch_line_numbers = {}
+        self._batch_lines_outcomes = {line_number: Counter() for line_number in self.batch_payloads.line_numbers}
+        self._worker_payload_sender = None
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_configure_node(self, node):
+        if self._worker_payload_sender is None:
+            self._worker_payload_sender = WorkerPayloadSender(self._worker_payload)
+
+        self._worker_payload_sender.add_to_worker_input(node.workerinput)
+
+    def pytest_unconfigure(self):
+        if self._worker_payload_sender is not None:
+            self._worker_payload_sender.close()
+
+        activate_value_fingerprinter(None)
+
+        if self.profile is not None:
+            activate_profile(None)
+            if self.profile_json_path:
+                self.profile.dump(self.profile_json_path)
+
+    def _update_value_fingerprinter(self):
+        """
+        Activates the fingerprinter of the parameter values, with the pytest_inject_fingerprint
+        hook if it is implemented. Conftest files implementing the hook may be collected
+        after the test session is configured, so it is updated when they register.
+        """
+        fingerprint_hook = self.config.hook.pytest_inject_fingerprint
+        fingerprint_hookimpls_count = len(fingerprint_hook.get_hookimpls())
+        if fingerprint_hookimpls_count == self._fingerprint_hookimpls_count:
+            return
+
+        self._fingerprint_hookimpls_count = fingerprint_hookimpls_count
+        activate_value_fingerprinter(get_value_fingerprinter(
+            fingerprint_hook if fingerprint_hookimpls_count else None,
+            self.fingerprint_strategy,
+        ))
+        # Injection plans deduplicated with the previous fingerprinter are not reused.
+        self._injection_plans_cache.clear()
+
+    def set_injected_args(self, injected_args):
+        """
+        Replaces the injected arguments, for the tests generated from now on.
+        The scopes of the injected arguments are taken from the "__inject_scope__"
+        key of the injected arguments, if present, or else from --inject-scope.
+        Keys holding a node id separator or a glob character are node id globs or prefixes, holding
+        the injected arguments of the tests they match, overriding the other arguments.
+        """
+        # Copied without reading the values, which lazily resolved inputs decode only when read.
+        self.injected_args = injected_args.copy()
+        self._injection_plans_cache.clear()
+        payload_scopes = self.injected_args.pop(INJECT_SCOPE_PAYLOAD_KEY, {})
+        _validate_payload_scopes(payload_scopes)
+
+        self.scoped_injected_args = {
+            pattern: self.injected_args.pop(pattern)
+            for pattern in list(self.injected_args)
+            if is_node_id_pattern(pattern)
+        }
+        _validate_scoped_injected_args(self.scoped_injected_args)
+        self._scoped_injected_args_index = (
+            NodeIdPayloadIndex(self.scoped_injected_args) if self.scoped_injected_args else None
+        )
+
+        scoped_arg_names = dict.fromkeys(chain.from_iterable(self.scoped_injected_args.values()))
+        self.injected_args_scopes = {
+            arg_name: payload_scopes.get(arg_name, self.default_scope)
+            for arg_name in chain(self.injected_args, scoped_arg_names)
+        }
+        self.injected_arg_names = frozenset(chain(
+            self.injected_args,
+            scoped_arg_names,
+            self.matrix,
+            self.batch_payloads.arg_names,
+        ))
+
+        if self.use_short_ids:
+            self.injected_values_short_ids = InjectedValuesShortIds(self.iter_injected_args_dicts())
+            self._store_short_ids()
+
+        if self.strict:
+            self.strict_validator = StrictInjectionValidator()
+
+    def _store_short_ids(self):
+        self._short_ids_arg_names.update(self.injected_values_short_ids.short_ids_arg_names)
+        # Workers give the same short ids, so only the controller or a single process stores them.
+        if not hasattr(self.config, "workerinput"):
+            store_short_ids(self.config, self._short_ids_arg_names)
+
+    def iter_injected_args_dicts(self):
+        """
+        Iterates over the dicts of injected arguments, the unscoped one followed by the node id scoped ones.
+        """
+        yield self.injected_args
+        yield from self.scoped_injected_args.values()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_generate_tests(self, metafunc):
+        self._generate_injected_test(metafunc)
+        yield
+        # Inherited parameterize markers are hidden only until pytest parametrizes the test with the rest.
+        restore_inherited_markers(self._hidden_inherited_markers)
+
+    def _generate_injected_test(self, metafunc):
+        consumed_arg_names = self.injected_arg_names.intersection(metafunc.fixturenames)
+        if not consumed_arg_names:
+            return
+
+        self._update_value_fingerprinter()
+
+        if self.profile is None:
+            test_injected = self._inject_test(metafunc, consumed_arg_names)
+        else:
+            with self.profile.profile_test(metafunc.definition.nodeid):
+                test_injected = self._inject_test(metafunc, consumed_arg_names)
+
+        if test_injected:
+            self._injected_tests_nodeids.add(metafunc.definition.nodeid)
+
+    def _inject_test(self, metafunc, consumed_arg_names) -> bool:
+        """
+        Injects the injected arguments consumed by the test, returning whether any were injected.
+        """
+        if self.batch_payloads:
+            if self.strict_validator is not None:
+                self._validate_batch_payloads(metafunc, consumed_arg_names)
+
+            self._inject_batch_payloads(metafunc, consumed_arg_names)
+            return True
+
+        # Only the consumed values are looked up and read, as lazily resolved inputs decode values when read.
+        # They are looked up in the order of the test fixture names, as the consumed names are a set.
+        injected_args = {
+            arg_name: self.injected_args[arg_name] for arg_name in metafunc.fixturenames
+            if arg_name in consumed_arg_names and arg_name in self.injected_args
+        }
+        if self._scoped_injected_args_index is not None:
+            injected_args.update(
+                (arg_name, injected_value) for arg_name, injected_value
+                in self._scoped_injected_args_index.get_injected_args(metafunc.definition.nodeid).items()
+                if arg_name in consumed_arg_names
+            )
+
+        consumed_matrix_arg_names = [arg_name for arg_name in self.matrix if arg_name in consumed_arg_names]
+        if self.strict_validator is not None:
+            self._validate_injected_args(metafunc, injected_args, consumed_matrix_arg_names)
+
+        if consumed_matrix_arg_names:
+            self._inject_matrix(metafunc, injected_args, consumed_matrix_arg_names)
+            return True
+
+        if not injected_args:
+            return False
+
+        inject_test_arguments(
+            metafunc,
+            injected_args,
+            self.allow_arg_values_duplication,
+            self.injected_args_scopes,
+            self.injected_values_short_ids,
+            self._injection_plans_cache,
+            self._hidden_inherited_markers,
+        )
+
+        return True
+
+    def pytest_make_parametrize_id(self, val, argname):
+        if self.injected_values_short_ids is not None:
+            return self.injected_values_short_ids.get_id(val, argname)
+
+        return None
+
+    def pytest_collection_finish(self):
+        # Lazily decoded values are given short ids only once the tests consuming them are generated.
+        if self.injected_values_short_ids is not None:
+            self._store_short_ids()
+
+        # Reported right after the collection, so a wrong injection input fails before any test runs.
+        if self.strict_validator is not None:
+            self.strict_validator.raise_for_problems(chain(
+                [(None, self.injected_args), (None, self.matrix)],
+                [(None, self.batch_payloads.arg_names)],
+                self.scoped_injected_args.items(),
+            ))
+
+    def _validate_injected_args(self, metafunc, injected_args, consumed_matrix_arg_names):
+        """
+        Records the injected arguments and matrix arguments consumed by the test for --inject-strict,
+        and validates their values against the annotations and parameter sets of the test.
+        """
+        scoped_patterns = []
+        if self._scoped_injected_args_index is not None:
+            patterns = list(self.scoped_injected_args)
+            scoped_patterns = [
+                patterns[pattern_index] for pattern_index
+                in self._scoped_injected_args_index.get_matching_pattern_indexes(metafunc.definition.nodeid)
+            ]
+
+        self.strict_validator.record_consumed(chain(injected_args, consumed_matrix_arg_names), scoped_patterns)
+        self.strict_validator.validate_injected_values(metafunc, chain(
+            injected_args.items(),
+            (
+                (arg_name, candidate) for arg_name in consumed_matrix_arg_names
+                for candidate in self.matrix[arg_name]
+            ),
+        ))
+
+    def _validate_batch_payloads(self, metafunc, consumed_arg_names):
+        """
+        Records the batch payloads arguments consumed by the test for --inject-strict,
+        and validates their values against the annotations and parameter sets of the test.
+        """
+        for _, payload in self.batch_payloads:
+            consumed_payload_args = {
+                arg_name: injected_value for arg_name, injected_value in payload.items()
+                if arg_name in consumed_arg_names
+            }
+            self.strict_validator.record_consumed(consumed_payload_args)
+            self.strict_validator.validate_injected_values(metafunc, consumed_payload_args.items())
+
+    def pytest_collection_modifyitems(self, items):
+        if self.inject_only:
+            self._deselect_not_injected_items(items)
+
+        if not self._tests_batch_parameter_sets:
+            return
+
+        for item in items:
+            callspec = getattr(item, "callspec", None)
+            if callspec is None:
+                continue
+
+            test_nodeid = f"{item.parent.nodeid}::{item.originalname}"
+            batch_parameter_sets = self._tests_batch_parameter_sets.get(test_nodeid)
+            if batch_parameter_sets is None:
+                continue
+
+            first_arg_name, parameter_sets_variant_ids = batch_parameter_sets
+            variant_id = parameter_sets_variant_ids[callspec.indices[first_arg_name]]
+            self._items_batch_line_numbers[item.nodeid] = self._batch_variants_line_numbers[variant_id]
+
+    def _deselect_not_injected_items(self, items):
+        """
+        Deselects the items of the tests no injected argument was injected into.
+        """
+        injected_items = []
+        not_injected_items = []
+        for item in items:
+            test_nodeid = f"{item.parent.nodeid}::{getattr(item, 'originalname', item.name)}"
+            if test_nodeid in self._injected_tests_nodeids:
+                injected_items.append(item)
+            else:
+                not_injected_items.append(item)
+
+        if not_injected_items:
+            self.config.hook.pytest_deselected(items=not_injected_items)
+            items[:] = injected_items
+
+    def pytest_runtest_logreport(self, report):
+        line_number = self._items_batch_line_numbers.get(report.nodeid)
+        if line_number is None:
+            return
+
+        category, _, _ = self.config.hook.pytest_report_teststatus(report=report, config=self.config)
+        if category:
+            self._batch_lines_outcomes[line_number][category] += 1
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.profile is not None:
+            self.profile.write_summary(terminalreporter)
+
+        if self.dict_timings and self.config.getoption("verbose") > 0:
+            terminalreporter.write_sep("=", "pytest-inject dict values timings")
+            for key, seconds in sorted(self.dict_timings.items(), key=lambda timing: timing[1], reverse=True):
+                terminalreporter.write_line(f"{key}: {seconds:.3f}s")
+
+        if not self.batch_payloads:
+            return
+
+        terminalreporter.write_sep("=", "pytest-inject batch results")
+        for line_number, line_outcomes in self._batch_lines_outcomes.items():
+            if line_outcomes:
+                outcomes_summary = ", ".join(
+                    f"{count} {category}" for category, count in line_outcomes.items()
+                )
+            else:
+                outcomes_summary = "no test was run"
+
+            terminalreporter.write_line(f"line {line_number}: {outcomes_summary}")
+
+    def _time_profile_section(self, section_name):
+        if self.profile is None:
+            return nullcontext()
+
+        return self.profile.time_section(section_name)
+
+    def _inject_matrix(self, metafunc, injected_args, consumed_matrix_arg_names):
+        """
+        Injects every combination of the candidate values of the matrix arguments consumed
+        by the test as its own variant of it, along with the other injected arguments.
+        The combinations are generated one at a time, while the test is parametrized.
+        All of them are parametrized, even if -k keeps only a few, as pytest deselects
+        tests by keyword only once they are collected.
+        """
+        matrix_variants = (
+            (variant_id, {**injected_args, **variant_args})
+            for variant_id, variant_args in iter_matrix_variants(
+                self.matrix,
+                consumed_matrix_arg_names,
+                self.matrix_mode,
+                self.allow_arg_values_duplication,
+            )
+        )
+
+        inject_test_argument_variants(
+            metafunc,
+            matrix_variants,
+            self.allow_arg_values_duplication,
+            injected_arg_names=chain(injected_args, consumed_matrix_arg_names),
+            hidden_inherited_markers=self._hidden_inherited_markers,
+        )
+
+    def _inject_batch_payloads(self, metafunc, consumed_arg_names):
+        """
+        Injects every batch payload consumed by the test as its own variant of it.
+        """
+        batch_variants = (
+            (
+                f"{BATCH_VARIANT_ID_PREFIX}{line_number}",
+                {
+                    arg_name: injected_value for arg_name, injected_value in payload.items()
+                    if arg_name in consumed_arg_names
+                },
+            )
+            for line_number, payload in self.batch_payloads
+        )
+
+        self._tests_batch_parameter_sets[metafunc.definition.nodeid] = inject_test_argument_variants(
+            metafunc,
+            (
+                (variant_id, variant_args) for variant_id, variant_args in batch_variants
+                if variant_args
+            ),
+            self.allow_arg_values_duplication,
+            hidden_inherited_markers=self._hidden_inherited_markers,
+        )
+
+
+def _validate_payload_scopes(payload_scopes):
+    """
+    Validates the "__inject_scope__" key of the injected arguments is a dict
+    of argument names and valid scopes.
+    """
+    if not isinstance(payload_scopes, dict):
+        raise PytestInjectError(
+            f"pytest-inject: expected a dict of argument names and scopes in '{INJECT_SCOPE_PAYLOAD_KEY}', "
+            f"got {type(payload_scopes)} instead."
+        )
+
+    for arg_name, scope in payload_scopes.items():
+        if scope not in INJECT_SCOPES:
+            raise PytestInjectError(
+                f"pytest-inject: Invalid scope '{scope}' for '{arg_name}' in '{INJECT_SCOPE_PAYLOAD_KEY}', "
+                f"expected one of {list(INJECT_SCOPES)}."
+            )
+
+
+def _validate_scoped_injected_args(scoped_injected_args):
+    """
+    Validates the node id scoped keys of the injected arguments hold dicts of injected arguments.
+    """
+    for pattern, injected_args in scoped_injected_args.items():
+        if not isinstance(injected_args, dict):
+            raise PytestInjectError(
+                f"pytest-inject: expected a dict of injected arguments for the node id pattern '{pattern}', "
+                f"got {type(injected_args)} instead."
+            )
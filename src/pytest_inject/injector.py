@@ -1,19 +1,45 @@
-from typing import Any, Dict, Generator, List, Optional, Union
+import warnings
+from itertools import product
 
-from _pytest.mark import Mark
+import pytest
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from _pytest.mark import Mark, ParameterSet
+from _pytest.nodes import Node
 from _pytest.python import Metafunc
 
+from pytest_inject.deduplication import find_duplicated_elements, find_first_occurrence_indexes
+from pytest_inject.exceptions import PytestInjectError, PytestInjectWarning
+from pytest_inject.profiling import (
+    MARKERS_REWRITTEN_STAT,
+    PARAMETER_SETS_AFTER_DEDUP_STAT,
+    PARAMETER_SETS_BEFORE_DEDUP_STAT,
+    PLAN_CACHE_HITS_STAT,
+    PLAN_CACHE_MISSES_STAT,
+    count_profile_stat,
+)
+from pytest_inject.scopes import AUTO_SCOPE
+from pytest_inject.short_ids import InjectedValuesShortIds
+
 # Magic constants
 PARAMETERIZE_MARKER_TAG = "parametrize"
 ARG_NAMES_INDEX = 0
 ARG_VALUES_INDEX = 1
 COMMA_CHAR = ','
+MERGED_IDS_SEPARATOR = "+"
+MERGED_IDS_MAX_COUNT = 3
+# The private Metafunc helper resolving the ids pytest gives parameter sets.
+RESOLVE_PARAMETER_SET_IDS_METHOD = "_resolve_parameter_set_ids"
 
 
 def inject_test_arguments(
         test_metafunc: Metafunc,
         injected_args: Dict[str, Any],
         allow_arg_values_duplication=False,
+        injected_args_scopes: Optional[Dict[str, Optional[str]]] = None,
+        injected_values_short_ids: Optional[InjectedValuesShortIds] = None,
+        injection_plans_cache: Optional[Dict[Tuple, Tuple[Mark, Dict[str, Any], Mark]]] = None,
+        hidden_inherited_markers: Optional[List[Tuple[Node, Mark, int]]] = None,
 ):
     """
     Injects arguments into the test function represented by test_metafunc,
@@ -21,32 +47,65 @@ def inject_test_arguments(
     new parameterization for non-parameterized injected arguments.
     Removes duplicated parameter sets when duplication was not present before
     injection, unless allow_arg_values_duplication is set to True.
+    Parameterize markers inherited from a class or a module are hidden from their
+    class or module node only until the test is parametrized.
 
     :param test_metafunc: The pytest Metafunc object of the injected test.
     :param allow_arg_values_duplication: if True disable filtering of duplicated parameter
             sets, that were caused by injection.
     :param injected_args: A dictionary of argument names and their injected values.
+    :param injected_args_scopes: A dictionary of argument names and the pytest scope the new
+            parameterization of non-parameterized injected arguments is done with. The "auto"
+            scope is the scope of the fixture the injected argument overrides. Arguments with
+            no scope are parameterized with the function scope.
+    :param injected_values_short_ids: The short ids of the injected values, given to the parameter
+            sets they are injected into instead of the ids pytest generates, if given.
+    :param injection_plans_cache: A dictionary the parameterize markers recreated with the injected
+            arguments are cached in, shared by the tests whose markers hold the same arguments, so
+            each is recreated once for all of them.
+    :param hidden_inherited_markers: A list the inherited parameterize markers hidden from
+            their class or module nodes are added to, to be restored by restore_inherited_markers
+            once the test is parametrized. If None, the inherited markers are removed for good.
     """
     left_injections = injected_args.copy()
 
-    for marker in test_metafunc.definition.iter_markers(PARAMETERIZE_MARKER_TAG):
+    # The markers are listed first, as the injected ones are removed from their nodes while iterating.
+    markers_with_nodes = list(test_metafunc.definition.iter_markers_with_node(PARAMETERIZE_MARKER_TAG))
+    for marker_owner, marker in markers_with_nodes:
         marker_arg_names = _get_parameterize_arg_names(marker)
         marker_injected_args = {
             arg_name: injected_value for arg_name, injected_value in injected_args.items()
             if arg_name in marker_arg_names
         }
 
-        if marker_injected_args:
+        if not marker_injected_args:
+            continue
+
+        if marker_owner is not test_metafunc.definition:
+            _inject_inherited_parameterized_marker(
+                marker_owner,
+                marker,
+                marker_arg_names,
+                marker_injected_args,
+                allow_arg_values_duplication,
+                test_metafunc,
+                injected_values_short_ids,
+                injection_plans_cache,
+                hidden_inherited_markers,
+            )
+        else:
             _injected_parameterized_marker(
                 marker,
                 marker_arg_names,
                 marker_injected_args,
                 allow_arg_values_duplication,
                 test_metafunc,
+                injected_values_short_ids,
+                injection_plans_cache,
             )
 
-            for injected_argument in marker_injected_args.keys():
-                del left_injections[injected_argument]
+        for injected_argument in marker_injected_args.keys():
+            del left_injections[injected_argument]
 
     injections_left_in_test = {
         argument_name: value for argument_name, value in left_injections.items()
@@ -54,18 +113,210 @@ def inject_test_arguments(
     }
 
     if injections_left_in_test:
+        _parametrize_injected_fixtures(
+            test_metafunc,
+            injections_left_in_test,
+            injected_args_scopes or {},
+        )
+
+
+def inject_test_argument_variants(
+        test_metafunc: Metafunc,
+        variants: Iterable[Tuple[str, Dict[str, Any]]],
+        allow_arg_values_duplication=False,
+        injected_arg_names: Optional[Iterable[str]] = None,
+        hidden_inherited_markers: Optional[List[Tuple[Node, Mark, int]]] = None,
+) -> Tuple[str, List[str]]:
+    """
+    Injects several variants of injected arguments into the test function
+    represented by test_metafunc, creating the parameter sets of each variant
+    the same way inject_test_arguments does, and parametrizing the test once
+    with the parameter sets of all variants, identified by their variant ids.
+    The parameterize markers of the injected arguments are merged into that
+    single parametrization, so each test instance gets the values of one variant.
+    Injected fixtures and indirect arguments cannot be left to their original
+    values by some of the variants, so they must be injected by all of them.
+
+    :param test_metafunc: The pytest Metafunc object of the injected test.
+    :param variants: Pairs of a variant id, and a dictionary of argument names and
+            their injected values.
+    :param allow_arg_values_duplication: if True disable filtering of duplicated parameter
+            sets, that were caused by injection.
+    :param injected_arg_names: The names of the arguments injected by the variants, if known
+            in advance, letting the variants be consumed one at a time instead of all at once.
+    :param hidden_inherited_markers: A list the merged parameterize markers inherited from a class
+            or a module are added to, as inject_test_arguments does.
+    :return: The name of the first parametrized argument, and the variant id of each of
+            the created parameter sets, by their parameter index.
+    """
+    if injected_arg_names is None:
+        variants = list(variants)
+        injected_arg_names = dict.fromkeys(
+            arg_name for _, variant_args in variants for arg_name in variant_args
+        )
+    else:
+        injected_arg_names = dict.fromkeys(injected_arg_names)
+
+    injected_markers = []
+    inherited_injected_markers = []
+    for marker_owner, marker in test_metafunc.definition.iter_markers_with_node(PARAMETERIZE_MARKER_TAG):
+        marker_arg_names = _get_parameterize_arg_names(marker)
+        if any(arg_name in injected_arg_names for arg_name in marker_arg_names):
+            injected_markers.append((marker, marker_arg_names))
+            if marker_owner is not test_metafunc.definition:
+                inherited_injected_markers.append((marker_owner, marker))
+
+    markers_arg_names = [
+        arg_name for _, marker_arg_names in injected_markers for arg_name in marker_arg_names
+    ]
+    fixture_arg_names = [
+        arg_name for arg_name in injected_arg_names
+        if arg_name not in markers_arg_names
+    ]
+
+    variants_indirect_arg = []
+    variants_required_arg_names = list(fixture_arg_names)
+    for marker, marker_arg_names in injected_markers:
+        marker_indirect_arg = marker.kwargs.get("indirect", False)
+        variants_required_arg_names.extend(
+            arg_name for arg_name in injected_arg_names
+            if arg_name in marker_arg_names
+            and (marker_indirect_arg is True or arg_name in (marker_indirect_arg or []))
+        )
+
+        variants_indirect_arg.extend(
+            _adjust_marker_indirect_arg_for_injection(
+                marker_indirect_arg,
+                marker_arg_names,
+                injected_arg_names
+            ) or []
+        )
+
+    markers_scopes = {marker.kwargs.get("scope", None) for marker, _ in injected_markers}
+    variants_scope = markers_scopes.pop() if len(markers_scopes) == 1 else None
+
+    markers_parameter_sets = [
+        _get_marker_parameter_sets(marker, marker_arg_names) for marker, marker_arg_names in injected_markers
+    ]
+    # The duplication of the original parameter sets is the same for all variants.
+    markers_sets_duplicated = [
+        None if allow_arg_values_duplication else find_duplicated_elements(
+            [parameter_set.values for parameter_set in marker_parameter_sets]
+        )
+        for marker_parameter_sets in markers_parameter_sets
+    ]
+
+    variants_arg_values = []
+    variants_ids = []
+    parameter_sets_variant_ids = []
+    for variant_id, variant_args in variants:
+        missing_arg_names = [
+            arg_name for arg_name in variants_required_arg_names
+            if arg_name not in variant_args
+        ]
+        if missing_arg_names:
+            raise PytestInjectError(
+                f"pytest-inject: variant '{variant_id}' does not inject {missing_arg_names} into "
+                f"'{test_metafunc.definition.nodeid}', while other variants do. Injected fixtures and "
+                f"indirect arguments cannot keep their original values, so all variants must inject them."
+            )
+
+        markers_injected_parameter_sets = [
+            _get_injected_marker_parameter_sets(
+                marker_parameter_sets,
+                marker_arg_names,
+                variant_args,
+                allow_arg_values_duplication,
+                marker_sets_duplicated,
+            )
+            for (_, marker_arg_names), marker_parameter_sets, marker_sets_duplicated
+            in zip(injected_markers, markers_parameter_sets, markers_sets_duplicated)
+        ]
+        fixture_arg_values = tuple(variant_args[arg_name] for arg_name in fixture_arg_names)
+
+        # The marks of the merged parameter sets are kept, while their ids are replaced by the variant ids.
+        variant_arg_values = [
+            pytest.param(
+                *sum((parameter_set.values for parameter_set in parameter_sets), ()),
+                *fixture_arg_values,
+                marks=[mark for parameter_set in parameter_sets for mark in parameter_set.marks],
+            )
+            for parameter_sets in product(*markers_injected_parameter_sets)
+        ]
+
+        for arg_values_index, arg_values in enumerate(variant_arg_values):
+            variants_arg_values.append(arg_values)
+            variants_ids.append(
+                variant_id if len(variant_arg_values) == 1 else f"{variant_id}-{arg_values_index}"
+            )
+            parameter_sets_variant_ids.append(variant_id)
+
+    variants_arg_names = markers_arg_names + fixture_arg_names
+
+    test_metafunc.parametrize(
+        COMMA_CHAR.join(variants_arg_names),
+        variants_arg_values,
+        indirect=variants_indirect_arg,
+        ids=variants_ids,
+        scope=variants_scope,
+    )
+
+    test_metafunc.definition.own_markers[:] = [
+        marker for marker in test_metafunc.definition.own_markers
+        if not any(marker is injected_marker for injected_marker, _ in injected_markers)
+    ]
+    for marker_owner, marker in inherited_injected_markers:
+        _hide_inherited_marker(marker_owner, marker, hidden_inherited_markers)
+    count_profile_stat(MARKERS_REWRITTEN_STAT, len(injected_markers))
+
+    return variants_arg_names[0], parameter_sets_variant_ids
+
+
+def _parametrize_injected_fixtures(
+        test_metafunc: Metafunc,
+        injected_fixtures: Dict[str, Any],
+        injected_args_scopes: Dict[str, Optional[str]],
+):
+    """
+    Parameterizes the injected arguments that are not parameterize markers arguments,
+    once for every scope they are injected with.
+    """
+    scopes_injected_fixtures = {}
+    for arg_name, injected_value in injected_fixtures.items():
+        scope = injected_args_scopes.get(arg_name, None)
+        if scope == AUTO_SCOPE:
+            scope = _get_overridden_fixture_scope(test_metafunc, arg_name)
+
+        scopes_injected_fixtures.setdefault(scope, {})[arg_name] = injected_value
+
+    for scope, scope_injected_fixtures in scopes_injected_fixtures.items():
         test_metafunc.parametrize(
-            tuple(injections_left_in_test.keys()),
-            [tuple(injections_left_in_test.values())],
+            tuple(scope_injected_fixtures.keys()),
+            [tuple(scope_injected_fixtures.values())],
+            scope=scope,
         )
 
 
+def _get_overridden_fixture_scope(test_metafunc: Metafunc, arg_name: str) -> Optional[str]:
+    """
+    Helper to get the scope of the fixture an injected argument overrides,
+    or None if it does not override any fixture.
+    """
+    fixture_defs = test_metafunc._arg2fixturedefs.get(arg_name, None)
+    if not fixture_defs:
+        return None
+
+    return fixture_defs[-1].scope
+
+
 def _injected_parameterized_marker(
         marker: Mark,
         marker_arg_names: List[str],
         marker_injected_args: Dict[str, Any],
         allow_arg_values_duplication: bool,
         test_metafunc: Metafunc,
+        injected_values_short_ids: Optional[InjectedValuesShortIds] = None,
+        injection_plans_cache: Optional[Dict[Tuple, Tuple[Mark, Dict[str, Any], Mark]]] = None,
 ):
     """
     Injects arguments into a parameterize marker, by recreating it with
@@ -73,7 +324,131 @@ def _injected_parameterized_marker(
     caused duplicates if needed, removing the old marker, and replacing
     with the new.
     """
-    old_marker_arg_values = marker.args[ARG_VALUES_INDEX]
+    new_marker = _get_injection_plan(
+        marker,
+        marker_arg_names,
+        marker_injected_args,
+        allow_arg_values_duplication,
+        test_metafunc,
+        injected_values_short_ids,
+        injection_plans_cache,
+    )
+
+    _replace_parameterize_marker(marker, new_marker, test_metafunc)
+
+
+def _inject_inherited_parameterized_marker(
+        marker_owner: Node,
+        marker: Mark,
+        marker_arg_names: List[str],
+        marker_injected_args: Dict[str, Any],
+        allow_arg_values_duplication: bool,
+        test_metafunc: Metafunc,
+        injected_values_short_ids: Optional[InjectedValuesShortIds] = None,
+        injection_plans_cache: Optional[Dict[Tuple, Tuple[Mark, Dict[str, Any], Mark]]] = None,
+        hidden_inherited_markers: Optional[List[Tuple[Node, Mark, int]]] = None,
+):
+    """
+    Injects arguments into a parameterize marker inherited from a class or a module,
+    by parametrizing the test with the marker recreated with the injected arguments,
+    and hiding the old marker from its owner node until the test is parametrized.
+    """
+    new_marker = _get_injection_plan(
+        marker,
+        marker_arg_names,
+        marker_injected_args,
+        allow_arg_values_duplication,
+        test_metafunc,
+        injected_values_short_ids,
+        injection_plans_cache,
+    )
+
+    test_metafunc.parametrize(*new_marker.args, **new_marker.kwargs)
+    _hide_inherited_marker(marker_owner, marker, hidden_inherited_markers)
+
+
+def _get_injection_plan(
+        marker: Mark,
+        marker_arg_names: List[str],
+        marker_injected_args: Dict[str, Any],
+        allow_arg_values_duplication: bool,
+        test_metafunc: Metafunc,
+        injected_values_short_ids: Optional[InjectedValuesShortIds] = None,
+        injection_plans_cache: Optional[Dict[Tuple, Tuple[Mark, Dict[str, Any], Mark]]] = None,
+) -> Mark:
+    """
+    Returns the injection plan of a parameterize marker: the marker recreated with the injected arguments.
+    Plans are cached by the arguments of the marker and the identities of the injected values,
+    so markers of different tests holding the same arguments table, like a shared decorator or
+    a class marker, are recreated once for all of them.
+    """
+    if injection_plans_cache is None:
+        return _get_injected_parameterize_marker(
+            marker,
+            marker_arg_names,
+            marker_injected_args,
+            allow_arg_values_duplication,
+            test_metafunc,
+            injected_values_short_ids,
+        )
+
+    plan_key = (
+        tuple(marker_arg_names),
+        tuple(_get_plan_key_element(marker_arg) for marker_arg in marker.args[ARG_VALUES_INDEX:]),
+        tuple(sorted(
+            (kwarg_name, _get_plan_key_element(kwarg_value)) for kwarg_name, kwarg_value in marker.kwargs.items()
+        )),
+        tuple((arg_name, id(injected_value)) for arg_name, injected_value in marker_injected_args.items()),
+    )
+    cached_plan = injection_plans_cache.get(plan_key)
+    if cached_plan is not None:
+        count_profile_stat(PLAN_CACHE_HITS_STAT)
+        _, _, new_marker = cached_plan
+        return new_marker
+
+    count_profile_stat(PLAN_CACHE_MISSES_STAT)
+    new_marker = _get_injected_parameterize_marker(
+        marker,
+        marker_arg_names,
+        marker_injected_args,
+        allow_arg_values_duplication,
+        test_metafunc,
+        injected_values_short_ids,
+    )
+    # The marker and the injected values are kept alive, so the identities in the key are never reused.
+    injection_plans_cache[plan_key] = (marker, marker_injected_args, new_marker)
+
+    return new_marker
+
+
+def _get_plan_key_element(value: Any) -> Any:
+    """
+    Helper to get the injection plan key element of a parameterize marker argument.
+    Names and flags, like the indirect and ids arguments, are compared by value, while any
+    other argument, like the arguments values table, is compared by identity, so its values
+    are not compared against the values of every other table on every lookup.
+    """
+    if isinstance(value, (str, bool, type(None))):
+        return type(value), value
+    elif isinstance(value, (list, tuple)) and all(isinstance(element, str) for element in value):
+        return type(value), tuple(value)
+
+    return id(value)
+
+
+def _get_injected_parameterize_marker(
+        marker: Mark,
+        marker_arg_names: List[str],
+        marker_injected_args: Dict[str, Any],
+        allow_arg_values_duplication: bool,
+        test_metafunc: Metafunc,
+        injected_values_short_ids: Optional[InjectedValuesShortIds] = None,
+) -> Mark:
+    """
+    Returns a parameterize marker recreated from an existing one, with the injected
+    arguments overriding existing ones, and injection caused duplicates deleted if needed.
+    """
+    old_marker_arg_values = _get_marker_parameter_sets(marker, marker_arg_names)
     new_marker_arg_values = _inject_arg_values(
         old_marker_arg_values,
         marker_arg_names,
@@ -88,60 +463,126 @@ def _injected_parameterized_marker(
 
     new_marker_ids_arg = marker.kwargs.get("ids", None)
 
+    count_profile_stat(PARAMETER_SETS_BEFORE_DEDUP_STAT, len(new_marker_arg_values))
     if not allow_arg_values_duplication:
-        new_marker_arg_values = list(
-            _remove_injection_caused_duplicates_from_injected_arg_values(
-                old_marker_arg_values,
-                new_marker_arg_values
-            )
+        kept_duplicate_indexes = _find_injection_caused_duplicates(
+            [parameter_set.values for parameter_set in old_marker_arg_values],
+            [parameter_set.values for parameter_set in new_marker_arg_values],
         )
 
-        # If duplicates were removed, reset the ids to None to avoid mismatches.
-        duplicates_were_removed = len(new_marker_arg_values) < len(old_marker_arg_values)
+        duplicates_were_removed = any(
+            kept_duplicate_index is not None for kept_duplicate_index in kept_duplicate_indexes
+        )
         if duplicates_were_removed:
-            new_marker_ids_arg = None
+            # The kept parameter sets keep their original ids, instead of ids generated from the injected values.
+            new_marker_ids_arg = _get_deduplicated_parameter_sets_ids(
+                marker,
+                marker_arg_names,
+                kept_duplicate_indexes,
+                test_metafunc,
+            )
+            new_marker_arg_values = [
+                arg_values_set for arg_values_set, kept_duplicate_index
+                in zip(new_marker_arg_values, kept_duplicate_indexes)
+                if kept_duplicate_index is None
+            ]
+    count_profile_stat(PARAMETER_SETS_AFTER_DEDUP_STAT, len(new_marker_arg_values))
 
-    old_marker_index = test_metafunc.definition.own_markers.index(marker)
-    _replace_parameterize_marker(
-        marker_arg_names,
+    if injected_values_short_ids is not None:
+        new_marker_ids_arg = injected_values_short_ids.get_ids_arg(new_marker_ids_arg, marker_injected_args)
+
+    count_profile_stat(MARKERS_REWRITTEN_STAT)
+
+    return pytest.mark.parametrize(
+        COMMA_CHAR.join(marker_arg_names),
         new_marker_arg_values,
-        new_marker_indirect_arg,
-        new_marker_ids_arg,
-        marker.kwargs.get("scope", None),
-        test_metafunc,
-        old_marker_index,
+        indirect=new_marker_indirect_arg,
+        ids=new_marker_ids_arg,
+        scope=marker.kwargs.get("scope", None),
+    ).mark
+
+
+def _get_injected_marker_parameter_sets(
+        marker_parameter_sets: List[ParameterSet],
+        marker_arg_names: List[str],
+        injected_args: Dict[str, Any],
+        allow_arg_values_duplication: bool,
+        none_injected_sets_duplicated: Optional[List[bool]] = None,
+) -> List[ParameterSet]:
+    """
+    Returns the parameter sets of a parameterize marker with the injected
+    arguments overriding existing ones.
+    The duplication of the original parameter sets can be given, when it is already known.
+    """
+    marker_injected_args = {
+        arg_name: injected_value for arg_name, injected_value in injected_args.items()
+        if arg_name in marker_arg_names
+    }
+    injected_parameter_sets = _inject_arg_values(
+        marker_parameter_sets,
+        marker_arg_names,
+        marker_injected_args
     )
 
+    count_profile_stat(PARAMETER_SETS_BEFORE_DEDUP_STAT, len(injected_parameter_sets))
+    if not allow_arg_values_duplication:
+        kept_duplicate_indexes = _find_injection_caused_duplicates(
+            [parameter_set.values for parameter_set in marker_parameter_sets],
+            [parameter_set.values for parameter_set in injected_parameter_sets],
+            none_injected_sets_duplicated,
+        )
+        injected_parameter_sets = [
+            parameter_set for parameter_set, kept_duplicate_index
+            in zip(injected_parameter_sets, kept_duplicate_indexes)
+            if kept_duplicate_index is None
+        ]
+    count_profile_stat(PARAMETER_SETS_AFTER_DEDUP_STAT, len(injected_parameter_sets))
 
-def _inject_arg_values(
-        arg_values: List[Any],
-        arg_names: List[str],
-        injections: Dict[str, Any],
-) -> List[Any]:
+    return injected_parameter_sets
+
+
+def _get_marker_parameter_sets(marker: Mark, marker_arg_names: List[str]) -> List[ParameterSet]:
     """
-    Injects the given injections into the argument values list, returning
-    a new list with the injected values.
+    Returns the parameter sets of a parameterize marker, with the values of each as a tuple.
+    Parameter sets given with pytest.param keep their marks and id.
     """
-    arg_values_injected = []
+    # As in pytest, the values of a single argument given by name are not tuples of values.
+    force_tuple = len(marker_arg_names) == 1 and isinstance(marker.args[ARG_NAMES_INDEX], str)
 
-    for arguments_values_set in arg_values:
-        if isinstance(arguments_values_set, (list, tuple)):
-            arg_values_set_injected = [arg_value for arg_value in arguments_values_set]
+    parameter_sets = []
+    for arg_values_set in marker.args[ARG_VALUES_INDEX]:
+        parameter_set = ParameterSet.extract_from(arg_values_set, force_tuple=force_tuple)
+        if not isinstance(parameter_set.values, tuple):
+            parameter_set = parameter_set._replace(values=tuple(parameter_set.values))
 
-            for arg_index in range(len(arguments_values_set)):
-                arg_name = arg_names[arg_index]
+        parameter_sets.append(parameter_set)
 
-                if arg_name in injections:
-                    arg_values_set_injected[arg_index] = injections[arg_name]
+    return parameter_sets
 
-            arg_values_injected.append(arg_values_set_injected)
-        else:
-            arg_name = arg_names[0]
 
-            if arg_name in injections:
-                arg_values_injected.append(injections[arg_name])
+def _inject_arg_values(
+        parameter_sets: List[ParameterSet],
+        arg_names: List[str],
+        injections: Dict[str, Any],
+) -> List[ParameterSet]:
+    """
+    Injects the given injections into the values of the parameter sets, returning
+    new parameter sets with the injected values, keeping their marks and ids.
+    """
+    arg_names_injections = [
+        (arg_index, injections[arg_name]) for arg_index, arg_name in enumerate(arg_names)
+        if arg_name in injections
+    ]
+
+    parameter_sets_injected = []
+    for parameter_set in parameter_sets:
+        arg_values_set_injected = list(parameter_set.values)
+        for arg_index, injected_value in arg_names_injections:
+            arg_values_set_injected[arg_index] = injected_value
+
+        parameter_sets_injected.append(parameter_set._replace(values=tuple(arg_values_set_injected)))
 
-    return arg_values_injected
+    return parameter_sets_injected
 
 
 def _adjust_marker_indirect_arg_for_injection(
@@ -162,37 +603,111 @@ def _adjust_marker_indirect_arg_for_injection(
     elif isinstance(old_indirect, (list, tuple)):
         return [
             arg_name for arg_name in old_indirect
-            if arg_name not in old_indirect
+            if arg_name not in injections_in_marker
         ]
     else:
         return False
 
 
-def _remove_injection_caused_duplicates_from_injected_arg_values(
+def _find_injection_caused_duplicates(
         none_injected_arg_values: List[Any],
         injected_arg_values: List[Any],
-) -> Generator[Any, Any, None]:
+        none_injected_sets_duplicated: Optional[List[bool]] = None,
+) -> List[Optional[int]]:
     """
-    Removes parameter sets from injected_arg_values that are duplicates
-    caused by the injection process, i.e. parameter sets that are duplicates
-    in injected_arg_values, but not in none_injected_arg_values.
+    Finds the parameter sets of injected_arg_values that are removed as injection
+    caused duplicates, returning for each parameter set the index of the kept
+    parameter set it duplicates, or None if the parameter set itself is kept.
+    The duplication of none_injected_arg_values is computed if it is not given.
     """
-    for arg_set_index, injected_set in enumerate(injected_arg_values):
-        is_duplicate = _element_is_duplicated_in_list(
-            arg_set_index,
-            injected_arg_values
-        )
+    injected_sets_duplicated = find_duplicated_elements(injected_arg_values)
+    if not any(injected_sets_duplicated):
+        return [None] * len(injected_arg_values)
+
+    injected_sets_first_occurrence_indexes = find_first_occurrence_indexes(injected_arg_values)
+    if none_injected_sets_duplicated is None:
+        none_injected_sets_duplicated = find_duplicated_elements(none_injected_arg_values)
+
+    return [
+        first_occurrence_index
+        if is_duplicated
+        and not none_injected_sets_duplicated[arg_set_index]
+        and first_occurrence_index != arg_set_index
+        else None
+        for arg_set_index, (is_duplicated, first_occurrence_index)
+        in enumerate(zip(injected_sets_duplicated, injected_sets_first_occurrence_indexes))
+    ]
+
+
+def _get_deduplicated_parameter_sets_ids(
+        marker: Mark,
+        marker_arg_names: List[str],
+        kept_duplicate_indexes: List[Optional[int]],
+        test_metafunc: Metafunc,
+) -> Optional[List[Any]]:
+    """
+    Returns the ids of the parameter sets kept after removing injection caused duplicates:
+    the original id of every kept parameter set, merged with the original ids of the
+    parameter sets removed as its duplicates. Returns None if the original ids cannot be resolved.
+    """
+    original_ids = _get_parameter_sets_ids(marker, marker_arg_names, test_metafunc)
+    if original_ids is None:
+        return None
 
-        if is_duplicate:
-            is_not_injection_caused_duplicate = _element_is_duplicated_in_list(
-                arg_set_index,
-                none_injected_arg_values
-            )
+    kept_sets_ids = {}
+    for arg_set_index, kept_duplicate_index in enumerate(kept_duplicate_indexes):
+        kept_set_index = arg_set_index if kept_duplicate_index is None else kept_duplicate_index
+        kept_sets_ids.setdefault(kept_set_index, []).append(original_ids[arg_set_index])
 
-            if is_not_injection_caused_duplicate:
-                yield injected_set
-        else:
-            yield injected_set
+    return [_merge_parameter_sets_ids(set_ids) for set_ids in kept_sets_ids.values()]
+
+
+def _get_parameter_sets_ids(
+        marker: Mark,
+        marker_arg_names: List[str],
+        test_metafunc: Metafunc,
+) -> Optional[List[Any]]:
+    """
+    Returns the ids pytest gives the parameter sets of a parameterize marker,
+    or None, warning, if they cannot be resolved by this pytest version.
+    """
+    resolve_parameter_set_ids = getattr(test_metafunc, RESOLVE_PARAMETER_SET_IDS_METHOD, None)
+    if resolve_parameter_set_ids is not None:
+        try:
+            return list(resolve_parameter_set_ids(
+                marker_arg_names,
+                marker.kwargs.get("ids", None),
+                _get_marker_parameter_sets(marker, marker_arg_names),
+                test_metafunc.definition.nodeid,
+            ))
+        except TypeError:
+            # The private pytest helper has another signature in this pytest version.
+            pass
+
+    warnings.warn(
+        PytestInjectWarning(
+            f"pytest-inject: The original ids of the parameter sets of '{test_metafunc.definition.nodeid}' "
+            f"cannot be resolved by this pytest version, so the parameter sets kept after removing "
+            f"injection caused duplicates are given the ids pytest generates for their injected values."
+        ),
+        stacklevel=2,
+    )
+    return None
+
+
+def _merge_parameter_sets_ids(parameter_sets_ids: List[Any]) -> Any:
+    """
+    Merges the ids of parameter sets collapsed into one, keeping only the first
+    few of them, so the merged id of a large group stays short.
+    """
+    if len(parameter_sets_ids) == 1:
+        return parameter_sets_ids[0]
+
+    merged_ids = [str(parameter_set_id) for parameter_set_id in parameter_sets_ids[:MERGED_IDS_MAX_COUNT]]
+    if len(parameter_sets_ids) > MERGED_IDS_MAX_COUNT:
+        merged_ids.append(f"{len(parameter_sets_ids) - MERGED_IDS_MAX_COUNT}more")
+
+    return MERGED_IDS_SEPARATOR.join(merged_ids)
 
 
 def _get_parameterize_arg_names(parameterize_marker: Mark):
@@ -209,43 +724,48 @@ def _get_parameterize_arg_names(parameterize_marker: Mark):
     return []
 
 
-def _element_is_duplicated_in_list(
-        element_index: int,
-        elements_list: List[Any],
-) -> bool:
+def _replace_parameterize_marker(
+        old_marker: Mark,
+        new_marker: Mark,
+        test_metafunc: Metafunc,
+):
     """
-    Helper to check if an element has more than one occurrence in a list.
+    Replaces an existing parameterize marker of the test_metafunc with a new one, by parametrizing
+    the test with the new marker, and removing the old marker so pytest does not parametrize the
+    test with it. The old marker is removed by identity, as equal stacked markers may exist.
     """
-    element_checked = elements_list[element_index]
+    test_metafunc.parametrize(*new_marker.args, **new_marker.kwargs)
 
-    return any(
-        element_checked == other_element
-        for other_element_index, other_element in enumerate(elements_list)
-        if element_index != other_element_index
-    )
+    test_metafunc.definition.own_markers[:] = [
+        marker for marker in test_metafunc.definition.own_markers if marker is not old_marker
+    ]
 
 
-def _replace_parameterize_marker(
-        marker_arg_names: Union[List[str], str],
-        marker_arg_values: List[Any],
-        marker_indirect: Union[bool, List[str]],
-        marker_ids: Optional[List[str]],
-        marker_scope: Optional[str],
-        test_metafunc: Metafunc,
-        replacement_index: int,
+def _hide_inherited_marker(
+        marker_owner: Node,
+        marker: Mark,
+        hidden_inherited_markers: Optional[List[Tuple[Node, Mark, int]]],
 ):
     """
-    replaces an existing parameterize marker in the test_metafunc with a new one
-    created from the given arguments.
+    Removes an inherited parameterize marker from its owner node, so pytest does not
+    parametrize the test with it, recording it to be restored if hidden_inherited_markers is given.
     """
-    test_metafunc.parametrize(
-        COMMA_CHAR.join(marker_arg_names),
-        marker_arg_values,
-        indirect=marker_indirect,
-        ids=marker_ids,
-        scope=marker_scope
+    marker_index = next(
+        owner_marker_index for owner_marker_index, owner_marker in enumerate(marker_owner.own_markers)
+        if owner_marker is marker
     )
+    del marker_owner.own_markers[marker_index]
+
+    if hidden_inherited_markers is not None:
+        hidden_inherited_markers.append((marker_owner, marker, marker_index))
+
+
+def restore_inherited_markers(hidden_inherited_markers: List[Tuple[Node, Mark, int]]):
+    """
+    Restores the inherited parameterize markers hidden from their owner nodes while
+    injecting a test, in their original positions, so the other tests inheriting them get them.
+    """
+    for marker_owner, marker, marker_index in reversed(hidden_inherited_markers):
+        marker_owner.own_markers.insert(marker_index, marker)
 
-    new_marker = test_metafunc.definition.own_markers[-1]
-    test_metafunc.definition.own_markers[replacement_index] = new_marker
-    del test_metafunc.definition.own_markers[-1]
+    hidden_inherited_markers.clear()
@@ -0,0 +1,98 @@
+"""
+Module containing the layering of the injection sources given on the command-line.
+
+--inject-file, --inject-json and --inject-dict can each be given several times, and every
+source is a layer of injected arguments. Layers are merged in a fixed precedence order:
+the --inject-file layers, then the --inject-json layers, then the --inject-dict layers,
+each in the order they were given, with later layers overriding the arguments of earlier
+ones. The node id scoped payloads and the "__inject_scope__" payload of the layers are
+merged key by key, so a layer can override a single argument of a scoped payload.
+"""
+from typing import Any, Dict, List, Mapping
+
+from pytest_inject.exceptions import PytestInjectError
+from pytest_inject.lazy_json import LazyJsonDict
+from pytest_inject.routing import is_node_id_pattern
+
+# Magic constants
+INJECT_SCOPE_PAYLOAD_KEY = "__inject_scope__"
+
+
+class LayeredInjectionDict(dict):
+    """
+    The merged injected arguments of several layers. Pickled, it holds the layers themselves,
+    so layers that are cheap to pickle (like injection files, pickled as their path) stay
+    cheap to send to xdist workers.
+    """
+
+    def __init__(self, layers: List[Mapping[str, Any]]):
+        super().__init__()
+        self.layers = layers
+        for layer in layers:
+            _merge_layer(self, layer, overriding=True)
+
+    def __reduce__(self):
+        return LayeredInjectionDict, (self.layers,)
+
+
+def merge_injection_layers(layers: List[Mapping[str, Any]]) -> Mapping[str, Any]:
+    """
+    Merges the layers of injected arguments, later layers overriding earlier ones.
+    A single layer is returned as it is.
+    If any layer is a lazily decoded JSON file, the largest one is the base of the merged
+    layers, so its values are still decoded only when they are read.
+
+    :param layers: The layers of injected arguments, in precedence order.
+    """
+    for layer in layers:
+        if not isinstance(layer, Mapping):
+            raise PytestInjectError(
+                f"pytest-inject: expected every injection source to hold a dict, got {type(layer)} instead."
+            )
+
+    if len(layers) == 1:
+        return layers[0]
+
+    lazy_json_layers_indexes = [index for index, layer in enumerate(layers) if isinstance(layer, LazyJsonDict)]
+    if not lazy_json_layers_indexes:
+        return LayeredInjectionDict(layers)
+
+    base_index = max(lazy_json_layers_indexes, key=lambda index: len(layers[index]))
+    merged_layers = layers[base_index].copy()
+
+    # The layers under the base are merged from the closest one, so each only fills in what is still missing.
+    for layer in reversed(layers[:base_index]):
+        _merge_layer(merged_layers, layer, overriding=False)
+    for layer in layers[base_index + 1:]:
+        _merge_layer(merged_layers, layer, overriding=True)
+
+    return merged_layers
+
+
+def _merge_layer(merged_layers: Dict[str, Any], layer: Mapping[str, Any], overriding: bool):
+    """
+    Merges a layer into the merged layers, overriding their arguments, or only filling in
+    the missing ones if overriding is False.
+    """
+    for key in layer:
+        if key not in merged_layers:
+            merged_layers[key] = layer[key]
+            continue
+
+        if not _is_payload_key(key):
+            if overriding:
+                merged_layers[key] = layer[key]
+            continue
+
+        value, merged_value = layer[key], merged_layers[key]
+        if isinstance(value, dict) and isinstance(merged_value, dict):
+            merged_layers[key] = {**merged_value, **value} if overriding else {**value, **merged_value}
+        elif overriding:
+            merged_layers[key] = value
+
+
+def _is_payload_key(key: str) -> bool:
+    """
+    Checks if a key holds a payload merged key by key, rather than an injected argument.
+    """
+    return key == INJECT_SCOPE_PAYLOAD_KEY or is_node_id_pattern(key)
@@ -0,0 +1,124 @@
+"""
+Module containing lazily evaluated injected values.
+
+A lazy value wraps a zero-argument factory, called only when a test consuming
+the injected value sets up, so tests that are deselected or skipped never pay
+for creating it. The created value is memoized according to the lazy value scope.
+"""
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+import pytest
+
+from pytest_inject.exceptions import PytestInjectError
+from pytest_inject.lazy_json import LazyJsonDict
+
+# Magic constants
+FUNCTION_SCOPE = "function"
+SCOPES_NODE_TYPES = {
+    "class": pytest.Class,
+    "module": pytest.Module,
+    "package": pytest.Package,
+    "session": pytest.Session,
+}
+
+
+class LazyValue:
+    """
+    An injected value created by a zero-argument factory, when a test consuming it sets up.
+    """
+
+    def __init__(self, factory: Callable[[], Any], scope: str = FUNCTION_SCOPE):
+        if scope != FUNCTION_SCOPE and scope not in SCOPES_NODE_TYPES:
+            raise PytestInjectError(
+                f"pytest-inject: Invalid lazy value scope '{scope}', expected one of "
+                f"{[FUNCTION_SCOPE, *SCOPES_NODE_TYPES]}."
+            )
+
+        self.factory = factory
+        self.scope = scope
+
+    def __repr__(self):
+        return f"LazyValue({getattr(self.factory, '__name__', self.factory)!r}, scope={self.scope!r})"
+
+
+def lazy(factory: Optional[Callable[[], Any]] = None, *, scope: str = FUNCTION_SCOPE):
+    """
+    Marks a zero-argument factory as a lazily evaluated injected value.
+    The factory is called only when a test consuming the value sets up, and its
+    result is reused by all the tests of the same scope (function, class, module,
+    package or session).
+    Can be called with the factory, or used as a decorator, with or without a scope.
+
+    :param factory: The zero-argument factory creating the injected value.
+    :param scope: The scope the created value is reused in, "function" by default.
+    """
+    if factory is None:
+        return partial(lazy, scope=scope)
+
+    return LazyValue(factory, scope)
+
+
+def contains_lazy_values(injected_args: Dict[str, Any]) -> bool:
+    """
+    Checks if any of the injected values is a lazy value.
+    """
+    # Values decoded from JSON are never lazy values, so a lazily decoded JSON file is not decoded to check them.
+    # Only the values set into it, like the values of other injection sources layered over it, are checked.
+    if isinstance(injected_args, LazyJsonDict):
+        return any(isinstance(injected_args[key], LazyValue) for key in injected_args.loaded_keys)
+
+    return any(isinstance(injected_value, LazyValue) for injected_value in injected_args.values())
+
+
+class LazyValuesPlugin:
+    """
+    Replaces lazy values with the values created by their factory, when the
+    fixture they were parametrized as sets up, or, for pytest versions that do
+    not set up direct parametrization as fixtures, right before the test is called.
+    """
+
+    def __init__(self):
+        self._memoized_values = {}
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        outcome = yield
+        if outcome.excinfo is not None:
+            return
+
+        fixture_value = outcome.get_result()
+        if isinstance(fixture_value, LazyValue):
+            evaluated_value = self._evaluate(fixture_value, request.node)
+            fixturedef.cached_result = (evaluated_value,) + tuple(fixturedef.cached_result[1:])
+            outcome.force_result(evaluated_value)
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_call(self, item):
+        funcargs = getattr(item, "funcargs", None) or {}
+        for arg_name, arg_value in funcargs.items():
+            if isinstance(arg_value, LazyValue):
+                funcargs[arg_name] = self._evaluate(arg_value, item)
+
+    def _evaluate(self, lazy_value: LazyValue, requesting_node) -> Any:
+        """
+        Returns the value created by the factory of lazy_value, memoized for
+        the node of the lazy value scope, that requesting_node belongs to.
+        """
+        if lazy_value.scope == FUNCTION_SCOPE:
+            return lazy_value.factory()
+
+        # As in pytest, a class scope out of a class is a module scope,
+        # and a package scope out of a package is a session scope.
+        scope_node = requesting_node.getparent(SCOPES_NODE_TYPES[lazy_value.scope])
+        if scope_node is None and lazy_value.scope == "class":
+            scope_node = requesting_node.getparent(pytest.Module)
+        if scope_node is None:
+            scope_node = requesting_node.session
+
+        memoized_value_key = (lazy_value, scope_node)
+        if memoized_value_key not in self._memoized_values:
+            self._memoized_values[memoized_value_key] = lazy_value.factory()
+            scope_node.addfinalizer(partial(self._memoized_values.pop, memoized_value_key, None))
+
+        return self._memoized_values[memoized_value_key]
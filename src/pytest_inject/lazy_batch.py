@@ -0,0 +1,99 @@
+"""
+Module containing the streaming of --inject-batch JSONL files.
+
+The batch file is scanned once, validating every payload line, and keeping only the
+line number, the offset and the argument names of every payload. The payloads are
+decoded from the file again, one line at a time, every time they are iterated, so no
+payload is kept in memory by pytest-inject, other than the values the parametrized
+variants of the tests consuming them hold.
+"""
+import json
+import os
+from typing import Any, Dict, FrozenSet, Iterator, List, NamedTuple, Optional, Tuple
+
+from pytest_inject.exceptions import PytestInjectError
+
+
+class _BatchLine(NamedTuple):
+    """
+    The line number of a payload in the batch file, and the offset the line starts at.
+    """
+    line_number: int
+    offset: int
+
+
+class LazyBatchPayloads:
+    """
+    The payloads of a batch file, iterated as pairs of each payload line number and its payload,
+    decoded from the file line by line. Pickled, it holds the batch file path and the lines
+    offsets, so it is cheap to send to xdist workers.
+    """
+
+    def __init__(self, file_path: Optional[str], lines: List[_BatchLine], arg_names: FrozenSet[str]):
+        self.file_path = file_path
+        self._lines = lines
+        # The names of the arguments injected by any of the payloads.
+        self.arg_names = arg_names
+
+    def __iter__(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        if not self._lines:
+            return
+
+        with open(self.file_path, "rb") as file:
+            for line_number, offset in self._lines:
+                file.seek(offset)
+                yield line_number, _decode_payload_line(file.readline(), line_number, self.file_path)
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def __reduce__(self):
+        return LazyBatchPayloads, (self.file_path, self._lines, self.arg_names)
+
+    def __repr__(self):
+        return f"LazyBatchPayloads({self.file_path!r}, {len(self._lines)} payloads)"
+
+    @property
+    def line_numbers(self) -> List[int]:
+        return [line.line_number for line in self._lines]
+
+
+def load_lazy_batch_payloads(file_path: Optional[str]) -> LazyBatchPayloads:
+    """
+    Scans a batch file for the offsets and argument names of its payload lines, validating
+    each of them without keeping it. Blank lines are skipped. Returns empty batch payloads
+    if no file path is given.
+    """
+    lines = []
+    arg_names = set()
+    if file_path is None:
+        return LazyBatchPayloads(file_path, lines, frozenset(arg_names))
+
+    with open(file_path, "rb") as file:
+        offset = 0
+        for line_number, raw_line in enumerate(file, start=1):
+            if raw_line.strip():
+                arg_names.update(_decode_payload_line(raw_line, line_number, file_path))
+                lines.append(_BatchLine(line_number, offset))
+
+            offset += len(raw_line)
+
+    # The path is made absolute, as xdist workers read the payloads from the file as well.
+    return LazyBatchPayloads(os.path.abspath(file_path), lines, frozenset(arg_names))
+
+
+def _decode_payload_line(raw_line: bytes, line_number: int, file_path: str) -> Dict[str, Any]:
+    try:
+        payload = json.loads(raw_line)
+    except ValueError as exception:
+        raise PytestInjectError(
+            f"pytest-inject: Invalid JSON in line {line_number} of batch file '{file_path}'."
+        ) from exception
+
+    if not isinstance(payload, dict):
+        raise PytestInjectError(
+            f"pytest-inject: expected a JSON object in line {line_number} of batch file "
+            f"'{file_path}', got {type(payload)} instead."
+        )
+
+    return payload
@@ -0,0 +1,259 @@
+"""
+Module containing the lazy decoding of large --inject-json files.
+
+A large JSON file of an object is memory-mapped, and scanned once for the offsets of
+the values of its top-level keys, without decoding them into Python objects. Each value
+is decoded only the first time it is read, so a test session consuming a few keys of a
+large file never pays for decoding the rest of it. The offsets index is cached in a file
+next to the JSON file, and reused as long as the JSON file modification time and size
+are unchanged, so later test sessions skip the scan as well.
+"""
+import json
+import mmap
+import os
+import re
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, NamedTuple, Optional
+
+from pytest_inject.exceptions import PytestInjectError
+
+# Magic constants
+LAZY_JSON_MIN_FILE_SIZE = 1024 * 1024
+INDEX_FILE_SUFFIX = ".inject-index"
+INDEX_FORMAT_VERSION = 1
+JSON_STRING_REGEX = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"')
+# Strings are matched as a whole, so the brackets inside them are skipped.
+JSON_STRUCTURE_REGEX = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]')
+JSON_SCALAR_REGEX = re.compile(rb'[^\s,\]}]+')
+JSON_WHITESPACE_REGEX = re.compile(rb'[ \t\n\r]*')
+OPENING_BRACKETS = frozenset(b"[{")
+
+
+class _ValueOffsets(NamedTuple):
+    """
+    The offsets of the encoded value of a key in the JSON file, before it is decoded.
+    """
+    start: int
+    end: int
+
+
+class LazyJsonDict(MutableMapping):
+    """
+    A dict of the top-level keys of a JSON file, decoding the value of a key only the
+    first time it is read. Values set into it are kept as they are. Pickled, it holds the
+    JSON file path and the values offsets, so it is cheap to send to xdist workers.
+    """
+
+    def __init__(self, file_path: str, entries: Dict[str, Any]):
+        self.file_path = file_path
+        # Every entry is the offsets of the encoded value, until the value is decoded.
+        self._entries = entries
+        self._mapped_file = None
+        # The keys whose values were decoded or set, in the order they were.
+        self.loaded_keys = []
+
+    def __getitem__(self, key: str) -> Any:
+        entry = self._entries[key]
+        if type(entry) is not _ValueOffsets:
+            return entry
+
+        value = self._decode_value(key, entry)
+        self._entries[key] = value
+        self.loaded_keys.append(key)
+
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        self._entries[key] = value
+        self.loaded_keys.append(key)
+
+    def __delitem__(self, key: str):
+        del self._entries[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def __reduce__(self):
+        return LazyJsonDict, (self.file_path, self._entries)
+
+    def __repr__(self):
+        return f"LazyJsonDict({self.file_path!r}, {len(self._entries)} keys)"
+
+    def copy(self) -> "LazyJsonDict":
+        """
+        Returns a shallow copy of the dict, sharing the memory-mapped file, and decoding values independently.
+        """
+        lazy_json_dict = LazyJsonDict(self.file_path, dict(self._entries))
+        lazy_json_dict._mapped_file = self._mapped_file
+        lazy_json_dict.loaded_keys = list(self.loaded_keys)
+
+        return lazy_json_dict
+
+    def _decode_value(self, key: str, value_offsets: _ValueOffsets) -> Any:
+        if self._mapped_file is None:
+            with open(self.file_path, "rb") as file:
+                self._mapped_file = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            return json.loads(self._mapped_file[value_offsets.start:value_offsets.end])
+        except ValueError as exception:
+            raise PytestInjectError(
+                f"pytest-inject: Invalid JSON value of '{key}' in '{self.file_path}'."
+            ) from exception
+
+
+def load_lazy_json_dict(file_path: str) -> Optional[LazyJsonDict]:
+    """
+    Returns a lazy dict of the JSON object in a file, with the offsets of its values taken
+    from the index file next to it, or scanned and written to the index file if it is
+    missing or stale. Returns None if the file does not hold a JSON object.
+    """
+    file_stat = os.stat(file_path)
+    index_file_path = f"{file_path}{INDEX_FILE_SUFFIX}"
+
+    entries = _load_index(index_file_path, file_stat)
+    if entries is None:
+        with open(file_path, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                entries = _scan_object_values_offsets(mapped_file, file_path)
+
+        if entries is None:
+            return None
+
+        _store_index(index_file_path, file_stat, entries)
+
+    return LazyJsonDict(file_path, entries)
+
+
+def _load_index(index_file_path: str, file_stat: os.stat_result) -> Optional[Dict[str, _ValueOffsets]]:
+    """
+    Loads the values offsets from an index file, or returns None if it is missing,
+    unreadable, or stale for the current modification time and size of the JSON file.
+    """
+    try:
+        with open(index_file_path) as index_file:
+            index = json.load(index_file)
+
+        if (
+            index["version"] != INDEX_FORMAT_VERSION
+            or index["mtime_ns"] != file_stat.st_mtime_ns
+            or index["size"] != file_stat.st_size
+        ):
+            return None
+
+        return {key: _ValueOffsets(start, end) for key, start, end in index["offsets"]}
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _store_index(index_file_path: str, file_stat: os.stat_result, entries: Dict[str, _ValueOffsets]):
+    """
+    Writes the values offsets to an index file. The index is only a cache, so it is
+    not written if the directory of the JSON file is not writable.
+    """
+    index = {
+        "version": INDEX_FORMAT_VERSION,
+        "mtime_ns": file_stat.st_mtime_ns,
+        "size": file_stat.st_size,
+        "offsets": [[key, value_offsets.start, value_offsets.end] for key, value_offsets in entries.items()],
+    }
+
+    try:
+        with open(index_file_path, "w") as index_file:
+            json.dump(index, index_file)
+    except OSError:
+        pass
+
+
+def _scan_object_values_offsets(buffer, file_path: str) -> Optional[Dict[str, _ValueOffsets]]:
+    """
+    Scans a JSON object for the offsets of the values of its keys, skipping over
+    the values without decoding them. Only the keys themselves are decoded.
+    Returns None if the buffer does not hold a JSON object.
+    """
+    position = JSON_WHITESPACE_REGEX.match(buffer, 0).end()
+    if buffer[position:position + 1] != b"{":
+        return None
+
+    entries = {}
+    position = JSON_WHITESPACE_REGEX.match(buffer, position + 1).end()
+    if buffer[position:position + 1] == b"}":
+        _check_trailing_whitespace(buffer, position + 1, file_path)
+        return entries
+
+    while True:
+        key_match = JSON_STRING_REGEX.match(buffer, position)
+        if key_match is None:
+            _raise_invalid_json(file_path, position)
+
+        key = json.loads(key_match.group())
+        position = JSON_WHITESPACE_REGEX.match(buffer, key_match.end()).end()
+        if buffer[position:position + 1] != b":":
+            _raise_invalid_json(file_path, position)
+
+        value_start = JSON_WHITESPACE_REGEX.match(buffer, position + 1).end()
+        value_end = _skip_value(buffer, value_start, file_path)
+        entries[key] = _ValueOffsets(value_start, value_end)
+
+        position = JSON_WHITESPACE_REGEX.match(buffer, value_end).end()
+        separator = buffer[position:position + 1]
+        if separator == b"}":
+            _check_trailing_whitespace(buffer, position + 1, file_path)
+            return entries
+        elif separator != b",":
+            _raise_invalid_json(file_path, position)
+
+        position = JSON_WHITESPACE_REGEX.match(buffer, position + 1).end()
+
+
+def _skip_value(buffer, position: int, file_path: str) -> int:
+    """
+    Returns the end offset of the JSON value starting at position. The brackets of
+    arrays and objects are only counted, so their content is checked by the decoding
+    of the value, when it is read.
+    """
+    first_char = buffer[position:position + 1]
+
+    if first_char == b'"':
+        value_match = JSON_STRING_REGEX.match(buffer, position)
+        if value_match is None:
+            _raise_invalid_json(file_path, position)
+
+        return value_match.end()
+    elif first_char and first_char[0] in OPENING_BRACKETS:
+        depth = 0
+        for structure_match in JSON_STRUCTURE_REGEX.finditer(buffer, position):
+            structure_char = buffer[structure_match.start()]
+            if structure_char in OPENING_BRACKETS:
+                depth += 1
+            elif structure_char != ord('"'):
+                depth -= 1
+                if depth == 0:
+                    return structure_match.end()
+
+        _raise_invalid_json(file_path, position)
+
+    scalar_match = JSON_SCALAR_REGEX.match(buffer, position)
+    if scalar_match is None:
+        _raise_invalid_json(file_path, position)
+
+    return scalar_match.end()
+
+
+def _check_trailing_whitespace(buffer, position: int, file_path: str):
+    """
+    Checks only whitespace follows the top-level object, as json.load does.
+    """
+    trailing_position = JSON_WHITESPACE_REGEX.match(buffer, position).end()
+    if trailing_position != len(buffer):
+        _raise_invalid_json(file_path, trailing_position)
+
+
+def _raise_invalid_json(file_path: str, position: int):
+    raise PytestInjectError(f"pytest-inject: Invalid JSON in '{file_path}' at offset {position}.")
@@ -0,0 +1,79 @@
+"""
+Module containing the expansion of --inject-matrix sweeps into injection variants.
+
+A matrix maps argument names to lists of candidate values. It is expanded for
+every test into the cartesian product (or the zip) of the candidate values of
+the arguments the test consumes only, one combination at a time, so arguments
+that are not consumed never multiply the variants of a test.
+"""
+from itertools import compress, product
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from pytest_inject.deduplication import find_repeated_elements
+
+# Magic constants
+MATRIX_VARIANT_ID_PREFIX = "inject-matrix-"
+MATRIX_ID_INDEX_SEPARATOR = "-"
+PRODUCT_MATRIX_MODE = "product"
+ZIP_MATRIX_MODE = "zip"
+MATRIX_MODES = (PRODUCT_MATRIX_MODE, ZIP_MATRIX_MODE)
+
+
+def iter_matrix_variants(
+        matrix: Dict[str, List[Any]],
+        arg_names: Sequence[str],
+        matrix_mode: str = PRODUCT_MATRIX_MODE,
+        allow_arg_values_duplication: bool = False,
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Generates the variants of a matrix restricted to the given argument names, as
+    pairs of a variant id and a dictionary of argument names and their injected values.
+    The variant id holds the candidate index of every argument in product mode, and
+    the candidates index in zip mode, so it does not depend on the other tests arguments.
+    Repeated combinations are skipped, unless allow_arg_values_duplication is True.
+
+    :param matrix: A dictionary of argument names and their candidate values.
+    :param arg_names: The names of the matrix arguments to expand.
+    :param matrix_mode: "product" to generate every combination of the candidate
+            values, or "zip" to generate the combinations of the candidate values
+            at the same index.
+    :param allow_arg_values_duplication: if True disable skipping of repeated combinations.
+    """
+    if matrix_mode == PRODUCT_MATRIX_MODE:
+        # Combinations of distinct candidates are distinct, so only candidates are deduplicated.
+        combinations_indexes = (
+            (combination_indexes, combination_indexes)
+            for combination_indexes in product(*(
+                _get_kept_indexes(matrix[arg_name], allow_arg_values_duplication)
+                for arg_name in arg_names
+            ))
+        )
+    else:
+        zipped_candidates = list(zip(*(matrix[arg_name] for arg_name in arg_names)))
+        combinations_indexes = (
+            ((combination_index,), (combination_index,) * len(arg_names))
+            for combination_index in _get_kept_indexes(zipped_candidates, allow_arg_values_duplication)
+        )
+
+    for variant_id_indexes, candidates_indexes in combinations_indexes:
+        variant_id = MATRIX_VARIANT_ID_PREFIX + MATRIX_ID_INDEX_SEPARATOR.join(
+            str(candidate_index) for candidate_index in variant_id_indexes
+        )
+        yield variant_id, {
+            arg_name: matrix[arg_name][candidate_index]
+            for arg_name, candidate_index in zip(arg_names, candidates_indexes)
+        }
+
+
+def _get_kept_indexes(candidates: List[Any], allow_arg_values_duplication: bool) -> Iterable[int]:
+    """
+    Returns the indexes of the candidates kept, skipping repeated candidates
+    unless allow_arg_values_duplication is True.
+    """
+    if allow_arg_values_duplication:
+        return range(len(candidates))
+
+    return list(compress(
+        range(len(candidates)),
+        (not repeated for repeated in find_repeated_elements(candidates)),
+    ))
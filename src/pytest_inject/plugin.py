@@ -1,33 +1,100 @@
-import json
-import os
-import runpy
-from functools import lru_cache
-from typing import Any, Dict
+import pytest
 
 from pytest_inject.exceptions import PytestInjectError
-from pytest_inject.help_strings import INJECT_JSON_HELP_STRING, INJECT_DICT_HELP_STRING, INJECT_ALLOW_DUPS_HELP_STRING
-from pytest_inject.injector import inject_test_arguments
+from pytest_inject.help_strings import (
+    INJECT_JSON_HELP_STRING,
+    INJECT_DICT_HELP_STRING,
+    INJECT_FILE_HELP_STRING,
+    INJECT_ALLOW_DUPS_HELP_STRING,
+    INJECT_BATCH_HELP_STRING,
+    INJECT_SERVE_HELP_STRING,
+    INJECT_DICT_CACHE_HELP_STRING,
+    INJECT_DICT_CACHE_DEP_HELP_STRING,
+    INJECT_DICT_CACHE_SIZE_HELP_STRING,
+    INJECT_DICT_WORKERS_HELP_STRING,
+    INJECT_SCOPE_HELP_STRING,
+    INJECT_MATRIX_HELP_STRING,
+    INJECT_MATRIX_MODE_HELP_STRING,
+    INJECT_PROFILE_HELP_STRING,
+    INJECT_PROFILE_JSON_HELP_STRING,
+    INJECT_ONLY_HELP_STRING,
+    INJECT_SHORT_IDS_HELP_STRING,
+    INJECT_FINGERPRINT_HELP_STRING,
+    INJECT_STRICT_HELP_STRING,
+)
+from pytest_inject.scopes import INJECT_SCOPES
 
 # Magic constants
-INJECT_DICT_INPUT_FILE_TO_ATTRIBUTE_SEPERATOR = "::"
+INJECTION_PLUGIN_NAME = "pytest_inject_injection"
+INJECTION_SERVER_PLUGIN_NAME = "pytest_inject_server"
+LAZY_VALUES_PLUGIN_NAME = "pytest_inject_lazy_values"
+DEFAULT_INJECT_DICT_CACHE_SIZE_MEGABYTES = 512
+INJECT_MATRIX_MODE_CHOICES = ("product", "zip")
+INJECT_FINGERPRINT_CHOICES = ("identity", "id", "buffer")
+INJECTION_INPUT_OPTIONS = (
+    "inject_json", "inject_dict", "inject_file", "inject_batch", "inject_serve", "inject_matrix"
+)
+
+
+def pytest_addhooks(pluginmanager):
+    from pytest_inject import hookspecs
+
+    pluginmanager.add_hookspecs(hookspecs)
 
 
 def pytest_addoption(parser):
     group = parser.getgroup("inject")
     group.addoption(
         "--inject-json",
-        action="store",
+        action="append",
         dest="inject_json",
-        default=None,
+        default=[],
         help=INJECT_JSON_HELP_STRING
     )
     group.addoption(
         "--inject-dict",
-        action="store",
+        action="append",
         dest="inject_dict",
-        default=None,
+        default=[],
         help=INJECT_DICT_HELP_STRING
     )
+    group.addoption(
+        "--inject-file",
+        action="append",
+        dest="inject_file",
+        default=[],
+        help=INJECT_FILE_HELP_STRING
+    )
+    group.addoption(
+        "--inject-dict-cache",
+        action="store_true",
+        dest="inject_dict_cache",
+        default=None,
+        help=INJECT_DICT_CACHE_HELP_STRING
+    )
+    group.addoption(
+        "--inject-dict-cache-dep",
+        action="append",
+        dest="inject_dict_cache_deps",
+        default=[],
+        help=INJECT_DICT_CACHE_DEP_HELP_STRING
+    )
+    group.addoption(
+        "--inject-dict-cache-size",
+        action="store",
+        type=float,
+        dest="inject_dict_cache_size",
+        default=DEFAULT_INJECT_DICT_CACHE_SIZE_MEGABYTES,
+        help=INJECT_DICT_CACHE_SIZE_HELP_STRING
+    )
+    group.addoption(
+        "--inject-dict-workers",
+        action="store",
+        type=int,
+        dest="inject_dict_workers",
+        default=None,
+        help=INJECT_DICT_WORKERS_HELP_STRING
+    )
     group.addoption(
         "--inject-allow-dup",
         action="store_true",
@@ -35,108 +102,127 @@ def pytest_addoption(parser):
         default=None,
         help=INJECT_ALLOW_DUPS_HELP_STRING
     )
+    group.addoption(
+        "--inject-fingerprint",
+        action="store",
+        dest="inject_fingerprint",
+        default="identity",
+        choices=INJECT_FINGERPRINT_CHOICES,
+        help=INJECT_FINGERPRINT_HELP_STRING
+    )
+    group.addoption(
+        "--inject-only",
+        action="store_true",
+        dest="inject_only",
+        default=None,
+        help=INJECT_ONLY_HELP_STRING
+    )
+    group.addoption(
+        "--inject-strict",
+        action="store_true",
+        dest="inject_strict",
+        default=None,
+        help=INJECT_STRICT_HELP_STRING
+    )
+    group.addoption(
+        "--inject-short-ids",
+        action="store_true",
+        dest="inject_short_ids",
+        default=None,
+        help=INJECT_SHORT_IDS_HELP_STRING
+    )
+    group.addoption(
+        "--inject-scope",
+        action="store",
+        dest="inject_scope",
+        default=None,
+        choices=INJECT_SCOPES,
+        help=INJECT_SCOPE_HELP_STRING
+    )
+    group.addoption(
+        "--inject-profile",
+        action="store_true",
+        dest="inject_profile",
+        default=None,
+        help=INJECT_PROFILE_HELP_STRING
+    )
+    group.addoption(
+        "--inject-profile-json",
+        action="store",
+        dest="inject_profile_json",
+        default=None,
+        help=INJECT_PROFILE_JSON_HELP_STRING
+    )
+    group.addoption(
+        "--inject-batch",
+        action="store",
+        dest="inject_batch",
+        default=None,
+        help=INJECT_BATCH_HELP_STRING
+    )
+    group.addoption(
+        "--inject-matrix",
+        action="store",
+        dest="inject_matrix",
+        default=None,
+        help=INJECT_MATRIX_HELP_STRING
+    )
+    group.addoption(
+        "--inject-matrix-mode",
+        action="store",
+        dest="inject_matrix_mode",
+        default="product",
+        choices=INJECT_MATRIX_MODE_CHOICES,
+        help=INJECT_MATRIX_MODE_HELP_STRING
+    )
+    group.addoption(
+        "--inject-serve",
+        action="store",
+        dest="inject_serve",
+        default=None,
+        help=INJECT_SERVE_HELP_STRING
+    )
 
 
-def pytest_generate_tests(metafunc):
-    injection_json_raw_input = metafunc.config.getoption("inject_json", default=None)
-    injection_dict_raw_input = metafunc.config.getoption("inject_dict", default=None)
-    allow_parameter_set_duplication = metafunc.config.getoption("inject_allow_dup", default=False)
-
-    if not injection_json_raw_input and not injection_dict_raw_input:
+def pytest_configure(config):
+    """
+    Registers the injection plugin only when an injection input was given,
+    so pytest-inject costs nothing for test sessions that do not use it.
+    """
+    if not any(config.getoption(option, default=None) for option in INJECTION_INPUT_OPTIONS):
         return
-    elif injection_json_raw_input and injection_dict_raw_input:
-        raise PytestInjectError(
-            "pytest-inject: --inject-json and --inject-dict arguments "
-            "cannot be used together in the same test run. pytest-inject does not know "
-            "how to fuse both inputs."
-        )
 
-    injected_args = {}
-    if injection_json_raw_input:
-        injected_args = _resolve_json_input(injection_json_raw_input)
-    elif injection_dict_raw_input:
-        injected_args = _resolve_python_dict_input(injection_dict_raw_input)
+    try:
+        _register_injection_plugins(config)
+    except PytestInjectError as exception:
+        # An invalid injection input is reported as a usage error, without an internal error traceback.
+        raise pytest.UsageError(_describe_injection_error(exception)) from exception
 
-    inject_test_arguments(
-        metafunc,
-        injected_args,
-        allow_parameter_set_duplication
-    )
 
+def _register_injection_plugins(config):
+    # Imported here, to avoid loading the injection machinery when it is not used.
+    from pytest_inject.injection_plugin import InjectionPlugin
+    from pytest_inject.lazy import LazyValuesPlugin, contains_lazy_values
 
-@lru_cache(maxsize=1)
-def _resolve_json_input(raw_input: str) -> Dict[str, Any]:
-    """
-    Parses JSON input (file path or raw string) into a dictionary.
-    """
-    if os.path.isfile(raw_input):
-        try:
-            with open(raw_input) as file:
-                return json.load(file)
-        except Exception as exception:
-            raise PytestInjectError(
-                f"pytest-inject: Error reading file '{raw_input}'."
-            ) from exception
-    else:
-        try:
-            return json.loads(raw_input)
-        except json.JSONDecodeError as exception:
-            raise PytestInjectError(
-                "pytest-inject: Invalid JSON input, or a none existent "
-                "file path that is parsed as JSON."
-            ) from exception
-
-
-@lru_cache(maxsize=1)
-def _resolve_python_dict_input(path: str) -> Dict[str, Any]:  # type: ignore
-    """
-    Loads a dict from a python file.
-    Can load either a variable or a getter function/callable to get the dict from.
+    injection_plugin = InjectionPlugin(config)
+    config.pluginmanager.register(injection_plugin, INJECTION_PLUGIN_NAME)
 
-    Format: "path/to/file.py::variable_or_function"
-    """
-    if INJECT_DICT_INPUT_FILE_TO_ATTRIBUTE_SEPERATOR in path:
-        file_path, target_name = path.rsplit(INJECT_DICT_INPUT_FILE_TO_ATTRIBUTE_SEPERATOR, 1)
-    else:
-        raise PytestInjectError(f"pytest-inject: No target specified in python input '{path}'.")
+    if any(contains_lazy_values(injected_args) for injected_args in injection_plugin.iter_injected_args_dicts()):
+        config.pluginmanager.register(LazyValuesPlugin(), LAZY_VALUES_PLUGIN_NAME)
 
-    if not os.path.isfile(file_path):
-        raise PytestInjectError(f"pytest-inject: Python file not found: '{file_path}'")
+    if config.getoption("inject_serve", default=None):
+        from pytest_inject.serve import InjectionServer
 
-    try:
-        module_globals = runpy.run_path(file_path)
-    except Exception as exception:
-        raise PytestInjectError(
-            f"pytest-inject: Error executing python script '{file_path}'."
-        ) from exception
-
-    if target_name not in module_globals:
-        raise PytestInjectError(f"pytest-inject: '{target_name}' not found in '{file_path}'")
-
-    obj = module_globals[target_name]
-
-    if callable(obj):
-        try:
-            injections_dict = obj()
-        except Exception as exception:
-            raise PytestInjectError(
-                f"pytest-inject: Error calling function '{target_name}'"
-                f" in '{file_path}'."
-            ) from exception
-    else:
-        injections_dict = obj
-
-    if not isinstance(injections_dict, dict):
-        raise PytestInjectError(
-            f"pytest-inject: expected a dict from '{target_name}' in '{file_path}', "
-            f"got {type(injections_dict)} instead."
-        )
-
-    for key in injections_dict:
-        if not isinstance(key, str):
-            raise PytestInjectError(
-                f"pytest-inject: expected string keys in the dict from '{target_name}' "
-                f"in '{file_path}', got key of type {type(key)} instead."
-            )
-
-    return injections_dict
+        config.pluginmanager.register(InjectionServer(config, injection_plugin), INJECTION_SERVER_PLUGIN_NAME)
+
+
+def _describe_injection_error(exception: PytestInjectError) -> str:
+    """
+    Returns the message of an injection error, followed by the error that caused it, if any,
+    as usage errors are reported by their message only.
+    """
+    cause = exception.__cause__
+    if cause is None:
+        return str(exception)
+
+    return f"{exception}\n{type(cause).__name__}: {cause}"
@@ -0,0 +1,158 @@
+"""
+Module containing the instrumentation of the injection hot paths, enabled by --inject-profile.
+
+The injection code reports its statistics through count_profile_stat, which does
+nothing unless a profile is active, so the instrumentation costs a single check
+per call for test sessions that are not profiled.
+"""
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Magic constants
+TIME_STAT = "time"
+MARKERS_REWRITTEN_STAT = "markers_rewritten"
+PARAMETER_SETS_BEFORE_DEDUP_STAT = "parameter_sets_before_dedup"
+PARAMETER_SETS_AFTER_DEDUP_STAT = "parameter_sets_after_dedup"
+EQUALITY_COMPARISONS_STAT = "equality_comparisons"
+PLAN_CACHE_HITS_STAT = "plan_cache_hits"
+PLAN_CACHE_MISSES_STAT = "plan_cache_misses"
+TESTS_STATS = (
+    MARKERS_REWRITTEN_STAT,
+    PARAMETER_SETS_BEFORE_DEDUP_STAT,
+    PARAMETER_SETS_AFTER_DEDUP_STAT,
+    EQUALITY_COMPARISONS_STAT,
+    PLAN_CACHE_HITS_STAT,
+    PLAN_CACHE_MISSES_STAT,
+)
+SLOWEST_TESTS_COUNT = 10
+
+_active_profile = None
+
+
+class InjectionProfile:
+    """
+    Collects the timings of the injection input resolution, and the injection
+    timings and statistics of every injected test function.
+    """
+
+    def __init__(self):
+        self.sections_timings: Dict[str, float] = {}
+        self.tests_stats: Dict[str, Counter] = {}
+        self._current_test_stats: Optional[Counter] = None
+
+    @contextmanager
+    def time_section(self, section_name: str):
+        """
+        Times a section of the injection, like the resolution of an injection input.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.sections_timings[section_name] = (
+                self.sections_timings.get(section_name, 0.0) + time.perf_counter() - start
+            )
+
+    @contextmanager
+    def profile_test(self, test_nodeid: str):
+        """
+        Times the injection into a test function, attributing the statistics
+        counted meanwhile to it. Injections into the same test are accumulated.
+        """
+        test_stats = self.tests_stats.setdefault(test_nodeid, Counter())
+        self._current_test_stats = test_stats
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            test_stats[TIME_STAT] += time.perf_counter() - start
+            self._current_test_stats = None
+
+    def count(self, stat_name: str, amount: int = 1):
+        if self._current_test_stats is not None:
+            self._current_test_stats[stat_name] += amount
+
+    def get_totals(self) -> Counter:
+        totals = Counter()
+        for test_stats in self.tests_stats.values():
+            totals.update(test_stats)
+
+        return totals
+
+    def to_dict(self) -> dict:
+        totals = self.get_totals()
+
+        return {
+            "sections": self.sections_timings,
+            "totals": {stat_name: totals[stat_name] for stat_name in (TIME_STAT, *TESTS_STATS)},
+            "tests": {
+                test_nodeid: {stat_name: test_stats[stat_name] for stat_name in (TIME_STAT, *TESTS_STATS)}
+                for test_nodeid, test_stats in self.tests_stats.items()
+            },
+        }
+
+    def dump(self, file_path: str):
+        with open(file_path, "w") as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    def write_summary(self, terminalreporter):
+        """
+        Writes the profile terminal summary section, listing the input resolution
+        timings, the injection totals, and the slowest injected test functions.
+        """
+        terminalreporter.write_sep("=", "pytest-inject profile")
+        for section_name, section_time in self.sections_timings.items():
+            terminalreporter.write_line(f"{section_name}: {section_time:.4f}s")
+
+        totals = self.get_totals()
+        terminalreporter.write_line(
+            f"injected {len(self.tests_stats)} test functions in {totals[TIME_STAT]:.4f}s: "
+            + _format_tests_stats(totals)
+        )
+        plan_cache_lookups = totals[PLAN_CACHE_HITS_STAT] + totals[PLAN_CACHE_MISSES_STAT]
+        if plan_cache_lookups:
+            terminalreporter.write_line(
+                f"injection plan cache hit rate: {totals[PLAN_CACHE_HITS_STAT] / plan_cache_lookups:.1%} "
+                f"({totals[PLAN_CACHE_HITS_STAT]} hits, {totals[PLAN_CACHE_MISSES_STAT]} misses)"
+            )
+
+        slowest_tests = sorted(
+            self.tests_stats.items(),
+            key=lambda test_item: test_item[1][TIME_STAT],
+            reverse=True,
+        )[:SLOWEST_TESTS_COUNT]
+        if slowest_tests:
+            terminalreporter.write_line(f"slowest {len(slowest_tests)} test functions by injection time:")
+        for test_nodeid, test_stats in slowest_tests:
+            terminalreporter.write_line(
+                f"  {test_stats[TIME_STAT]:.4f}s {test_nodeid} ({_format_tests_stats(test_stats)})"
+            )
+
+
+def activate_profile(profile: Optional[InjectionProfile]):
+    """
+    Sets the profile the injection statistics are counted into, or None to stop counting.
+    """
+    global _active_profile
+    _active_profile = profile
+
+
+def count_profile_stat(stat_name: str, amount: int = 1):
+    """
+    Counts an injection statistic into the active profile, if there is one.
+    """
+    if _active_profile is not None:
+        _active_profile.count(stat_name, amount)
+
+
+def _format_tests_stats(tests_stats: Counter) -> str:
+    return (
+        f"{tests_stats[MARKERS_REWRITTEN_STAT]} markers rewritten, "
+        f"{tests_stats[PARAMETER_SETS_BEFORE_DEDUP_STAT]} -> "
+        f"{tests_stats[PARAMETER_SETS_AFTER_DEDUP_STAT]} parameter sets after dedup, "
+        f"{tests_stats[EQUALITY_COMPARISONS_STAT]} equality comparisons, "
+        f"{tests_stats[PLAN_CACHE_HITS_STAT]} plan cache hits"
+    )
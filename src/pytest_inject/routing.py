@@ -0,0 +1,118 @@
+"""
+Module containing the routing of node id scoped injected arguments to the tests they apply to.
+
+A scoped payload key is a node id glob (like "tests/api/*::test_login*"), or a node id
+prefix of a directory, module or class (like "tests/api/test_auth.py"), holding the
+injected arguments of the tests it matches. Patterns are indexed once in a trie of their
+literal leading node id segments, so finding the patterns matching a test only walks
+the segments of its node id, and matches the globs stored along that path.
+"""
+import re
+from fnmatch import translate
+from typing import Any, Dict, List, Pattern, Tuple
+
+# Magic constants
+NODE_ID_SEGMENTS_SEPARATORS = ("/", "::")
+NODE_ID_SEGMENTS_SEPARATORS_REGEX = re.compile(r"(/|::)")
+GLOB_CHARS = frozenset("*?[")
+
+
+def is_node_id_pattern(key: str) -> bool:
+    """
+    Checks if a key of the injected arguments is a node id glob or prefix, rather than an argument name.
+    Only keys holding a node id separator or a glob character are, so other keys that are not valid
+    argument names are left to the injected arguments, which no test consumes.
+    """
+    return any(separator in key for separator in NODE_ID_SEGMENTS_SEPARATORS) or bool(GLOB_CHARS.intersection(key))
+
+
+class _PatternsTrieNode:
+    """
+    A node of the patterns trie, holding the patterns whose literal leading segments end at it.
+    """
+
+    def __init__(self):
+        self.children: Dict[str, "_PatternsTrieNode"] = {}
+        self.literal_patterns: List[Tuple[int, Dict[str, Any]]] = []
+        self.glob_patterns: List[Tuple[int, Pattern, Dict[str, Any]]] = []
+
+
+class NodeIdPayloadIndex:
+    """
+    An index of node id scoped injected arguments, resolving the injected arguments of a test by its node id.
+    """
+
+    def __init__(self, scoped_injected_args: Dict[str, Dict[str, Any]]):
+        self._root = _PatternsTrieNode()
+
+        for pattern_index, (pattern, injected_args) in enumerate(scoped_injected_args.items()):
+            self._add_pattern(pattern_index, pattern, injected_args)
+
+    def get_injected_args(self, nodeid: str) -> Dict[str, Any]:
+        """
+        Returns the injected arguments of all the patterns matching nodeid, or a prefix of it
+        ending at a node id segment. Patterns given later override the arguments of earlier ones.
+        """
+        injected_args = {}
+        for _, pattern_injected_args in self._get_matching_patterns(nodeid):
+            injected_args.update(pattern_injected_args)
+
+        return injected_args
+
+    def get_matching_pattern_indexes(self, nodeid: str) -> List[int]:
+        """
+        Returns the indexes of the patterns matching nodeid, in the order they were given.
+        """
+        return [pattern_index for pattern_index, _ in self._get_matching_patterns(nodeid)]
+
+    def _get_matching_patterns(self, nodeid: str) -> List[Tuple[int, Dict[str, Any]]]:
+        nodeid_tokens = NODE_ID_SEGMENTS_SEPARATORS_REGEX.split(nodeid)
+        matching_patterns = []
+
+        trie_node = self._root
+        for token_index in range(len(nodeid_tokens) + 1):
+            matching_patterns.extend(trie_node.literal_patterns)
+            if trie_node.glob_patterns:
+                nodeid_prefixes = _get_segment_prefixes(nodeid_tokens, token_index)
+                matching_patterns.extend(
+                    (pattern_index, injected_args)
+                    for pattern_index, pattern_regex, injected_args in trie_node.glob_patterns
+                    if any(pattern_regex.match(nodeid_prefix) for nodeid_prefix in nodeid_prefixes)
+                )
+
+            if token_index == len(nodeid_tokens):
+                break
+
+            trie_node = trie_node.children.get(nodeid_tokens[token_index])
+            if trie_node is None:
+                break
+
+        return sorted(matching_patterns, key=lambda matching_pattern: matching_pattern[0])
+
+    def _add_pattern(self, pattern_index: int, pattern: str, injected_args: Dict[str, Any]):
+        if pattern.endswith(NODE_ID_SEGMENTS_SEPARATORS):
+            # A pattern ending with a separator, like "tests/api/", is a glob of the node ids under it.
+            pattern += "*"
+
+        pattern_tokens = NODE_ID_SEGMENTS_SEPARATORS_REGEX.split(pattern)
+
+        trie_node = self._root
+        for token_index, pattern_token in enumerate(pattern_tokens):
+            if GLOB_CHARS.intersection(pattern_token):
+                trie_node.glob_patterns.append((pattern_index, re.compile(translate(pattern)), injected_args))
+                return
+
+            trie_node = trie_node.children.setdefault(pattern_token, _PatternsTrieNode())
+
+        trie_node.literal_patterns.append((pattern_index, injected_args))
+
+
+def _get_segment_prefixes(nodeid_tokens: List[str], start_token_index: int) -> List[str]:
+    """
+    Returns the prefixes of a node id ending at a segment, and not before the start token.
+    """
+    return [
+        "".join(nodeid_tokens[:end_token_index + 1])
+        for end_token_index in range(max(start_token_index, 0), len(nodeid_tokens))
+        if nodeid_tokens[end_token_index] not in NODE_ID_SEGMENTS_SEPARATORS
+    ]
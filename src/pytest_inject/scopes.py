@@ -0,0 +1,9 @@
+"""
+Module containing the scopes the new parameterization of injected arguments can be done with.
+It is kept apart from the injection machinery, so the entry point plugin can offer the scopes
+as --inject-scope choices without importing it.
+"""
+
+# Magic constants
+AUTO_SCOPE = "auto"
+INJECT_SCOPES = ("function", "class", "module", "package", "session", AUTO_SCOPE)
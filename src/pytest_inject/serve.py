@@ -0,0 +1,347 @@
+"""
+Module containing the pytest-inject serve mode, keeping a test session alive
+and re-running its selected tests for every injection payload it receives
+over a local Unix socket, and the client sending it payloads.
+
+Client usage:
+python -m pytest_inject.serve path/to/socket '{"my_arg": "my_value"}'
+python -m pytest_inject.serve path/to/socket path/to/injection.json
+python -m pytest_inject.serve path/to/socket --shutdown
+
+Serve mode relies on private pytest internals (the session setup state and the
+test function item generation of python collectors), and supports pytest 7.0 and above.
+"""
+import inspect
+import json
+import os
+import socket
+import stat
+import sys
+from collections import Counter
+
+import pytest
+from _pytest.python import PyCollector
+from _pytest.runner import SetupState
+
+from pytest_inject.exceptions import PytestInjectError
+
+# Magic constants
+SERVE_CONNECTIONS_BACKLOG = 1
+RESPONSE_CHUNK_SIZE = 65536
+SERVE_COMMAND_KEY = "__inject_serve__"
+SHUTDOWN_COMMAND = "shutdown"
+SHUTDOWN_CLIENT_FLAG = "--shutdown"
+SERVE_SUPPORTED_PYTEST_VERSIONS = "7.0 and above"
+
+
+class InjectionServer:
+    """
+    Replaces the session run loop, waiting for injection payloads on a Unix socket.
+    For every payload, the selected test functions are generated again with the
+    payload injected, and run. Session, module and class scoped fixtures are kept
+    alive between payloads, and torn down only when the server stops, either when
+    it is interrupted, or when a client sends it the shutdown command.
+    """
+
+    def __init__(self, config, injection_plugin):
+        if not hasattr(socket, "AF_UNIX"):
+            raise PytestInjectError("pytest-inject: --inject-serve requires Unix socket support.")
+
+        _check_pytest_internals()
+
+        self.config = config
+        self.injection_plugin = injection_plugin
+        self.socket_path = config.getoption("inject_serve")
+        self._running_outcomes = None
+        self._running_failed_nodeids = None
+        # The node ids of the items collected for every test function, by its collector node id and name.
+        self._collected_tests_nodeids = {}
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_pycollect_makeitem(self, collector, name):
+        outcome = yield
+        generated_items = outcome.get_result()
+        if isinstance(generated_items, list):
+            # All the items of a test function, before they are filtered by the node ids given on the command-line.
+            self._collected_tests_nodeids[(collector.nodeid, name)] = {
+                item.nodeid for item in generated_items if isinstance(item, pytest.Item)
+            }
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtestloop(self, session):
+        if session.testsfailed and not session.config.option.continue_on_collection_errors:
+            raise session.Interrupted(
+                f"{session.testsfailed} error{'s' if session.testsfailed != 1 else ''} during collection"
+            )
+
+        if session.config.option.collectonly:
+            return None
+
+        selected_tests = _get_selected_tests(session.items, self._collected_tests_nodeids)
+
+        _remove_stale_socket(self.socket_path)
+
+        server_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        socket_bound = False
+        try:
+            server_socket.bind(self.socket_path)
+            socket_bound = True
+            server_socket.listen(SERVE_CONNECTIONS_BACKLOG)
+            session.config.get_terminal_writer().line(
+                f"pytest-inject: serving {len(session.items)} tests on '{self.socket_path}'"
+            )
+
+            keep_serving = True
+            while keep_serving:
+                connection, _ = server_socket.accept()
+                with connection:
+                    keep_serving = self._serve_connection(connection, session, selected_tests)
+
+                # The session stops once a payload stopped it, as pytest cannot resume a stopped session.
+                if session.shouldfail:
+                    raise session.Failed(session.shouldfail)
+                if session.shouldstop:
+                    raise session.Interrupted(session.shouldstop)
+
+            return True
+        finally:
+            server_socket.close()
+            # Only the socket this server bound is removed, never a file that was at its path before.
+            if socket_bound and os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+            session._setupstate.teardown_exact(None)
+
+    def pytest_runtest_logreport(self, report):
+        if self._running_outcomes is None:
+            return
+
+        category, _, _ = self.config.hook.pytest_report_teststatus(report=report, config=self.config)
+        if category:
+            self._running_outcomes[category] += 1
+
+        if report.failed:
+            self._running_failed_nodeids.append(report.nodeid)
+
+    def _serve_connection(self, connection, session, selected_tests) -> bool:
+        """
+        Runs the selected tests with the payload received from a client connection,
+        and responds with a summary of their outcomes, or with the error the payload caused.
+        Returns False if the client sent the shutdown command, and True otherwise.
+        """
+        with connection.makefile("rb") as connection_file:
+            raw_payload = connection_file.readline()
+
+        try:
+            payload = json.loads(raw_payload)
+            if not isinstance(payload, dict):
+                raise ValueError(f"expected a JSON object, got {type(payload)} instead.")
+        except ValueError as exception:
+            response = {"error": f"Invalid injection payload: {exception}"}
+        else:
+            if payload == {SERVE_COMMAND_KEY: SHUTDOWN_COMMAND}:
+                connection.sendall(json.dumps({"shutdown": True}).encode() + b"\n")
+                return False
+
+            try:
+                response = self._run_payload(session, selected_tests, payload)
+            except Exception as exception:
+                # A bad payload fails its own request only, and the server keeps serving.
+                response = {"error": f"Error running the injection payload: {type(exception).__name__}: {exception}"}
+
+        connection.sendall(json.dumps(response).encode() + b"\n")
+        return True
+
+    def _run_payload(self, session, selected_tests, payload):
+        """
+        Generates the selected tests again with the payload injected, and runs them,
+        without tearing down fixtures of higher scopes than the function scope.
+        """
+        self.injection_plugin.set_injected_args(payload)
+        items, unmatched_nodeids = _generate_selected_items(selected_tests)
+
+        self._running_outcomes = Counter()
+        self._running_failed_nodeids = []
+        try:
+            if items:
+                # The nodes the previous payload kept set up, that the first item is not under, are torn down.
+                session._setupstate.teardown_exact(items[0])
+
+            for item_index, item in enumerate(items):
+                is_last_item = item_index == len(items) - 1
+                # Passing the parent of the item as the next item of the last item tears
+                # down only the fixtures of the item itself.
+                nextitem = item.parent if is_last_item else items[item_index + 1]
+                item.config.hook.pytest_runtest_protocol(item=item, nextitem=nextitem)
+
+                # As in the pytest run loop, --maxfail, -x and plugins stopping the session skip the remaining items.
+                if session.shouldfail or session.shouldstop:
+                    break
+
+            response = {
+                "outcomes": dict(self._running_outcomes),
+                "failed": self._running_failed_nodeids,
+            }
+            if session.shouldfail or session.shouldstop:
+                response["stopped"] = str(session.shouldfail or session.shouldstop)
+            if unmatched_nodeids:
+                response["unmatched"] = unmatched_nodeids
+
+            return response
+        finally:
+            self._running_outcomes = None
+            self._running_failed_nodeids = None
+
+
+def _check_pytest_internals():
+    """
+    Checks that the private pytest internals serve mode relies on, which are not part of the pytest API,
+    exist in the running pytest version with the interface it expects, raising a PytestInjectError otherwise.
+    """
+    teardown_exact = getattr(SetupState, "teardown_exact", None)
+    if (
+        not hasattr(PyCollector, "_genfunctions")
+        or teardown_exact is None
+        or list(inspect.signature(teardown_exact).parameters) != ["self", "nextitem"]
+    ):
+        raise PytestInjectError(
+            f"pytest-inject: --inject-serve is not supported by pytest {pytest.__version__}, "
+            f"it supports pytest {SERVE_SUPPORTED_PYTEST_VERSIONS}."
+        )
+
+
+def _remove_stale_socket(socket_path):
+    """
+    Removes a socket left at the server socket path by a server that is no longer running.
+    Raises a usage error if the path is a file that is not a socket, or a socket of a running server.
+    """
+    try:
+        path_mode = os.stat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+
+    if not stat.S_ISSOCK(path_mode):
+        raise pytest.UsageError(
+            f"pytest-inject: Cannot serve on '{socket_path}', as it is an existing file that is not a socket."
+        )
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client_socket:
+        try:
+            client_socket.connect(socket_path)
+        except ConnectionRefusedError:
+            os.unlink(socket_path)
+            return
+
+    raise pytest.UsageError(f"pytest-inject: Cannot serve on '{socket_path}', as another server is serving on it.")
+
+
+def _get_selected_tests(items, collected_tests_nodeids):
+    """
+    Groups the selected items by the test functions they were generated from,
+    returning a list of the generating collector, the test function name, and the
+    selected item node ids of every test function, or None if all its collected items
+    were selected. Items not generated from a python test function are returned as is,
+    with no function name.
+    """
+    selected_tests = {}
+
+    for item in items:
+        originalname = getattr(item, "originalname", None)
+        if originalname is None:
+            selected_tests[item.nodeid] = (item, None, None)
+            continue
+
+        test_key = (item.parent.nodeid, originalname)
+        if test_key not in selected_tests:
+            selected_tests[test_key] = (item.parent, originalname, set())
+
+        selected_tests[test_key][2].add(item.nodeid)
+
+    for test_key, (collector, originalname, selected_nodeids) in selected_tests.items():
+        if originalname is not None and selected_nodeids == collected_tests_nodeids.get(test_key):
+            selected_tests[test_key] = (collector, originalname, None)
+
+    return list(selected_tests.values())
+
+
+def _generate_selected_items(selected_tests):
+    """
+    Generates the items of the selected test functions again, returning them along with
+    the selected node ids that were not generated again, as the injection changed them.
+    All the generated items of test functions whose items were all selected are kept,
+    and only the items whose node id was selected are kept for the other test functions.
+    """
+    items = []
+    unmatched_nodeids = []
+
+    for collector, originalname, selected_nodeids in selected_tests:
+        if originalname is None:
+            items.append(collector)
+            continue
+
+        generated_items = list(collector._genfunctions(originalname, getattr(collector.obj, originalname)))
+        if selected_nodeids is None:
+            items.extend(generated_items)
+            continue
+
+        selected_generated_items = [item for item in generated_items if item.nodeid in selected_nodeids]
+        items.extend(selected_generated_items)
+        unmatched_nodeids.extend(sorted(
+            selected_nodeids.difference(item.nodeid for item in selected_generated_items)
+        ))
+
+    return items, unmatched_nodeids
+
+
+def send_payload(socket_path, payload):
+    """
+    Sends an injection payload to a pytest-inject server, returning its response.
+
+    :param socket_path: The path of the Unix socket given to --inject-serve.
+    :param payload: A dictionary of argument names and their injected values.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client_socket:
+        client_socket.connect(socket_path)
+        client_socket.sendall(json.dumps(payload).encode() + b"\n")
+
+        raw_response = b""
+        while not raw_response.endswith(b"\n"):
+            chunk = client_socket.recv(RESPONSE_CHUNK_SIZE)
+            if not chunk:
+                break
+
+            raw_response += chunk
+
+    return json.loads(raw_response)
+
+
+def shutdown_server(socket_path):
+    """
+    Sends the shutdown command to a pytest-inject server, which tears down all
+    the fixtures and ends its test session, returning its response.
+
+    :param socket_path: The path of the Unix socket given to --inject-serve.
+    """
+    return send_payload(socket_path, {SERVE_COMMAND_KEY: SHUTDOWN_COMMAND})
+
+
+def main():
+    if len(sys.argv) != 3:
+        sys.exit(__doc__)
+
+    # Imported here, as the client does not need it to be loaded as a pytest plugin.
+    from pytest_inject.sources import _resolve_json_input
+
+    socket_path, raw_payload = sys.argv[1:]
+    if raw_payload == SHUTDOWN_CLIENT_FLAG:
+        response = shutdown_server(socket_path)
+    else:
+        response = send_payload(socket_path, _resolve_json_input(raw_payload))
+    print(json.dumps(response, indent=2))
+
+    if "error" in response or response.get("failed") or response.get("unmatched"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Module containing the short ids of injected values, enabled by --inject-short-ids.
+
+The id of an injected value is a blake2 digest of its canonical serialization,
+so it is short however large the value is, and stable between test runs. Numbers,
+booleans and None keep the ids pytest gives them, which are short already.
+"""
+import hashlib
+import json
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from pytest_inject.lazy_json import LazyJsonDict
+
+# Magic constants
+SHORT_ID_PREFIX = "inj-"
+SHORT_ID_DIGEST_SIZE = 8
+SHORT_IDS_CACHE_KEY = "pytest_inject/short_ids"
+SHORT_IDS_EXCLUDED_TYPES = (type(None), bool, int, float)
+
+
+class InjectedValuesShortIds:
+    """
+    The short ids of the injected values, found by the argument name and the identity of the
+    injected objects, so they are given to the values of the arguments they were injected into only.
+    Interned and cached objects, like short strings, are shared by unrelated arguments, so their
+    identity alone does not tell whether they were injected.
+    """
+
+    def __init__(self, injected_args_dicts: Iterable[Dict[str, Any]]):
+        self._short_ids_by_arg_value_identity: Dict[Tuple[str, int], str] = {}
+        self._short_ids_by_value_identity: Dict[int, str] = {}
+        self.short_ids_arg_names: Dict[str, List[str]] = {}
+        # The injected values are kept alive, so their identities are never reused.
+        self._injected_values = []
+        # Lazily decoded JSON dicts, and how many of their loaded keys were given short ids.
+        self._lazy_json_dicts_loaded_counts: List[List] = []
+
+        for injected_args in injected_args_dicts:
+            if isinstance(injected_args, LazyJsonDict):
+                # Values are given short ids once they are decoded, instead of decoding all of them.
+                self._lazy_json_dicts_loaded_counts.append([injected_args, 0])
+                continue
+
+            for arg_name, injected_value in injected_args.items():
+                self._add_injected_value(arg_name, injected_value)
+
+    def get_id(self, value: Any, arg_name: str) -> Optional[str]:
+        """
+        Returns the short id of a value injected into an argument, or None for values that
+        were not injected into it, letting pytest generate their id.
+        """
+        if self._lazy_json_dicts_loaded_counts:
+            self._add_loaded_lazy_json_values()
+
+        return self._short_ids_by_arg_value_identity.get((arg_name, id(value)))
+
+    def _add_injected_value(self, arg_name: str, injected_value: Any):
+        if isinstance(injected_value, SHORT_IDS_EXCLUDED_TYPES):
+            return
+
+        # Values injected into several arguments are digested once.
+        short_id = self._short_ids_by_value_identity.get(id(injected_value))
+        if short_id is None:
+            short_id = get_short_id(injected_value)
+            self._short_ids_by_value_identity[id(injected_value)] = short_id
+            self._injected_values.append(injected_value)
+
+        self._short_ids_by_arg_value_identity[(arg_name, id(injected_value))] = short_id
+
+        arg_names = self.short_ids_arg_names.setdefault(short_id, [])
+        if arg_name not in arg_names:
+            arg_names.append(arg_name)
+
+    def _add_loaded_lazy_json_values(self):
+        """
+        Gives short ids to the values of the lazily decoded JSON dicts decoded since the last call.
+        """
+        for lazy_json_dict_loaded_count in self._lazy_json_dicts_loaded_counts:
+            lazy_json_dict, loaded_count = lazy_json_dict_loaded_count
+            for arg_name in lazy_json_dict.loaded_keys[loaded_count:]:
+                if arg_name in lazy_json_dict:
+                    self._add_injected_value(arg_name, lazy_json_dict[arg_name])
+
+            lazy_json_dict_loaded_count[1] = len(lazy_json_dict.loaded_keys)
+
+    def get_ids_arg(
+            self,
+            ids_arg: Union[None, Callable, List],
+            injected_arg_names: Iterable[str],
+    ) -> Union[None, Callable, List]:
+        """
+        Returns the parameterize ids argument letting the values injected into the given arguments
+        get their short ids from pytest_make_parametrize_id, which is given their argument name,
+        while keeping an explicit ids list, and using an ids function for other values.
+        """
+        if not callable(ids_arg):
+            return ids_arg
+
+        injected_values_identities = {
+            value_identity for arg_name, value_identity in self._short_ids_by_arg_value_identity
+            if arg_name in injected_arg_names
+        }
+        return lambda value: None if id(value) in injected_values_identities else ids_arg(value)
+
+
+def get_short_id(value: Any) -> str:
+    """
+    Returns the short id of a value, a digest of its canonical serialization.
+    Values that cannot be serialized as JSON are serialized by their repr, except
+    sets, serialized by their sorted elements serializations.
+    """
+    try:
+        serialized_value = _serialize(value)
+    except (TypeError, ValueError):
+        # Dicts with keys that cannot be sorted, or circular containers.
+        serialized_value = repr(value)
+
+    digest = hashlib.blake2b(serialized_value.encode(), digest_size=SHORT_ID_DIGEST_SIZE).hexdigest()
+
+    return f"{SHORT_ID_PREFIX}{digest}"
+
+
+def _serialize(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=_serialize_non_json_value)
+
+
+def _serialize_non_json_value(value: Any) -> Any:
+    """
+    Returns a JSON serializable stand-in of a value JSON cannot serialize.
+    The order of the elements of sets depends on string hashing, which is randomized
+    between interpreter runs, so they are serialized sorted, tagged by their type.
+    """
+    if isinstance(value, (set, frozenset)):
+        return [type(value).__name__, sorted(_serialize(element) for element in value)]
+
+    return repr(value)
+
+
+def store_short_ids(config, short_ids_arg_names: Dict[str, List[str]]):
+    """
+    Writes the injected argument names of every short id of the test session to
+    pytest's cache, unless pytest's cache provider is disabled.
+    """
+    pytest_cache = getattr(config, "cache", None)
+    if pytest_cache is not None:
+        pytest_cache.set(SHORT_IDS_CACHE_KEY, short_ids_arg_names)
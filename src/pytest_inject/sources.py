@@ -0,0 +1,294 @@
+"""
+Module containing the resolution of the injection inputs given on the command-line.
+"""
+import json
+import os
+import runpy
+from functools import partial
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from pytest_inject.dict_cache import get_cache_key, get_inject_dict_cache
+from pytest_inject.dict_factories import needs_concurrent_resolution, resolve_concurrently
+from pytest_inject.exceptions import PytestInjectError, PytestInjectWarning
+from pytest_inject.file_sources import load_injection_file
+from pytest_inject.layers import merge_injection_layers
+from pytest_inject.lazy_batch import LazyBatchPayloads, load_lazy_batch_payloads
+from pytest_inject.lazy_json import LAZY_JSON_MIN_FILE_SIZE, load_lazy_json_dict
+from pytest_inject.matrix import ZIP_MATRIX_MODE
+
+# Magic constants
+INJECT_DICT_INPUT_FILE_TO_ATTRIBUTE_SEPERATOR = "::"
+MAX_LAYERS_RESOLVING_THREADS = 8
+
+
+def resolve_injection_input(config, dict_timings: Optional[Dict[str, float]] = None) -> Mapping[str, Any]:
+    """
+    Resolves the injected arguments from the injection command-line options,
+    returning an empty dict if no injection input was given.
+    Every --inject-file, --inject-json and --inject-dict source is a layer, resolved
+    concurrently with the other layers, and merged with them in precedence order.
+
+    :param config: The pytest config holding the injection command-line options.
+    :param dict_timings: A dict to fill with the seconds each concurrently resolved
+            value of the --inject-dict dicts took.
+    """
+    injection_json_raw_inputs = config.getoption("inject_json", default=None) or []
+    injection_dict_raw_inputs = config.getoption("inject_dict", default=None) or []
+    injection_file_raw_inputs = config.getoption("inject_file", default=None) or []
+    injection_batch_raw_input = config.getoption("inject_batch", default=None)
+
+    layers_raw_inputs_given = injection_json_raw_inputs or injection_dict_raw_inputs or injection_file_raw_inputs
+    if injection_batch_raw_input and layers_raw_inputs_given:
+        raise PytestInjectError(
+            "pytest-inject: --inject-batch cannot be used together with --inject-json, --inject-dict "
+            "or --inject-file in the same test run. Add the arguments to every batch payload instead."
+        )
+    elif injection_batch_raw_input and config.getoption("inject_serve", default=None):
+        raise PytestInjectError(
+            "pytest-inject: --inject-batch cannot be used together with --inject-serve "
+            "in the same test run."
+        )
+
+    # The layers in precedence order, the later overriding the earlier.
+    decoded_layers_resolvers = [
+        *(partial(load_injection_file, raw_input) for raw_input in injection_file_raw_inputs),
+        *(partial(_resolve_json_input, raw_input, lazy=True) for raw_input in injection_json_raw_inputs),
+    ]
+    # Python dict files are executed with runpy, which swaps sys.argv[0] and sys.modules entries
+    # while they run, and may issue config warnings, so they are resolved one by one in this thread.
+    python_dict_layers_resolvers = [
+        partial(_resolve_cached_python_dict_input, config, raw_input, dict_timings)
+        for raw_input in injection_dict_raw_inputs
+    ]
+    if not decoded_layers_resolvers and not python_dict_layers_resolvers:
+        return {}
+    elif len(decoded_layers_resolvers) + len(python_dict_layers_resolvers) == 1:
+        layer_resolver, = decoded_layers_resolvers or python_dict_layers_resolvers
+        return merge_injection_layers([layer_resolver()])
+
+    # Files are mostly I/O bound to read and decode, so they are resolved in threads, while the
+    # python dict files are executed.
+    from concurrent.futures import ThreadPoolExecutor
+
+    max_workers = min(max(len(decoded_layers_resolvers), 1), MAX_LAYERS_RESOLVING_THREADS)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        decoded_layers_futures = [executor.submit(layer_resolver) for layer_resolver in decoded_layers_resolvers]
+        python_dict_layers = [layer_resolver() for layer_resolver in python_dict_layers_resolvers]
+        decoded_layers = [decoded_layer_future.result() for decoded_layer_future in decoded_layers_futures]
+
+    return merge_injection_layers(decoded_layers + python_dict_layers)
+
+
+def resolve_matrix_input(config) -> Dict[str, List[Any]]:
+    """
+    Resolves the matrix given to --inject-matrix, as a JSON string or a path to a JSON file,
+    mapping argument names to their candidate values.
+    Returns an empty dict if no matrix input was given.
+    """
+    matrix_raw_input = config.getoption("inject_matrix", default=None)
+    if not matrix_raw_input:
+        return {}
+
+    if config.getoption("inject_batch", default=None) or config.getoption("inject_serve", default=None):
+        raise PytestInjectError(
+            "pytest-inject: --inject-matrix cannot be used together with --inject-batch "
+            "or --inject-serve in the same test run."
+        )
+
+    matrix = _resolve_json_input(matrix_raw_input)
+    if not isinstance(matrix, dict):
+        raise PytestInjectError(
+            f"pytest-inject: expected a JSON object of candidate values lists in --inject-matrix, "
+            f"got {type(matrix)} instead."
+        )
+
+    for arg_name, candidates in matrix.items():
+        if not isinstance(candidates, list) or not candidates:
+            raise PytestInjectError(
+                f"pytest-inject: expected a non-empty list of candidate values for '{arg_name}' "
+                f"in --inject-matrix, got {candidates!r} instead."
+            )
+
+    if config.getoption("inject_matrix_mode", default=None) == ZIP_MATRIX_MODE:
+        candidates_counts = {len(candidates) for candidates in matrix.values()}
+        if len(candidates_counts) > 1:
+            raise PytestInjectError(
+                "pytest-inject: all the arguments of a zipped --inject-matrix must have the same "
+                "number of candidate values."
+            )
+
+    return matrix
+
+
+def resolve_batch_input(config) -> LazyBatchPayloads:
+    """
+    Scans the JSONL file given to --inject-batch, validating its payloads line by line,
+    and returns them, decoded from the file again one line at a time when iterated.
+    Returns empty batch payloads if no batch input was given.
+    """
+    batch_file_path = config.getoption("inject_batch", default=None)
+    if not batch_file_path:
+        return load_lazy_batch_payloads(None)
+
+    if not os.path.isfile(batch_file_path):
+        raise PytestInjectError(f"pytest-inject: Batch file not found: '{batch_file_path}'")
+
+    return load_lazy_batch_payloads(batch_file_path)
+
+
+def _resolve_json_input(raw_input: str, lazy: bool = False) -> Dict[str, Any]:
+    """
+    Parses JSON input (file path or raw string) into a dictionary.
+    If lazy is True, large JSON files of an object are resolved into a dict
+    decoding the value of every key only when it is first read.
+    """
+    if os.path.isfile(raw_input):
+        try:
+            if lazy and os.path.getsize(raw_input) >= LAZY_JSON_MIN_FILE_SIZE:
+                lazy_json_dict = load_lazy_json_dict(raw_input)
+                if lazy_json_dict is not None:
+                    return lazy_json_dict
+
+            with open(raw_input) as file:
+                return json.load(file)
+        except Exception as exception:
+            raise PytestInjectError(
+                f"pytest-inject: Error reading file '{raw_input}'."
+            ) from exception
+    else:
+        try:
+            return json.loads(raw_input)
+        except json.JSONDecodeError as exception:
+            raise PytestInjectError(
+                "pytest-inject: Invalid JSON input, or a none existent "
+                "file path that is parsed as JSON."
+            ) from exception
+
+
+def _resolve_cached_python_dict_input(
+        config,
+        path: str,
+        timings: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """
+    Loads a dict from a python file, through the on-disk cache if --inject-dict-cache
+    was given. Falls back to loading it from the python file on every run, if the
+    dict cannot be pickled, or pytest's cache provider is disabled.
+    """
+    max_workers = config.getoption("inject_dict_workers", default=None)
+    if not config.getoption("inject_dict_cache", default=False):
+        return _resolve_python_dict_input(path, max_workers, timings)
+
+    dict_cache = get_inject_dict_cache(config)
+    if dict_cache is None:
+        config.issue_config_time_warning(
+            PytestInjectWarning(
+                "pytest-inject: --inject-dict-cache requires pytest's cache provider, "
+                "which is disabled. The dict is loaded without caching."
+            ),
+            stacklevel=2,
+        )
+        return _resolve_python_dict_input(path, max_workers, timings)
+
+    file_path, target_name = _split_python_dict_input(path)
+    dependency_paths = config.getoption("inject_dict_cache_deps", default=None) or []
+    for dependency_path in dependency_paths:
+        if not os.path.isfile(dependency_path):
+            raise PytestInjectError(f"pytest-inject: Cache dependency file not found: '{dependency_path}'")
+
+    cache_key = get_cache_key(file_path, target_name, dependency_paths)
+    injections_dict = dict_cache.load(cache_key)
+    if injections_dict is not None:
+        return injections_dict
+
+    injections_dict = _resolve_python_dict_input(path, max_workers, timings)
+    if not dict_cache.store(cache_key, injections_dict):
+        config.issue_config_time_warning(
+            PytestInjectWarning(
+                f"pytest-inject: The dict from '{path}' cannot be pickled, so it was not cached, "
+                f"and is loaded from the python file on every run."
+            ),
+            stacklevel=2,
+        )
+
+    return injections_dict
+
+
+def _split_python_dict_input(path: str) -> Tuple[str, str]:
+    """
+    Splits a python dict input into its python file path and its target name.
+    """
+    if INJECT_DICT_INPUT_FILE_TO_ATTRIBUTE_SEPERATOR in path:
+        file_path, target_name = path.rsplit(INJECT_DICT_INPUT_FILE_TO_ATTRIBUTE_SEPERATOR, 1)
+    else:
+        raise PytestInjectError(f"pytest-inject: No target specified in python input '{path}'.")
+
+    if not os.path.isfile(file_path):
+        raise PytestInjectError(f"pytest-inject: Python file not found: '{file_path}'")
+
+    return file_path, target_name
+
+
+def _resolve_python_dict_input(  # type: ignore
+        path: str,
+        max_workers: Optional[int] = None,
+        timings: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """
+    Loads a dict from a python file.
+    Can load either a variable or a getter function/callable to get the dict from.
+    The getter can be an async function, and the values of the dict can be awaitables
+    or blocking factories, all resolved concurrently.
+
+    Format: "path/to/file.py::variable_or_function"
+    """
+    file_path, target_name = _split_python_dict_input(path)
+
+    try:
+        module_globals = runpy.run_path(file_path)
+    except Exception as exception:
+        raise PytestInjectError(
+            f"pytest-inject: Error executing python script '{file_path}'."
+        ) from exception
+
+    if target_name not in module_globals:
+        raise PytestInjectError(f"pytest-inject: '{target_name}' not found in '{file_path}'")
+
+    obj = module_globals[target_name]
+
+    if callable(obj):
+        try:
+            injections_dict = obj()
+        except Exception as exception:
+            raise PytestInjectError(
+                f"pytest-inject: Error calling function '{target_name}'"
+                f" in '{file_path}'."
+            ) from exception
+    else:
+        injections_dict = obj
+
+    if needs_concurrent_resolution(injections_dict):
+        try:
+            injections_dict = resolve_concurrently(injections_dict, max_workers, timings)
+        except PytestInjectError:
+            raise
+        except Exception as exception:
+            raise PytestInjectError(
+                f"pytest-inject: Error calling function '{target_name}'"
+                f" in '{file_path}'."
+            ) from exception
+
+    if not isinstance(injections_dict, dict):
+        raise PytestInjectError(
+            f"pytest-inject: expected a dict from '{target_name}' in '{file_path}', "
+            f"got {type(injections_dict)} instead."
+        )
+
+    for key in injections_dict:
+        if not isinstance(key, str):
+            raise PytestInjectError(
+                f"pytest-inject: expected string keys in the dict from '{target_name}' "
+                f"in '{file_path}', got key of type {type(key)} instead."
+            )
+
+    return injections_dict
@@ -0,0 +1,260 @@
+"""
+Module containing the validation of the injection input against the collected tests, enabled by --inject-strict.
+
+While the tests are generated, every injected value is checked against the annotations of the
+test parameter consuming it, the return annotation of the fixture it overrides, the annotations
+of the fixture parameters consuming it, and the types of the original parameter sets of the
+parametrize marker it is injected into. Once the tests are collected, the injected arguments
+no collected test consumed are reported along with the mismatching values, before any test runs.
+The annotations of every test and fixture function are resolved once, and indexed by function.
+"""
+import inspect
+import types
+import typing
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import pytest
+
+from pytest_inject.injector import PARAMETERIZE_MARKER_TAG, _get_marker_parameter_sets, _get_parameterize_arg_names
+from pytest_inject.lazy import LazyValue
+
+# Magic constants
+MAX_REPORTED_VALUE_LENGTH = 80
+UNION_TYPES = tuple(union_type for union_type in (typing.Union, getattr(types, "UnionType", None)) if union_type)
+# The types whose values are accepted where another type is expected: ints as floats, as in the numeric
+# tower, and lists and tuples as each other, as JSON has no tuples.
+COMPATIBLE_TYPES = {
+    float: (int,),
+    complex: (int, float),
+    tuple: (list,),
+    list: (tuple,),
+}
+
+
+class StrictInjectionValidator:
+    """
+    Records the injected arguments the generated tests consume, and the injected values
+    mismatching the annotations and parameter sets they are injected into.
+    """
+
+    def __init__(self):
+        self._consumed_arg_names: Set[str] = set()
+        self._consumed_scoped_args: Set[Tuple[str, str]] = set()
+        self._problems: List[str] = []
+        # The resolved annotations of every test and fixture function, by function.
+        self._annotations_index: Dict[Callable, Dict[str, Any]] = {}
+
+    def record_consumed(self, arg_names: Iterable[str], scoped_patterns: Iterable[str] = ()):
+        """
+        Records the injected arguments a test consumes, and the node id scoped patterns matching it.
+        """
+        arg_names = set(arg_names)
+        self._consumed_arg_names.update(arg_names)
+        self._consumed_scoped_args.update(
+            (pattern, arg_name) for pattern in scoped_patterns for arg_name in arg_names
+        )
+
+    def validate_injected_values(self, metafunc, injected_values: Iterable[Tuple[str, Any]]):
+        """
+        Checks the values injected into a test against the annotations of the test and its fixtures
+        consuming them, and the types of the original parameter sets they are injected into.
+        Must be called before the parametrize markers of the test are rewritten.
+
+        :param metafunc: The metafunc of the test the values are injected into.
+        :param injected_values: Pairs of argument names and the values injected into them.
+        """
+        for arg_name, injected_value in injected_values:
+            # Lazy values are created when the test sets up, so their type is unknown yet.
+            if isinstance(injected_value, LazyValue):
+                continue
+
+            for expected_type_description, matches in self._iter_expected_types(metafunc, arg_name):
+                if matches(injected_value) is False:
+                    self._problems.append(
+                        f"'{arg_name}' injected into '{metafunc.definition.nodeid}' is "
+                        f"{_describe_value(injected_value)}, while {expected_type_description}."
+                    )
+
+    def raise_for_problems(self, injected_args_dicts: Iterable[Tuple[Optional[str], Iterable[str]]]):
+        """
+        Raises a usage error listing the injected arguments no collected test consumed,
+        and the mismatching injected values, if there are any, so pytest reports it
+        without a traceback and exits with the usage error exit code.
+
+        :param injected_args_dicts: Pairs of the node id scoped pattern of injected arguments,
+                or None if they are not scoped, and their names.
+        """
+        unconsumed_args_problems = []
+        for pattern, arg_names in injected_args_dicts:
+            for arg_name in arg_names:
+                if pattern is None and arg_name not in self._consumed_arg_names:
+                    unconsumed_args_problems.append(f"'{arg_name}' was not consumed by any collected test.")
+                elif pattern is not None and (pattern, arg_name) not in self._consumed_scoped_args:
+                    unconsumed_args_problems.append(
+                        f"'{arg_name}' scoped to '{pattern}' was not consumed by any collected test it matches."
+                    )
+
+        problems = unconsumed_args_problems + list(dict.fromkeys(self._problems))
+        if problems:
+            raise pytest.UsageError(
+                f"pytest-inject: --inject-strict found problems in the injection input:\n"
+                + "\n".join(f"- {problem}" for problem in problems)
+            )
+
+    def _iter_expected_types(self, metafunc, arg_name: str):
+        """
+        Yields pairs of a description of a type an injected argument is expected to have,
+        and a check of a value, returning None if the value cannot be checked.
+        """
+        test_annotation = self._get_annotations(metafunc.function).get(arg_name)
+        if test_annotation is not None:
+            yield (
+                f"the test parameter is annotated {_describe_annotation(test_annotation)}",
+                lambda value: _matches_annotation(value, test_annotation),
+            )
+
+        for fixture_name, fixturedefs in metafunc._arg2fixturedefs.items():
+            if not fixturedefs:
+                continue
+
+            # The last definition of a fixture is the one overriding the others for the test.
+            fixture_function = fixturedefs[-1].func
+            fixture_annotations = self._get_annotations(fixture_function)
+            if fixture_name == arg_name:
+                fixture_annotation = _get_fixture_value_annotation(fixture_function, fixture_annotations.get("return"))
+                description = "the fixture it overrides returns"
+            else:
+                fixture_annotation = fixture_annotations.get(arg_name)
+                description = f"the parameter of the fixture '{fixture_name}' is annotated"
+
+            if fixture_annotation is not None:
+                yield (
+                    f"{description} {_describe_annotation(fixture_annotation)}",
+                    lambda value, annotation=fixture_annotation: _matches_annotation(value, annotation),
+                )
+
+        original_types = _get_parameter_sets_types(metafunc, arg_name)
+        if original_types:
+            yield (
+                f"the original parameter sets are of type {' or '.join(sorted(t.__name__ for t in original_types))}",
+                lambda value: any(_is_instance(value, original_type) for original_type in original_types),
+            )
+
+    def _get_annotations(self, function: Callable) -> Dict[str, Any]:
+        annotations = self._annotations_index.get(function)
+        if annotations is None:
+            annotations = self._annotations_index[function] = _resolve_annotations(function)
+
+        return annotations
+
+
+def _resolve_annotations(function: Callable) -> Dict[str, Any]:
+    """
+    Returns the resolved annotations of a function, without the ones that cannot be resolved.
+    """
+    function = inspect.unwrap(function)
+    try:
+        return typing.get_type_hints(function)
+    except Exception:
+        # Annotations referencing names that cannot be resolved are skipped, keeping the others.
+        return {
+            name: annotation for name, annotation in getattr(function, "__annotations__", {}).items()
+            if not isinstance(annotation, str)
+        }
+
+
+def _get_fixture_value_annotation(fixture_function: Callable, return_annotation: Any) -> Any:
+    """
+    Returns the annotation of the value of a fixture, which is the type yielded by generator
+    fixtures, or None if it is not annotated, or cannot be told from the return annotation.
+    """
+    fixture_function = inspect.unwrap(fixture_function)
+    if inspect.iscoroutinefunction(fixture_function) or inspect.isasyncgenfunction(fixture_function):
+        return None
+    elif inspect.isgeneratorfunction(fixture_function):
+        # Generator[YieldType, ...] and Iterator[YieldType] annotations hold the value type first.
+        return_annotation_args = typing.get_args(return_annotation)
+        return return_annotation_args[0] if return_annotation_args else None
+
+    return return_annotation
+
+
+def _matches_annotation(value: Any, annotation: Any) -> Optional[bool]:
+    """
+    Checks if a value matches an annotation, returning None if the annotation cannot be checked.
+    Generic annotations are checked by their origin type only.
+    """
+    if annotation is typing.Any:
+        return None
+
+    origin = typing.get_origin(annotation)
+    if origin in UNION_TYPES:
+        matches = [_matches_annotation(value, arg) for arg in typing.get_args(annotation)]
+        if True in matches:
+            return True
+
+        return None if None in matches else False
+    elif origin is typing.Literal:
+        return value in typing.get_args(annotation)
+    elif origin is not None:
+        annotation = origin
+
+    if annotation is None or annotation is type(None):
+        return value is None
+    elif not isinstance(annotation, type) or annotation is typing.Any:
+        return None
+
+    try:
+        return _is_instance(value, annotation)
+    except TypeError:
+        # Types refusing isinstance checks, like some protocols.
+        return None
+
+
+def _is_instance(value: Any, expected_type: type) -> bool:
+    """
+    Checks if a value is an instance of a type, or of a type compatible with it.
+    """
+    return isinstance(value, expected_type) or isinstance(value, COMPATIBLE_TYPES.get(expected_type, ()))
+
+
+def _get_parameter_sets_types(metafunc, arg_name: str) -> Set[type]:
+    """
+    Returns the types of the values of an argument in the original parameter sets of the
+    parametrize markers of a test, or an empty set if it is not directly parametrized,
+    or any of its original values is None or a lazy value.
+    The markers are parsed as they are when values are injected into them.
+    """
+    for marker in metafunc.definition.iter_markers(PARAMETERIZE_MARKER_TAG):
+        marker_arg_names = _get_parameterize_arg_names(marker)
+        if arg_name not in marker_arg_names:
+            continue
+
+        indirect = marker.kwargs.get("indirect", False)
+        if indirect is True or (isinstance(indirect, (list, tuple)) and arg_name in indirect):
+            return set()
+
+        arg_index = marker_arg_names.index(arg_name)
+        original_types = set()
+        for parameter_set in _get_marker_parameter_sets(marker, marker_arg_names):
+            value = parameter_set.values[arg_index]
+            if value is None or isinstance(value, LazyValue):
+                return set()
+
+            original_types.add(type(value))
+
+        return original_types
+
+    return set()
+
+
+def _describe_value(value: Any) -> str:
+    value_repr = repr(value)
+    if len(value_repr) > MAX_REPORTED_VALUE_LENGTH:
+        value_repr = f"{value_repr[:MAX_REPORTED_VALUE_LENGTH]}..."
+
+    return f"{value_repr} of type {type(value).__name__}"
+
+
+def _describe_annotation(annotation: Any) -> str:
+    return annotation.__name__ if isinstance(annotation, type) else repr(annotation)
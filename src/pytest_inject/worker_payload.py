@@ -0,0 +1,83 @@
+"""
+Module containing the transfer of the resolved injection payload from the
+pytest-xdist controller to its workers, so the injection input is resolved
+once per test session instead of once per worker.
+
+Small payloads are sent to the workers pickled in their worker input. Large
+payloads are written once to a temporary file, that every worker memory-maps
+and unpickles, instead of sending a copy of the payload to each of them.
+Workers that do not receive a payload, as it could not be pickled, or their
+payload file is on another host, resolve the injection input themselves.
+"""
+import mmap
+import os
+import pickle
+import tempfile
+from typing import Any, Optional
+
+# Magic constants
+WORKER_INPUT_KEY = "pytest_inject_payload"
+WORKER_INPUT_PICKLE_KEY = "pickle"
+WORKER_INPUT_PICKLE_PATH_KEY = "pickle_path"
+PAYLOAD_FILE_MIN_SIZE = 1024 * 1024
+PAYLOAD_FILE_PREFIX = "pytest-inject-payload-"
+
+
+class WorkerPayloadSender:
+    """
+    Pickles a payload once on the xdist controller, and adds it to the input of every worker.
+    """
+
+    def __init__(self, payload: Any):
+        self._worker_input_value = None
+        self._payload_file_path = None
+
+        try:
+            pickled_payload = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return
+
+        if len(pickled_payload) < PAYLOAD_FILE_MIN_SIZE:
+            self._worker_input_value = {WORKER_INPUT_PICKLE_KEY: pickled_payload}
+        else:
+            payload_file_descriptor, self._payload_file_path = tempfile.mkstemp(prefix=PAYLOAD_FILE_PREFIX)
+            with os.fdopen(payload_file_descriptor, "wb") as payload_file:
+                payload_file.write(pickled_payload)
+
+            self._worker_input_value = {WORKER_INPUT_PICKLE_PATH_KEY: self._payload_file_path}
+
+    def add_to_worker_input(self, worker_input: dict):
+        """
+        Adds the payload to the input of a worker, unless it could not be pickled.
+        """
+        if self._worker_input_value is not None:
+            worker_input[WORKER_INPUT_KEY] = self._worker_input_value
+
+    def close(self):
+        """
+        Removes the payload file, if one was written.
+        """
+        if self._payload_file_path is not None and os.path.exists(self._payload_file_path):
+            os.unlink(self._payload_file_path)
+
+
+def load_worker_payload(config) -> Optional[Any]:
+    """
+    Returns the payload sent by the xdist controller to this worker, or None if this
+    process is not an xdist worker, or its payload was not sent or cannot be loaded.
+    """
+    worker_input = getattr(config, "workerinput", None)
+    if not worker_input or WORKER_INPUT_KEY not in worker_input:
+        return None
+
+    worker_input_value = worker_input[WORKER_INPUT_KEY]
+
+    try:
+        if WORKER_INPUT_PICKLE_KEY in worker_input_value:
+            return pickle.loads(worker_input_value[WORKER_INPUT_PICKLE_KEY])
+
+        with open(worker_input_value[WORKER_INPUT_PICKLE_PATH_KEY], "rb") as payload_file:
+            with mmap.mmap(payload_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_payload:
+                return pickle.loads(mapped_payload)
+    except Exception:
+        return None
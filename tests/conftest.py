@@ -1,4 +1,4 @@
 pytest_plugins = ["pytest_inject"]
 
 # Disable collection of the injected tests to avoid running them without injection
-collect_ignore = ["tests_injected"]
+collect_ignore = ["tests_injected", "tests_fingerprinted"]
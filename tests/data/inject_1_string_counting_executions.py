@@ -0,0 +1,13 @@
+from pathlib import Path
+
+with open(Path(__file__).with_suffix(".executions"), "a") as executions_file:
+    executions_file.write("executed\n")
+
+injected_args = {
+    "injected_string_parameter": "INJECTED",
+}
+
+unpicklable_injected_args = {
+    "injected_string_parameter": "INJECTED",
+    "unpicklable_argument": lambda: None,
+}
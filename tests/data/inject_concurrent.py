@@ -0,0 +1,25 @@
+import asyncio
+import threading
+
+from pytest_inject import blocking
+
+# Every value waits for all the others to start, so the dict resolves only if they are resolved concurrently.
+_all_values_started = threading.Barrier(3, timeout=5)
+
+
+async def _async_value(value):
+    await asyncio.get_running_loop().run_in_executor(None, _all_values_started.wait)
+    return value
+
+
+def _blocking_value(value):
+    _all_values_started.wait()
+    return value
+
+
+async def concurrent_injected_args():
+    return {
+        "injected_string_parameter": _async_value("INJECTED"),
+        "first_not_consumed": blocking(lambda: _blocking_value(1)),
+        "second_not_consumed": blocking(lambda: _blocking_value(2)),
+    }
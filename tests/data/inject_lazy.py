@@ -0,0 +1,19 @@
+from pytest_inject import lazy
+
+
+def _fail_deselected_test_evaluation():
+    raise AssertionError("A lazy value of a deselected test was evaluated.")
+
+
+lazy_injected_args = {
+    "injected_string_parameter": lazy(lambda: "INJECTED"),
+    "injected_string_fixture": lazy(_fail_deselected_test_evaluation),
+}
+
+module_scoped_lazy_injected_args = {
+    "lazy_value_parameter": lazy(object, scope="module"),
+}
+
+function_scoped_lazy_injected_args = {
+    "lazy_value_parameter": lazy(object),
+}
@@ -0,0 +1,4 @@
+# Interned, so it is the same object as the "b" parameter of the injected test.
+injected_args = {
+    "letter_injected_parameter": "b",
+}
@@ -1,9 +1,21 @@
 from _pytest.main import Session
 
+INJECTION_PLUGIN_NAME = "pytest_inject_injection"
+
 
 class PytestSessionReporter:
     def __init__(self):
         self.tests_collected = 0
+        self.tests_deselected = 0
+        self.tests_nodeids = []
+        self.injection_plugin_registered = False
+
+    def pytest_collection_finish(self, session: Session):
+        self.tests_nodeids = [item.nodeid for item in session.items]
+
+    def pytest_deselected(self, items):
+        self.tests_deselected += len(items)
 
     def pytest_sessionfinish(self, session: Session):
         self.tests_collected = session.testscollected
+        self.injection_plugin_registered = session.config.pluginmanager.has_plugin(INJECTION_PLUGIN_NAME)
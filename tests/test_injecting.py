@@ -6,23 +6,49 @@ that the injection mechanism is not working as expected.
 """
 
 import json
+import os
+import pickle
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import time
+import zipfile
 from os import path
 from pathlib import Path
 
 import pytest
+from pytest_inject import injector, save_injection_pickle
+from pytest_inject.lazy_json import INDEX_FILE_SUFFIX, LAZY_JSON_MIN_FILE_SIZE
+from pytest_inject.serve import send_payload, shutdown_server
+from pytest_inject.short_ids import get_short_id
 from pytest_session_reporter import PytestSessionReporter
-from tests_injected.argument_values import INJECTED
+from tests_injected.argument_values import INJECTED, NOT_EFFECTED
 
 PLUGIN_TESTS_DIR = Path(__file__).resolve().parent
 INJECTED_TESTS_DIR = path.join(PLUGIN_TESTS_DIR, "tests_injected")
+FINGERPRINTED_TESTS_DIR = path.join(PLUGIN_TESTS_DIR, "tests_fingerprinted")
 TESTS_DATA_DIR = path.join(PLUGIN_TESTS_DIR, "data")
 
 INJECT_1_STRING_JSON_PATH = path.join(TESTS_DATA_DIR, "inject_1_string.json")
 INJECT_1_STRING_PYTHON_FILE_PATH = path.join(TESTS_DATA_DIR, "inject_1_string.py")
 INJECT_1_STRING_DICT_TARGET = f"{INJECT_1_STRING_PYTHON_FILE_PATH}::injected_args"
 INJECT_1_STRING_DICT_GETTER_FUNC_TARGET = f"{INJECT_1_STRING_PYTHON_FILE_PATH}::injected_args"
+INJECT_LETTER_DICT_TARGET = f"{path.join(TESTS_DATA_DIR, 'inject_letter.py')}::injected_args"
+INJECT_1_STRING_COUNTING_EXECUTIONS_PYTHON_FILE_PATH = path.join(
+    TESTS_DATA_DIR, "inject_1_string_counting_executions.py"
+)
+INJECT_LAZY_PYTHON_FILE_PATH = path.join(TESTS_DATA_DIR, "inject_lazy.py")
+INJECT_CONCURRENT_PYTHON_FILE_PATH = path.join(TESTS_DATA_DIR, "inject_concurrent.py")
+INJECT_BATCH_JSONL_PATH = path.join(TESTS_DATA_DIR, "inject_batch.jsonl")
+INJECT_BATCH_DIFFERENT_ARGUMENTS_JSONL_PATH = path.join(TESTS_DATA_DIR, "inject_batch_different_arguments.jsonl")
 
 TEST_PASSED_CODE = 0
+TEST_FAILED_CODE = 1
+USAGE_ERROR_CODE = 4
+SERVER_START_TIMEOUT_SECONDS = 30
+SERVER_STOP_TIMEOUT_SECONDS = 30
 
 
 def test_inject_1_string_parameterize():
@@ -126,6 +152,32 @@ def test_parameterize_arguments_set_injection_caused_duplication_deletion():
     assert injected_session_reporter.tests_collected == 1
 
 
+def test_parameterize_arguments_set_duplication_deletion_ids():
+    """
+    Checking the ids of parameter sets after deletion of injection caused duplicates.
+    The injected test has 2 identical parameter sets and a third different one,
+    so by injecting all arguments, the third set is removed as a duplicate of the first.
+    The kept sets should keep their original ids, merged with the removed set id.
+    """
+    injected_session_reporter = PytestSessionReporter()
+
+    pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_unhashable_parameter_set_duplication",
+            "--inject-json",
+            json.dumps({"a": [1], "b": {"x": 1}})
+        ],
+        [injected_session_reporter]
+    )
+
+    assert [nodeid.split("[")[-1] for nodeid in injected_session_reporter.tests_nodeids] == [
+        "a0-b0+a2-b2]",
+        "a1-b1]",
+    ]
+
+
 def test_parameterize_arguments_set_duplication_deletion_disabling():
     """
     Checking deletion of duplicated parameterize argument sets
@@ -249,3 +301,1308 @@ def test_inject_using_python_dict_getter_function():
     )
 
     assert exit_code == TEST_PASSED_CODE
+
+
+def test_unhashable_parameter_sets_original_duplication_preservation():
+    """
+    Checking preservation of duplicated parameterize argument sets holding
+    unhashable values, when the duplication was not caused by injection.
+    The injected test has 2 identical parameter sets and a third different one,
+    so by overriding only "b", all 3 sets should be kept.
+    """
+    injected_session_reporter = PytestSessionReporter()
+
+    pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_unhashable_parameter_set_duplication",
+            "--inject-json",
+            json.dumps({"b": {"x": 1}})
+        ],
+        [injected_session_reporter]
+    )
+
+    assert injected_session_reporter.tests_collected == 3
+
+
+def test_unhashable_parameter_sets_injection_caused_duplication_deletion():
+    """
+    Checking deletion of duplicated parameterize argument sets holding
+    unhashable values, when the duplication was caused by injection.
+    The injected test has 2 identical parameter sets and a third different one,
+    so by overriding all arguments, only the third set should be removed.
+    """
+    injected_session_reporter = PytestSessionReporter()
+
+    pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_unhashable_parameter_set_duplication",
+            "--inject-json",
+            json.dumps({"a": [1], "b": {"x": 1}})
+        ],
+        [injected_session_reporter]
+    )
+
+    assert injected_session_reporter.tests_collected == 2
+
+
+def test_inject_pytest_param_parameter_sets():
+    """
+    Inject "param_injected_parameter"="injected" into a test holding pytest.param parameter
+    sets with skip and xfail marks and ids, to make this test pass.
+    Check that the injected parameter sets keep their marks and ids.
+    """
+    injected_session_reporter = PytestSessionReporter()
+
+    exit_code = pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_inject_pytest_param_parameter_sets",
+            "--inject-json",
+            json.dumps({"param_injected_parameter": INJECTED})
+        ],
+        [injected_session_reporter]
+    )
+
+    assert exit_code == TEST_PASSED_CODE
+    assert [nodeid.split("[")[-1] for nodeid in injected_session_reporter.tests_nodeids] == [
+        f"{INJECTED}-1]",
+        "skipped]",
+        "xfailed]",
+    ]
+
+
+def test_inject_single_argument_tuple_values():
+    """
+    Inject "tuple_injected_parameter"=["injected", "injected"] into a test of a single
+    argument with tuple values, to make this test pass.
+    Check that the tuple values of a single argument are not taken as parameter sets.
+    """
+    exit_code = pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_inject_single_argument_tuple_values",
+            "--inject-json",
+            json.dumps({"tuple_injected_parameter": [INJECTED, INJECTED]})
+        ]
+    )
+
+    assert exit_code == TEST_PASSED_CODE
+
+
+def test_inject_stacked_parametrize_markers():
+    """
+    Inject "first_stacked_injected_parameter"="injected" and "second_stacked_injected_parameter"="injected"
+    into two stacked parametrize markers of a test, to make this test pass.
+    Check that the duplicates of both markers are removed, while the marker that is not injected keeps
+    its 2 parameter sets.
+    """
+    injected_session_reporter = PytestSessionReporter()
+
+    exit_code = pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_inject_stacked_parametrize_markers",
+            "--inject-json",
+            json.dumps({"first_stacked_injected_parameter": INJECTED, "second_stacked_injected_parameter": INJECTED})
+        ],
+        [injected_session_reporter]
+    )
+
+    assert exit_code == TEST_PASSED_CODE
+    assert injected_session_reporter.tests_collected == 2
+
+
+def test_not_consuming_test_is_not_effected():
+    """
+    Checking that a test that consumes none of the injected arguments is
+    collected exactly as it would be without injection.
+    The injected test has 3 different parameter sets, none of them using
+    the injected argument, so all 3 should be collected.
+    """
+    injected_session_reporter = PytestSessionReporter()
+
+    pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_general_duplication_deletion",
+            "--inject-json",
+            json.dumps({"not_consumed_argument": INJECTED})
+        ],
+        [injected_session_reporter]
+    )
+
+    assert injected_session_reporter.tests_collected == 3
+
+
+def test_inject_short_ids():
+    """
+    Inject "injected_string_parameter"="injected" with --inject-short-ids to make this test pass.
+    Check that the injected test node id holds the short id of the injected value.
+    """
+    injected_session_reporter = PytestSessionReporter()
+
+    exit_code = pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_inject_1_string_parameterize",
+            "--inject-json",
+            json.dumps({"injected_string_parameter": INJECTED}),
+            "--inject-short-ids",
+            "-p",
+            "no:cacheprovider"
+        ],
+        [injected_session_reporter]
+    )
+
+    assert exit_code == TEST_PASSED_CODE
+    assert injected_session_reporter.tests_nodeids[0].endswith(f"[{get_short_id(INJECTED)}]")
+
+
+def test_inject_short_ids_of_shared_objects():
+    """
+    Inject "letter_injected_parameter"="b" with --inject-short-ids into a test whose other
+    parameter is "b" as well, which is the same cached object as the injected value.
+    Check that only the injected value gets its short id in the test node id.
+    """
+    injected_session_reporter = PytestSessionReporter()
+
+    exit_code = pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_inject_letter_parameter",
+            "--inject-dict",
+            INJECT_LETTER_DICT_TARGET,
+            "--inject-short-ids",
+            "-p",
+            "no:cacheprovider"
+        ],
+        [injected_session_reporter]
+    )
+
+    assert exit_code == TEST_PASSED_CODE
+    assert injected_session_reporter.tests_nodeids[0].endswith(f"[{get_short_id('b')}-b]")
+
+
+def test_short_ids_of_sets_are_stable():
+    """
+    Check that the short id of a value holding sets does not depend on the string hashing
+    seed of the interpreter, which orders the elements of sets.
+    """
+    short_id_script = (
+        "from pytest_inject.short_ids import get_short_id; "
+        "print(get_short_id({'tags': {'first', 'second', 'third'}, 'pairs': frozenset({('a', 1), ('b', 2)})}))"
+    )
+
+    short_ids = {
+        subprocess.run(
+            [sys.executable, "-c", short_id_script],
+            env={**os.environ, "PYTHONHASHSEED": str(hash_seed)},
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        for hash_seed in range(5)
+    }
+
+    assert len(short_ids) == 1
+
+
+def test_inject_lazy_json_file(tmp_path):
+    """
+    Inject "injected_string_parameter"="injected" from a JSON file large enough to be decoded
+    lazily, holding an invalid value no test consumes, twice, the second time with short ids.
+    Check that only the consumed value is decoded, and that the values offsets index written
+    next to the JSON file by the first run is reused by the second run.
+    """
+    json_file_path = tmp_path / "large_injection.json"
+    json_file_path.write_text(
+        f'{{"injected_string_parameter": "{INJECTED}", "not_consumed": invalid, '
+        f'"padding": "{"x" * LAZY_JSON_MIN_FILE_SIZE}"}}'
+    )
+    index_file_path = tmp_path / f"large_injection.json{INDEX_FILE_SUFFIX}"
+
+    first_exit_code = pytest.main(
+        [INJECTED_TESTS_DIR, "-k", "test_inject_1_string_parameterize", "--inject-json", str(json_file_path)]
+    )
+    index_mtime = index_file_path.stat().st_mtime_ns
+
+    injected_session_reporter = PytestSessionReporter()
+    second_exit_code = pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_inject_1_string_parameterize",
+            "--inject-json",
+            str(json_file_path),
+            "--inject-short-ids",
+            "-p",
+            "no:cacheprovider"
+        ],
+        [injected_session_reporter]
+    )
+
+    assert first_exit_code == TEST_PASSED_CODE
+    assert second_exit_code == TEST_PASSED_CODE
+    assert index_file_path.stat().st_mtime_ns == index_mtime
+    assert injected_session_reporter.tests_nodeids[0].endswith(f"[{get_short_id(INJECTED)}]")
+
+
+@pytest.mark.parametrize(
+    "trailing_data,expected_exit_code",
+    [("\n  \n", TEST_PASSED_CODE), (" garbage", USAGE_ERROR_CODE), ("{}", USAGE_ERROR_CODE)]
+)
+def test_inject_lazy_json_file_trailing_data(tmp_path, trailing_data, expected_exit_code):
+    """
+    Inject "injected_string_parameter"="injected" from a JSON file large enough to be decoded lazily,
+    followed by whitespace, or by data that is not whitespace.
+    Check that, as with json.load, only whitespace may follow the top-level object.
+    """
+    json_file_path = tmp_path / "large_injection.json"
+    json_file_path.write_text(
+        f'{{"injected_string_parameter": "{INJECTED}", "padding": "{"x" * LAZY_JSON_MIN_FILE_SIZE}"}}'
+        f"{trailing_data}"
+    )
+
+    exit_code = pytest.main(
+        [INJECTED_TESTS_DIR, "-k", "test_inject_1_string_parameterize", "--inject-json", str(json_file_path)]
+    )
+
+    assert exit_code == expected_exit_code
+
+
+@pytest.mark.parametrize("out_of_band", [True, False])
+def test_inject_pickle_file(tmp_path, out_of_band):
+    """
+    Inject "injected_string_parameter"="injected" from a pickle file, written with its
+    buffers out-of-band by save_injection_pickle, or by a plain pickle dump.
+    Check that the injected test passes.
+    """
+    pickle_file_path = tmp_path / "injection.pkl"
+    injected_args = {"injected_string_parameter": INJECTED, "not_consumed": bytearray(b"\0" * 1024)}
+    if out_of_band:
+        save_injection_pickle(injected_args, str(pickle_file_path))
+    else:
+        pickle_file_path.write_bytes(pickle.dumps(injected_args))
+
+    exit_code = pytest.main(
+        [INJECTED_TESTS_DIR, "-k", "test_inject_1_string_parameterize", "--inject-file", str(pickle_file_path)]
+    )
+
+    assert exit_code == TEST_PASSED_CODE
+
+
+@pytest.mark.parametrize(
+    "file_name,save_function_name,test_name",
+    [
+        ("injected_array.npy", "save", "test_inject_memory_mapped_array"),
+        ("injection.npz", "savez", "test_inject_memory_mapped_array"),
+        ("injection.npz", "savez_compressed", "test_inject_compressed_array"),
+    ]
+)
+def test_inject_numpy_file(tmp_path, file_name, save_function_name, test_name):
+    """
+    Inject "injected_array"=[0, 1, 2] from a ".npy" file, an uncompressed ".npz" file and a compressed
+    ".npz" file, to make the injected test pass.
+    Check that the arrays of ".npy" files and uncompressed ".npz" files are memory-mapped from the file,
+    and the compressed arrays of ".npz" files are decompressed when the test sets up.
+    """
+    numpy = pytest.importorskip("numpy")
+    numpy_file_path = tmp_path / file_name
+    save_function = getattr(numpy, save_function_name)
+    if file_name.endswith(".npy"):
+        save_function(numpy_file_path, numpy.arange(3))
+    else:
+        save_function(numpy_file_path, injected_array=numpy.arange(3), not_consumed=numpy.zeros(1024))
+
+    exit_code = pytest.main([INJECTED_TESTS_DIR, "-k", test_name, "--inject-file", str(numpy_file_path)])
+
+    assert exit_code == TEST_PASSED_CODE
+
+
+def test_inject_invalid_npz_member(tmp_path, capsys):
+    """
+    Inject a ".npz" file holding an uncompressed member that is not a valid ".npy" file.
+    Check that it is reported as a usage error naming the file and the member.
+    """
+    pytest.importorskip("numpy")
+    npz_file_path = tmp_path / "injection.npz"
+    with zipfile.ZipFile(npz_file_path, "w", compression=zipfile.ZIP_STORED) as npz_file:
+        npz_file.writestr("injected_array.npy", b"not a npy file")
+
+    exit_code = pytest.main(
+        [INJECTED_TESTS_DIR, "-k", "test_inject_memory_mapped_array", "--inject-file", str(npz_file_path)]
+    )
+
+    assert exit_code == USAGE_ERROR_CODE
+    assert f"The member 'injected_array.npy' of '{npz_file_path}'" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize(
+    "injected_args,expected_exit_code",
+    [
+        ({"injected_string_parameter": INJECTED}, TEST_PASSED_CODE),
+        ({"injected_string_parameter": INJECTED, "injected_string_paramter": INJECTED}, USAGE_ERROR_CODE),
+        ({"injected_string_parameter": 42}, USAGE_ERROR_CODE),
+        ({"injected_string_parameter": INJECTED, "*::test_not_existing": {"injected_string_parameter": INJECTED}},
+         USAGE_ERROR_CODE),
+    ]
+)
+def test_inject_strict(injected_args, expected_exit_code):
+    """
+    Inject "injected_string_parameter"="injected" with --inject-strict, alone, along with a
+    misspelled argument, as an int, and along with a node id scoped payload matching no test.
+    Check that the session fails before any test runs, unless every injected argument is
+    consumed by a collected test, and matches the annotations of the test consuming it.
+    """
+    exit_code = pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_inject_1_string_parameterize",
+            "--inject-json",
+            json.dumps(injected_args),
+            "--inject-strict"
+        ]
+    )
+
+    assert exit_code == expected_exit_code
+
+
+@pytest.mark.parametrize(
+    "injection_option,injection_input",
+    [
+        ("--inject-json", "{not json"),
+        ("--inject-json", json.dumps({"__inject_scope__": {"injected_string_parameter": "not_a_scope"}})),
+        ("--inject-json", json.dumps({"*::test_inject_1_string_parameterize": INJECTED})),
+        ("--inject-dict", path.join(TESTS_DATA_DIR, "not_existing.py::injected_args")),
+        ("--inject-file", path.join(TESTS_DATA_DIR, "not_existing.pkl")),
+    ]
+)
+def test_inject_invalid_input_usage_error(injection_option, injection_input, capsys):
+    """
+    Inject malformed JSON, an invalid "__inject_scope__" payload, a node id scoped payload that is
+    not a dict, and missing --inject-dict and --inject-file sources.
+    Check that the invalid input is reported as a usage error, without an internal error traceback.
+    """
+    exit_code = pytest.main(
+        [INJECTED_TESTS_DIR, "-k", "test_inject_1_string_parameterize", injection_option, injection_input]
+    )
+    output = capsys.readouterr()
+
+    assert exit_code == USAGE_ERROR_CODE
+    assert "ERROR: pytest-inject:" in output.err
+    assert "INTERNALERROR" not in output.out + output.err
+    assert "Traceback" not in output.out + output.err
+
+
+@pytest.mark.parametrize(
+    "test_name,injected_args",
+    [
+        ("test_inject_float_parameter", {"float_injected_parameter": 2}),
+        ("test_inject_single_argument_tuple_values", {"tuple_injected_parameter": [INJECTED, INJECTED]}),
+    ]
+)
+def test_inject_strict_compatible_types(test_name, injected_args):
+    """
+    Inject an int into a float parameter, and a list into a tuple parameter, with --inject-strict.
+    Check that ints are accepted as floats, and lists as tuples, as JSON has no tuples.
+    """
+    exit_code = pytest.main(
+        [INJECTED_TESTS_DIR, "-k", test_name, "--inject-json", json.dumps(injected_args), "--inject-strict"]
+    )
+
+    assert exit_code == TEST_PASSED_CODE
+
+
+def test_inject_only_deselects_not_injected_tests():
+    """
+    Inject "injected_string_parameter"="injected" with --inject-only into all the injected
+    tests. Check that only the test consuming it is run and passes, while all the
+    other tests are deselected.
+    """
+    injected_session_reporter = PytestSessionReporter()
+
+    exit_code = pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "--inject-json",
+            json.dumps({"injected_string_parameter": INJECTED}),
+            "--inject-only"
+        ],
+        [injected_session_reporter]
+    )
+
+    assert exit_code == TEST_PASSED_CODE
+    assert injected_session_reporter.tests_collected == 1
+    assert injected_session_reporter.tests_deselected > 0
+
+
+def test_injection_plugin_not_registered_without_injection_input():
+    """
+    Checking that the injection plugin is only registered for sessions
+    given an injection input, so pytest-inject is inert otherwise.
+    """
+    injected_session_reporter = PytestSessionReporter()
+
+    pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_general_duplication_deletion",
+        ],
+        [injected_session_reporter]
+    )
+
+    assert not injected_session_reporter.injection_plugin_registered
+    assert injected_session_reporter.tests_collected == 3
+
+
+def test_inject_batch_payloads():
+    """
+    Inject every payload line of a batch file, each making the tests consuming
+    it pass, to check that each payload line creates its own test variant.
+    The batch file has 3 payloads, 2 consumed by each of the injected tests,
+    so 4 tests should be collected and pass.
+    """
+    injected_session_reporter = PytestSessionReporter()
+
+    exit_code = pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_inject_1_string_parameterize or test_inject_1_string_fixture",
+            "--inject-batch",
+            INJECT_BATCH_JSONL_PATH
+        ],
+        [injected_session_reporter]
+    )
+
+    assert exit_code == TEST_PASSED_CODE
+    assert injected_session_reporter.tests_collected == 4
+
+
+def test_inject_batch_payloads_injecting_different_arguments_of_a_marker():
+    """
+    Checking that batch payloads injecting different arguments of the same
+    parameterize marker each create their own variant of the marker parameter sets.
+    The injected test has 3 different parameter sets, and each of the 2 payloads
+    keep them different, so 6 tests should be collected.
+    """
+    injected_session_reporter = PytestSessionReporter()
+
+    pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_general_duplication_deletion",
+            "--inject-batch",
+            INJECT_BATCH_DIFFERENT_ARGUMENTS_JSONL_PATH
+        ],
+        [injected_session_reporter]
+    )
+
+    assert injected_session_reporter.tests_collected == 6
+
+
+@pytest.mark.parametrize(
+    "matrix_mode,matrix,expected_tests_collected",
+    [
+        ("product", {"a": [1, 2], "b": [3, 4, 5], "not_consumed": [1, 2, 3, 4]}, 18),
+        ("zip", {"a": [1, 2, 1], "b": [3, 4, 3]}, 6),
+    ]
+)
+def test_inject_matrix(matrix_mode, matrix, expected_tests_collected):
+    """
+    Inject a matrix of candidate values into a test with 3 different parameter sets.
+    Check that every combination of the consumed arguments candidate values creates
+    its own variant of the parameter sets, while repeated combinations and arguments
+    that are not consumed by the test do not.
+    """
+    injected_session_reporter = PytestSessionReporter()
+
+    pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_general_duplication_deletion",
+            "--inject-matrix",
+            json.dumps(matrix),
+            "--inject-matrix-mode",
+            matrix_mode
+        ],
+        [injected_session_reporter]
+    )
+
+    assert injected_session_reporter.tests_collected == expected_tests_collected
+
+
+def test_inject_profile_json(tmp_path):
+    """
+    Profile the injection making all 3 parameter sets of the injected test identical.
+    Check that the profile JSON holds the injected test, with its rewritten marker,
+    and its parameter sets before and after the removal of duplicates.
+    """
+    profile_json_path = tmp_path / "inject-profile.json"
+
+    pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_general_duplication_deletion",
+            "--inject-json",
+            json.dumps({"a": INJECTED, "b": INJECTED, "c": INJECTED}),
+            "--inject-profile-json",
+            str(profile_json_path)
+        ]
+    )
+
+    profile = json.loads(profile_json_path.read_text())
+    test_profile = next(
+        test_profile for test_nodeid, test_profile in profile["tests"].items()
+        if test_nodeid.endswith("::test_general_duplication_deletion")
+    )
+
+    assert "resolve injection input" in profile["sections"]
+    assert test_profile["markers_rewritten"] == 1
+    assert test_profile["parameter_sets_before_dedup"] == 3
+    assert test_profile["parameter_sets_after_dedup"] == 1
+
+
+def test_inject_unresolvable_parameter_sets_ids_warning(monkeypatch):
+    """
+    Inject "a"="injected", "b"="injected" and "c"="injected" into a test, while the original ids of its
+    parameter sets cannot be resolved, as by pytest versions without the private helper resolving them.
+    Check that the injection warns instead of silently falling back to the ids pytest generates.
+    """
+    monkeypatch.setattr(injector, "RESOLVE_PARAMETER_SET_IDS_METHOD", "_not_existing_helper")
+
+    exit_code = pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_general_duplication_deletion",
+            "--inject-json",
+            json.dumps({"a": INJECTED, "b": INJECTED, "c": INJECTED}),
+            "-W",
+            "error::pytest_inject.exceptions.PytestInjectWarning",
+        ]
+    )
+
+    assert exit_code == pytest.ExitCode.INTERRUPTED
+
+
+def test_inject_node_id_scoped_payload():
+    """
+    Inject "injected_string_parameter"="injected" scoped to the module of the injected tests,
+    and "injected_string_fixture"="injected" scoped to the test consuming it, overriding
+    an unscoped "injected_string_fixture" failing it, to make both tests pass.
+    Check that node id scoped arguments are injected into the tests they match only.
+    """
+    exit_code = pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_inject_1_string_parameterize or test_inject_1_string_fixture",
+            "--inject-json",
+            json.dumps(
+                {
+                    "injected_string_fixture": NOT_EFFECTED,
+                    "*/test_injected.py": {"injected_string_parameter": INJECTED},
+                    "*::test_inject_1_string_fixture": {"injected_string_fixture": INJECTED},
+                    "*::test_not_existing": {"injected_string_parameter": NOT_EFFECTED},
+                }
+            )
+        ]
+    )
+
+    assert exit_code == TEST_PASSED_CODE
+
+
+def test_inject_node_id_prefix_payloads():
+    """
+    Inject "injected_string_parameter"="injected" scoped to the directory of the injected tests, and
+    "injected_string_fixture"="injected" scoped to their module, by prefixes ending with a node id
+    separator, to make both tests pass.
+    Check that prefixes ending with "/" or "::" match the node ids under them.
+    """
+    exit_code = pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_inject_1_string_parameterize or test_inject_1_string_fixture",
+            "--inject-json",
+            json.dumps(
+                {
+                    "tests/tests_injected/": {"injected_string_parameter": INJECTED},
+                    "tests/tests_injected/test_injected.py::": {"injected_string_fixture": INJECTED},
+                }
+            )
+        ]
+    )
+
+    assert exit_code == TEST_PASSED_CODE
+
+
+def test_inject_non_identifier_plain_keys():
+    """
+    Inject "injected_string_parameter"="injected" along with keys that are not valid argument
+    names, but are not node id patterns either, to make this test pass.
+    Check that such keys are ignored, as no test consumes them, instead of failing as node id patterns.
+    """
+    exit_code = pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_inject_1_string_parameterize",
+            "--inject-json",
+            json.dumps({"injected_string_parameter": INJECTED, "some-key": 1, "my arg": NOT_EFFECTED})
+        ]
+    )
+
+    assert exit_code == TEST_PASSED_CODE
+
+
+def test_inject_layered_sources():
+    """
+    Inject "injected_string_parameter"="injected" from an --inject-dict layer, over an
+    --inject-json layer injecting a failing "injected_string_parameter", to make this test pass.
+    Check that --inject-dict layers override --inject-json layers.
+    """
+    exit_code = pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_inject_1_string_parameterize",
+            "--inject-json",
+            json.dumps({"injected_string_parameter": NOT_EFFECTED}),
+            "--inject-dict",
+            INJECT_1_STRING_DICT_TARGET
+        ]
+    )
+
+    assert exit_code == TEST_PASSED_CODE
+
+
+def test_inject_layered_python_dict_sources_keep_interpreter_state():
+    """
+    Inject "injected_string_parameter"="injected" from two --inject-dict layers, to make this test pass.
+    Check that executing the python files of the layers leaves sys.argv and sys.modules as they were.
+    """
+    argv_before = list(sys.argv)
+    modules_before = set(sys.modules)
+
+    exit_code = pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_inject_1_string_parameterize",
+            "--inject-dict",
+            f"{INJECT_CONCURRENT_PYTHON_FILE_PATH}::concurrent_injected_args",
+            "--inject-dict",
+            INJECT_1_STRING_DICT_TARGET
+        ]
+    )
+
+    assert exit_code == TEST_PASSED_CODE
+    assert sys.argv == argv_before
+    assert "<run_path>" not in set(sys.modules) - modules_before
+
+
+def test_inject_layered_node_id_scoped_payloads():
+    """
+    Inject "injected_string_parameter"="injected" and a failing "injected_string_fixture" scoped
+    to the module of the injected tests, and override "injected_string_fixture"="injected" for the
+    same module in a later --inject-json layer, to make both tests pass.
+    Check that the node id scoped payloads of the layers are merged argument by argument.
+    """
+    exit_code = pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_inject_1_string_parameterize or test_inject_1_string_fixture",
+            "--inject-json",
+            json.dumps(
+                {
+                    "injected_string_parameter": NOT_EFFECTED,
+                    "*/test_injected.py": {
+                        "injected_string_parameter": INJECTED,
+                        "injected_string_fixture": NOT_EFFECTED,
+                    },
+                }
+            ),
+            "--inject-json",
+            json.dumps({"*/test_injected.py": {"injected_string_fixture": INJECTED}}),
+        ]
+    )
+
+    assert exit_code == TEST_PASSED_CODE
+
+
+def test_inject_class_parametrize_marker(tmp_path):
+    """
+    Inject "class_injected_parameter"="injected" into 2 of the 3 tests of a class
+    parametrize marker, whose original parameter sets are duplicated after injection.
+    Check that the injected tests share a single rewrite of the class marker, while
+    the test that is not injected keeps the original parameter sets of the class marker.
+    """
+    profile_json_path = tmp_path / "inject-profile.json"
+    injected_session_reporter = PytestSessionReporter()
+
+    exit_code = pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "TestInjectClassParametrizeMarker",
+            "--inject-json",
+            json.dumps({"*::TestInjectClassParametrizeMarker::test_inject_*": {"class_injected_parameter": INJECTED}}),
+            "--inject-profile-json",
+            str(profile_json_path)
+        ],
+        [injected_session_reporter]
+    )
+
+    profile = json.loads(profile_json_path.read_text())
+
+    assert exit_code == TEST_PASSED_CODE
+    assert injected_session_reporter.tests_collected == 2 + 2 + 3
+    assert profile["totals"]["markers_rewritten"] == 1
+
+
+def test_inject_shared_parametrize_marker_plan_cache(tmp_path):
+    """
+    Inject "shared_injected_parameter"="injected" into 2 tests sharing a parametrize decorator.
+    Check that the marker is rewritten for the first test only, and its injection plan is
+    taken from the plan cache for the second.
+    """
+    profile_json_path = tmp_path / "inject-profile.json"
+
+    exit_code = pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_inject_shared_parametrize_marker",
+            "--inject-json",
+            json.dumps({"shared_injected_parameter": INJECTED}),
+            "--inject-profile-json",
+            str(profile_json_path)
+        ]
+    )
+
+    profile = json.loads(profile_json_path.read_text())
+
+    assert exit_code == TEST_PASSED_CODE
+    assert profile["totals"]["markers_rewritten"] == 1
+    assert profile["totals"]["plan_cache_misses"] == 1
+    assert profile["totals"]["plan_cache_hits"] == 1
+
+
+def test_inject_fingerprint_hook():
+    """
+    Inject "fingerprinted_injected_parameter"="injected" into a test holding values whose equality
+    is ambiguous, fingerprinted by a pytest_inject_fingerprint hook implementation.
+    Check that the parameter sets holding values with equal fingerprints are deduplicated.
+    """
+    injected_session_reporter = PytestSessionReporter()
+
+    exit_code = pytest.main(
+        [
+            FINGERPRINTED_TESTS_DIR,
+            "-k",
+            "test_inject_fingerprinted_parameter_sets",
+            "--inject-json",
+            json.dumps({"fingerprinted_injected_parameter": INJECTED})
+        ],
+        [injected_session_reporter]
+    )
+
+    assert exit_code == TEST_PASSED_CODE
+    assert injected_session_reporter.tests_collected == 2
+
+
+@pytest.mark.parametrize(
+    "fingerprint_strategy,expected_tests_collected",
+    [("identity", 2), ("id", 3), ("buffer", 2)]
+)
+def test_inject_fingerprint_strategy(fingerprint_strategy, expected_tests_collected):
+    """
+    Inject "buffer_injected_parameter"="injected" into a test holding equal bytearrays.
+    Check that they are deduplicated by the strategies comparing their content only.
+    """
+    injected_session_reporter = PytestSessionReporter()
+
+    exit_code = pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_inject_buffer_parameter_sets",
+            "--inject-json",
+            json.dumps({"buffer_injected_parameter": INJECTED}),
+            "--inject-fingerprint",
+            fingerprint_strategy
+        ],
+        [injected_session_reporter]
+    )
+
+    assert exit_code == TEST_PASSED_CODE
+    assert injected_session_reporter.tests_collected == expected_tests_collected
+
+
+def test_inject_matrix_with_injected_json():
+    """
+    Inject "injected_string_fixture"="injected" using JSON, along with a matrix of
+    a repeated "injected_string_parameter"="injected" candidate, to make both tests pass.
+    Check that the JSON arguments are injected into the matrix combinations, and that
+    the repeated candidate creates a single variant.
+    """
+    injected_session_reporter = PytestSessionReporter()
+
+    exit_code = pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_inject_1_string_parameterize or test_inject_1_string_fixture",
+            "--inject-json",
+            json.dumps({"injected_string_fixture": INJECTED}),
+            "--inject-matrix",
+            json.dumps({"injected_string_parameter": [INJECTED, INJECTED]})
+        ],
+        [injected_session_reporter]
+    )
+
+    assert exit_code == TEST_PASSED_CODE
+    assert injected_session_reporter.tests_collected == 2
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="--inject-serve requires Unix sockets")
+def test_inject_serve_payloads(tmp_path):
+    """
+    Serve the injected test, and send it a payload making it pass, followed by
+    a payload making it fail, to check that every payload sent to the server
+    runs the served test again with that payload injected.
+    """
+    socket_path = tmp_path / "inject.sock"
+    server_process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "pytest",
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_inject_1_string_parameterize",
+            "-p",
+            "no:cacheprovider",
+            "--inject-serve",
+            str(socket_path)
+        ],
+        stdout=subprocess.DEVNULL,
+    )
+
+    try:
+        server_start_deadline = time.monotonic() + SERVER_START_TIMEOUT_SECONDS
+        while not socket_path.exists() and time.monotonic() < server_start_deadline:
+            time.sleep(0.1)
+
+        passing_payload_response = send_payload(str(socket_path), {"injected_string_parameter": INJECTED})
+        failing_payload_response = send_payload(str(socket_path), {"injected_string_parameter": "NOT_INJECTED"})
+    finally:
+        server_process.send_signal(signal.SIGINT)
+        server_process.wait(SERVER_STOP_TIMEOUT_SECONDS)
+
+    assert passing_payload_response["outcomes"] == {"passed": 1}
+    assert failing_payload_response["outcomes"] == {"failed": 1}
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="--inject-serve requires Unix sockets")
+def test_inject_serve_payloads_across_modules(tmp_path):
+    """
+    Serve injected tests of two modules, and send them two payloads making them pass, to check
+    that the modules set up by a payload are torn down before the next payload runs its tests.
+    """
+    for module_name in ("test_first_module.py", "test_second_module.py"):
+        (tmp_path / module_name).write_text(
+            "import pytest\n\n\n"
+            "@pytest.mark.parametrize('injected_string_parameter', ['NOT_INJECTED'])\n"
+            "def test_served(injected_string_parameter):\n"
+            f"    assert injected_string_parameter == {INJECTED!r}\n"
+        )
+
+    socket_path = tmp_path / "inject.sock"
+    server_process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "pytest",
+            str(tmp_path),
+            "--rootdir",
+            str(tmp_path),
+            "-p",
+            "no:cacheprovider",
+            "--inject-serve",
+            str(socket_path)
+        ],
+        stdout=subprocess.DEVNULL,
+    )
+
+    try:
+        server_start_deadline = time.monotonic() + SERVER_START_TIMEOUT_SECONDS
+        while not socket_path.exists() and time.monotonic() < server_start_deadline:
+            time.sleep(0.1)
+
+        payloads_responses = [
+            send_payload(str(socket_path), {"injected_string_parameter": INJECTED}) for _ in range(2)
+        ]
+    finally:
+        server_process.send_signal(signal.SIGINT)
+        server_process.wait(SERVER_STOP_TIMEOUT_SECONDS)
+
+    assert [response.get("outcomes") for response in payloads_responses] == [{"passed": 2}] * 2
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="--inject-serve requires Unix sockets")
+def test_inject_serve_errors_and_shutdown(tmp_path):
+    """
+    Serve a single selected item of a test, and send it a payload whose injected fixture changes
+    the item node id, followed by an invalid payload, and the shutdown command. Check that the
+    changed item is reported instead of running, that the invalid payload fails with an error
+    response, and that the server shuts down, removing its socket.
+    """
+    (tmp_path / "test_served_module.py").write_text(
+        "import pytest\n\n\n"
+        "@pytest.fixture\n"
+        "def injected_string_fixture():\n"
+        "    return 'NOT_INJECTED'\n\n\n"
+        "@pytest.mark.parametrize('index', [1, 2])\n"
+        "def test_served(index, injected_string_fixture):\n"
+        "    pass\n"
+    )
+
+    socket_path = tmp_path / "inject.sock"
+    server_process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "pytest",
+            f"{tmp_path / 'test_served_module.py'}::test_served[1]",
+            "--rootdir",
+            str(tmp_path),
+            "-p",
+            "no:cacheprovider",
+            "--inject-serve",
+            str(socket_path)
+        ],
+        stdout=subprocess.DEVNULL,
+    )
+
+    try:
+        server_start_deadline = time.monotonic() + SERVER_START_TIMEOUT_SECONDS
+        while not socket_path.exists() and time.monotonic() < server_start_deadline:
+            time.sleep(0.1)
+
+        changed_nodeid_response = send_payload(str(socket_path), {"injected_string_fixture": INJECTED})
+        invalid_payload_response = send_payload(str(socket_path), {"__inject_scope__": "not a dict"})
+        shutdown_response = shutdown_server(str(socket_path))
+        server_exit_code = server_process.wait(SERVER_STOP_TIMEOUT_SECONDS)
+    finally:
+        if server_process.poll() is None:
+            server_process.send_signal(signal.SIGINT)
+            server_process.wait(SERVER_STOP_TIMEOUT_SECONDS)
+
+    assert changed_nodeid_response["outcomes"] == {}
+    assert changed_nodeid_response["unmatched"] == ["test_served_module.py::test_served[1]"]
+    assert "__inject_scope__" in invalid_payload_response["error"]
+    assert shutdown_response == {"shutdown": True}
+    assert server_exit_code == TEST_PASSED_CODE
+    assert not socket_path.exists()
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="--inject-serve requires Unix sockets")
+def test_inject_serve_maxfail(tmp_path):
+    """
+    Serve three injected tests with --maxfail 2, and send them a payload making them all fail,
+    to check that the payload stops after its second failure, reporting why it stopped,
+    and that the server stops along with the session, removing its socket.
+    """
+    (tmp_path / "test_served_module.py").write_text(
+        "import pytest\n\n\n"
+        "@pytest.mark.parametrize('index', [1, 2, 3])\n"
+        "@pytest.mark.parametrize('injected_string_parameter', ['NOT_INJECTED'])\n"
+        "def test_served(index, injected_string_parameter):\n"
+        f"    assert injected_string_parameter == {INJECTED!r}\n"
+    )
+
+    socket_path = tmp_path / "inject.sock"
+    server_process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "pytest",
+            str(tmp_path),
+            "--rootdir",
+            str(tmp_path),
+            "-p",
+            "no:cacheprovider",
+            "--maxfail",
+            "2",
+            "--inject-serve",
+            str(socket_path)
+        ],
+        stdout=subprocess.DEVNULL,
+    )
+
+    try:
+        server_start_deadline = time.monotonic() + SERVER_START_TIMEOUT_SECONDS
+        while not socket_path.exists() and time.monotonic() < server_start_deadline:
+            time.sleep(0.1)
+
+        failing_payload_response = send_payload(str(socket_path), {"injected_string_parameter": "NOT_INJECTED"})
+        server_exit_code = server_process.wait(SERVER_STOP_TIMEOUT_SECONDS)
+    finally:
+        if server_process.poll() is None:
+            server_process.send_signal(signal.SIGINT)
+            server_process.wait(SERVER_STOP_TIMEOUT_SECONDS)
+
+    assert failing_payload_response["outcomes"] == {"failed": 2}
+    assert failing_payload_response["stopped"] == "stopping after 2 failures"
+    assert server_exit_code == TEST_FAILED_CODE
+    assert not socket_path.exists()
+
+
+def _run_cached_python_dict_injection_twice(tmp_path, target_name):
+    """
+    Runs the "test_inject_1_string_parameterize" injected test twice with a cached
+    python dict input, that counts its executions, returning the exit codes of the
+    runs and the number of times the python file was executed.
+    """
+    python_file_path = tmp_path / "inject_data.py"
+    shutil.copy(INJECT_1_STRING_COUNTING_EXECUTIONS_PYTHON_FILE_PATH, python_file_path)
+
+    exit_codes = [
+        pytest.main(
+            [
+                INJECTED_TESTS_DIR,
+                "-k",
+                "test_inject_1_string_parameterize",
+                "-o",
+                f"cache_dir={tmp_path / 'cache'}",
+                "--inject-dict",
+                f"{python_file_path}::{target_name}",
+                "--inject-dict-cache",
+            ]
+        )
+        for _ in range(2)
+    ]
+
+    executions = python_file_path.with_suffix(".executions").read_text().splitlines()
+
+    return exit_codes, len(executions)
+
+
+def test_inject_dict_cache_skips_python_file_execution(tmp_path):
+    """
+    Inject "injected_string_parameter"="injected" twice, using a cached python dict,
+    to check that the second run loads the dict from the cache, without executing
+    the python file again.
+    """
+    exit_codes, executions = _run_cached_python_dict_injection_twice(tmp_path, "injected_args")
+
+    assert exit_codes == [TEST_PASSED_CODE, TEST_PASSED_CODE]
+    assert executions == 1
+
+
+def test_inject_dict_cache_falls_back_to_execution_for_unpicklable_dict(tmp_path):
+    """
+    Inject "injected_string_parameter"="injected" twice, using a cached python dict
+    that cannot be pickled, to check that the python file is executed on every run.
+    """
+    exit_codes, executions = _run_cached_python_dict_injection_twice(tmp_path, "unpicklable_injected_args")
+
+    assert exit_codes == [TEST_PASSED_CODE, TEST_PASSED_CODE]
+    assert executions == 2
+
+
+def test_xdist_workers_receive_resolved_payload(tmp_path):
+    """
+    Inject "injected_string_parameter"="injected" using a python dict that counts
+    its executions, with 2 pytest-xdist workers, to check that the python file is
+    executed once by the controller, and not again by every worker.
+    """
+    pytest.importorskip("xdist")
+    python_file_path = tmp_path / "inject_data.py"
+    shutil.copy(INJECT_1_STRING_COUNTING_EXECUTIONS_PYTHON_FILE_PATH, python_file_path)
+
+    exit_code = pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_inject_1_string_parameterize",
+            "-n",
+            "2",
+            "--inject-dict",
+            f"{python_file_path}::injected_args",
+        ]
+    )
+
+    executions = python_file_path.with_suffix(".executions").read_text().splitlines()
+
+    assert exit_code == TEST_PASSED_CODE
+    assert len(executions) == 1
+
+
+def test_xdist_workers_read_batch_payloads():
+    """
+    Inject every payload line of a batch file with 2 pytest-xdist workers, to check that
+    the workers, which receive only the offsets of the payload lines, read the payloads
+    from the batch file themselves, so the 4 tests they create pass.
+    """
+    pytest.importorskip("xdist")
+    injected_session_reporter = PytestSessionReporter()
+
+    exit_code = pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_inject_1_string_parameterize or test_inject_1_string_fixture",
+            "-n",
+            "2",
+            "--inject-batch",
+            INJECT_BATCH_JSONL_PATH
+        ],
+        [injected_session_reporter]
+    )
+
+    assert exit_code == TEST_PASSED_CODE
+    assert injected_session_reporter.tests_collected == 4
+
+
+@pytest.mark.parametrize(
+    "scope_args,expected_exit_code",
+    [
+        (["--inject-scope", "session"], TEST_PASSED_CODE),
+        (["--inject-scope", "auto"], TEST_PASSED_CODE),
+        ([], TEST_FAILED_CODE),
+    ]
+)
+def test_inject_fixture_scope(scope_args, expected_exit_code):
+    """
+    Inject "session_injected_string_fixture"="injected", a dependency of a session
+    scoped fixture, with different scopes. Check that the session scoped fixture is
+    set up once when the injected fixture is session scoped, and fails on a scope
+    mismatch when it is function scoped.
+    """
+    exit_code = pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_inject_session_scoped_fixture_dependency",
+            "--inject-json",
+            json.dumps({"session_injected_string_fixture": INJECTED}),
+            *scope_args
+        ]
+    )
+
+    assert exit_code == expected_exit_code
+
+
+def test_inject_fixture_scope_from_payload():
+    """
+    Inject "session_injected_string_fixture"="injected" with a session scope given
+    under the "__inject_scope__" key. Check that it overrides the --inject-scope scope.
+    """
+    exit_code = pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_inject_session_scoped_fixture_dependency",
+            "--inject-json",
+            json.dumps(
+                {
+                    "session_injected_string_fixture": INJECTED,
+                    "__inject_scope__": {"session_injected_string_fixture": "session"},
+                }
+            ),
+            "--inject-scope",
+            "function"
+        ]
+    )
+
+    assert exit_code == TEST_PASSED_CODE
+
+
+def test_inject_lazy_value():
+    """
+    Inject "injected_string_parameter"=lazy(lambda: "injected") to make this test pass,
+    while injecting a lazy value failing when evaluated into a deselected test.
+    Check that lazy values are evaluated for the tests consuming them, and only for them.
+    """
+    exit_code = pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_inject_1_string_parameterize",
+            "--inject-dict",
+            f"{INJECT_LAZY_PYTHON_FILE_PATH}::lazy_injected_args"
+        ]
+    )
+
+    assert exit_code == TEST_PASSED_CODE
+
+
+def test_inject_concurrent_dict_values(capsys):
+    """
+    Inject "injected_string_parameter"="injected" from an async dict target, whose dict holds
+    a coroutine and blocking factories that only complete if they are all resolved concurrently.
+    Check that the injected test passes, and that the timings of the values are shown in verbose mode.
+    """
+    exit_code = pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_inject_1_string_parameterize",
+            "--inject-dict",
+            f"{INJECT_CONCURRENT_PYTHON_FILE_PATH}::concurrent_injected_args",
+            "-v"
+        ]
+    )
+
+    output = capsys.readouterr().out
+    assert exit_code == TEST_PASSED_CODE
+    assert "pytest-inject dict values timings" in output
+    for key in ("injected_string_parameter", "first_not_consumed", "second_not_consumed"):
+        assert f"{key}: " in output
+
+
+@pytest.mark.parametrize(
+    "target_name,expected_exit_code",
+    [
+        ("module_scoped_lazy_injected_args", TEST_PASSED_CODE),
+        ("function_scoped_lazy_injected_args", TEST_FAILED_CODE),
+    ]
+)
+def test_inject_lazy_value_memoization(target_name, expected_exit_code):
+    """
+    Inject a lazy value creating a new object into a test with 2 parameter sets,
+    that passes only if both get the same object. Check that a module scoped lazy
+    value is created once for the module, and a function scoped one for every test.
+    """
+    exit_code = pytest.main(
+        [
+            INJECTED_TESTS_DIR,
+            "-k",
+            "test_inject_lazy_value_memoization",
+            "--inject-dict",
+            f"{INJECT_LAZY_PYTHON_FILE_PATH}::{target_name}",
+            "--inject-allow-dup"
+        ]
+    )
+
+    assert exit_code == expected_exit_code
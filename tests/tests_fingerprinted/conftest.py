@@ -0,0 +1,8 @@
+from fingerprinted_values import AmbiguousEqualityValue
+
+
+def pytest_inject_fingerprint(value):
+    if isinstance(value, AmbiguousEqualityValue):
+        return value.key
+
+    return None
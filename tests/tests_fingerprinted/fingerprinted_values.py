@@ -0,0 +1,18 @@
+"""
+Values whose parameter sets are fingerprinted by the pytest_inject_fingerprint hook of the fingerprinted tests.
+"""
+
+
+class AmbiguousEqualityValue:
+    """
+    A value whose equality is ambiguous, like the equality of NumPy arrays,
+    fingerprinted by its key by the pytest_inject_fingerprint hook of the fingerprinted tests.
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+
+    def __eq__(self, other):
+        raise ValueError("The truth value of an ambiguous equality value is ambiguous.")
+
+    __hash__ = None
@@ -0,0 +1,25 @@
+"""
+Tests holding values fingerprinted by the pytest_inject_fingerprint hook of this directory only,
+so the hook does not apply to the other injected tests.
+"""
+import pytest
+from fingerprinted_values import AmbiguousEqualityValue
+from tests_injected.argument_values import INJECTED, NOT_EFFECTED
+
+
+@pytest.mark.parametrize(
+    "fingerprinted_parameter,fingerprinted_injected_parameter",
+    [
+        (AmbiguousEqualityValue("first"), NOT_EFFECTED),
+        (AmbiguousEqualityValue("first"), f"{NOT_EFFECTED}-again"),
+        (AmbiguousEqualityValue("second"), NOT_EFFECTED),
+    ]
+)
+def test_inject_fingerprinted_parameter_sets(
+        fingerprinted_parameter: AmbiguousEqualityValue,
+        fingerprinted_injected_parameter: str,
+):
+    """
+    Inject "fingerprinted_injected_parameter"="injected" to make this test pass.
+    """
+    assert fingerprinted_injected_parameter == INJECTED
@@ -111,3 +111,214 @@ def test_parameter_set_duplication_preservation(a, b, c):
     Injection target for tests checking original parameterize arguments set
     duplication preservation.
     """
+
+
+@pytest.mark.parametrize(
+    "a,b",
+    [
+        ([1], {"x": 1}),
+        ([1], {"x": 1}),
+        ([2], {"x": 2})
+    ]
+)
+def test_unhashable_parameter_set_duplication(a, b):
+    """
+    Injection target for tests checking duplication handling of
+    parameter sets holding unhashable values.
+    """
+
+
+@pytest.fixture(scope="module")
+def lazy_values_seen() -> list:
+    return []
+
+
+@pytest.mark.parametrize(
+    "lazy_value_parameter",
+    [
+        NOT_EFFECTED,
+        NOT_EFFECTED
+    ]
+)
+def test_inject_lazy_value_memoization(lazy_value_parameter, lazy_values_seen):
+    """
+    Injection target for tests checking lazy values memoization, passing
+    only if all its parameter sets get the very same injected object.
+    """
+    lazy_values_seen.append(lazy_value_parameter)
+
+    assert all(lazy_value is lazy_values_seen[0] for lazy_value in lazy_values_seen)
+
+
+@pytest.fixture(scope="session")
+def session_injected_string_fixture() -> str:
+    return NOT_EFFECTED
+
+
+@pytest.fixture(scope="session")
+def session_fixture_setups_seen(session_injected_string_fixture: str) -> list:
+    return [session_injected_string_fixture]
+
+
+@pytest.mark.parametrize(
+    "not_injected_parameter",
+    [
+        NOT_EFFECTED,
+        NOT_EFFECTED + NOT_EFFECTED
+    ]
+)
+def test_inject_session_scoped_fixture_dependency(
+        not_injected_parameter: str,
+        session_fixture_setups_seen: list,
+):
+    """
+    Inject "session_injected_string_fixture"="injected" with a session scope
+    to make this test pass. Adds its parameter to the session fixture, passing
+    only if the session fixture is set up once for both of its parameter sets.
+    """
+    session_fixture_setups_seen.append(not_injected_parameter)
+
+    assert session_fixture_setups_seen[0] == INJECTED
+    assert session_fixture_setups_seen[1] == NOT_EFFECTED
+
+
+@pytest.mark.parametrize(
+    "param_injected_parameter,not_injected_parameter",
+    [
+        (NOT_EFFECTED, 1),
+        pytest.param(NOT_EFFECTED, 2, marks=pytest.mark.skip(reason="skipped parameter set"), id="skipped"),
+        pytest.param(NOT_EFFECTED, 3, marks=pytest.mark.xfail(strict=True), id="xfailed"),
+    ]
+)
+def test_inject_pytest_param_parameter_sets(param_injected_parameter: str, not_injected_parameter: int):
+    """
+    Inject "param_injected_parameter"="injected" to make this test pass, while its
+    pytest.param parameter sets keep their ids, and stay skipped and xfailed.
+    """
+    assert param_injected_parameter == INJECTED
+    assert not_injected_parameter != 3
+
+
+@pytest.mark.parametrize(
+    "tuple_injected_parameter",
+    [
+        (NOT_EFFECTED, NOT_EFFECTED),
+        pytest.param((NOT_EFFECTED,), marks=pytest.mark.skip(reason="skipped parameter set")),
+    ]
+)
+def test_inject_single_argument_tuple_values(tuple_injected_parameter: tuple):
+    """
+    Inject "tuple_injected_parameter"=["injected", "injected"] to make this test pass.
+    """
+    assert list(tuple_injected_parameter) == [INJECTED, INJECTED]
+
+
+@pytest.mark.parametrize("letter_injected_parameter,letter_parameter", [("a", "b")])
+def test_inject_letter_parameter(letter_injected_parameter: str, letter_parameter: str):
+    """
+    Inject "letter_injected_parameter"="b" to make this test pass.
+    """
+    assert letter_injected_parameter == letter_parameter
+
+
+@pytest.mark.parametrize("float_injected_parameter", [0.5, 1.5])
+def test_inject_float_parameter(float_injected_parameter: float):
+    """
+    Inject "float_injected_parameter"=2 to make this test pass.
+    """
+    assert float_injected_parameter == 2
+
+
+@pytest.mark.parametrize("first_stacked_injected_parameter", [NOT_EFFECTED, f"{NOT_EFFECTED}-again"])
+@pytest.mark.parametrize("second_stacked_injected_parameter", [NOT_EFFECTED, f"{NOT_EFFECTED}-again"])
+@pytest.mark.parametrize("not_injected_parameter", [1, 2])
+def test_inject_stacked_parametrize_markers(
+        first_stacked_injected_parameter: str,
+        second_stacked_injected_parameter: str,
+        not_injected_parameter: int,
+):
+    """
+    Inject "first_stacked_injected_parameter"="injected" and "second_stacked_injected_parameter"="injected"
+    to make this test pass, while the stacked parametrize marker that is not injected keeps its values.
+    """
+    assert first_stacked_injected_parameter == INJECTED
+    assert second_stacked_injected_parameter == INJECTED
+
+
+@pytest.mark.parametrize(
+    "class_injected_parameter,not_injected_parameter",
+    [(NOT_EFFECTED, 1), (f"{NOT_EFFECTED}-again", 1), (NOT_EFFECTED, 2)]
+)
+class TestInjectClassParametrizeMarker:
+    """
+    Inject "class_injected_parameter"="injected" into the tests of this class starting
+    with "test_inject_" only, to make them pass. The parametrize marker of the class is
+    shared by all of its tests, so the tests that are not injected keep its original values.
+    """
+
+    def test_inject_class_parametrize_marker(self, class_injected_parameter: str, not_injected_parameter: int):
+        assert class_injected_parameter == INJECTED
+
+    def test_inject_class_parametrize_marker_again(self, class_injected_parameter: str, not_injected_parameter: int):
+        assert class_injected_parameter == INJECTED
+
+    def test_class_parametrize_marker_not_injected(self, class_injected_parameter: str, not_injected_parameter: int):
+        assert class_injected_parameter != INJECTED
+
+
+SHARED_PARAMETRIZE_MARKER = pytest.mark.parametrize(
+    "shared_injected_parameter,not_injected_parameter",
+    [(NOT_EFFECTED, 1), (NOT_EFFECTED, 2)]
+)
+
+
+@SHARED_PARAMETRIZE_MARKER
+def test_inject_shared_parametrize_marker(shared_injected_parameter: str, not_injected_parameter: int):
+    """
+    Inject "shared_injected_parameter"="injected" to make this test pass.
+    """
+    assert shared_injected_parameter == INJECTED
+
+
+@SHARED_PARAMETRIZE_MARKER
+def test_inject_shared_parametrize_marker_again(shared_injected_parameter: str, not_injected_parameter: int):
+    """
+    Inject "shared_injected_parameter"="injected" to make this test pass.
+    """
+    assert shared_injected_parameter == INJECTED
+
+
+@pytest.mark.parametrize(
+    "buffer_parameter,buffer_injected_parameter",
+    [
+        (bytearray(b"first"), NOT_EFFECTED),
+        (bytearray(b"first"), f"{NOT_EFFECTED}-again"),
+        (bytearray(b"second"), NOT_EFFECTED),
+    ]
+)
+def test_inject_buffer_parameter_sets(buffer_parameter: bytearray, buffer_injected_parameter: str):
+    """
+    Inject "buffer_injected_parameter"="injected" to make this test pass.
+    """
+    assert buffer_injected_parameter == INJECTED
+
+
+@pytest.mark.parametrize("injected_array", [NOT_EFFECTED])
+def test_inject_memory_mapped_array(injected_array):
+    """
+    Inject "injected_array"=[0, 1, 2] from a ".npy" file or an uncompressed ".npz" file to make this test pass.
+    """
+    numpy = pytest.importorskip("numpy")
+    assert isinstance(injected_array, numpy.memmap)
+    assert not injected_array.flags.writeable
+    assert injected_array.tolist() == [0, 1, 2]
+
+
+@pytest.mark.parametrize("injected_array", [NOT_EFFECTED])
+def test_inject_compressed_array(injected_array):
+    """
+    Inject "injected_array"=[0, 1, 2] from a compressed ".npz" file to make this test pass.
+    """
+    numpy = pytest.importorskip("numpy")
+    assert isinstance(injected_array, numpy.ndarray)
+    assert injected_array.tolist() == [0, 1, 2]